@@ -0,0 +1,176 @@
+# Módulo: armazenamento.py
+"""
+Módulo: armazenamento.py
+Armazenamento em disco dos arquivos de documentos, endereçado pelo
+conteúdo (SHA-256).
+
+- O upload é gravado em blocos em um arquivo temporário enquanto o
+  hash é calculado; o arquivo nunca fica inteiro em memória.
+- O destino final é sha256/<2>/<2>/<hash>: o mesmo arquivo enviado
+  duas vezes é armazenado uma única vez. Reaproveitar um arquivo
+  renova o seu mtime, que marca o arquivo como em uso.
+- Os arquivos que nenhum documento referencia (após exclusões em
+  cascata ou uploads interrompidos) são apagados pela varredura de
+  exclusao.limpar_arquivos_orfaos (python -m app.exclusao --arquivos),
+  só depois de um tempo sem uso (ver exclusao.py).
+- Os downloads leem o arquivo em blocos, com suporte a intervalos.
+  Esse caminho padrão não é de cópia zero: cada bloco passa pelo Python
+  e pelo servidor ASGI (o FileResponse do Starlette não usa sendfile).
+  Em produção, use o nginx na frente com DOCUMENTOS_X_ACCEL_PREFIXO:
+
+      location /protegido/documentos/ {
+          internal;
+          alias <DOCUMENTOS_DIR>/;
+      }
+
+Configuração por variáveis de ambiente:
+- DOCUMENTOS_DIR: diretório raiz dos arquivos (padrão ./documentos)
+- DOCUMENTOS_TAMANHO_MAXIMO: tamanho máximo do upload em bytes (padrão 50 MiB)
+- DOCUMENTOS_X_ACCEL_PREFIXO: quando definido (ex.: /protegido/documentos),
+  os downloads são delegados ao nginx via X-Accel-Redirect, que envia o
+  arquivo com sendfile (cópia zero) e trata os intervalos por conta própria
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import AsyncIterator, Iterator, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+DOCUMENTOS_DIR = os.path.abspath(os.getenv("DOCUMENTOS_DIR", "./documentos"))
+DOCUMENTOS_TAMANHO_MAXIMO = int(os.getenv("DOCUMENTOS_TAMANHO_MAXIMO", 50 * 1024 * 1024))
+DOCUMENTOS_X_ACCEL_PREFIXO = os.getenv("DOCUMENTOS_X_ACCEL_PREFIXO")
+TAMANHO_BLOCO = 256 * 1024
+
+
+class ArquivoMuitoGrande(Exception):
+    """O upload ultrapassou DOCUMENTOS_TAMANHO_MAXIMO."""
+
+
+class ArquivoVazio(Exception):
+    """O upload não trouxe nenhum byte (nada é gravado)."""
+
+
+class IntervaloInvalido(Exception):
+    """O intervalo do cabeçalho Range é válido, mas está fora do arquivo (416)."""
+
+
+def caminho_absoluto(caminho_relativo: str) -> str:
+    """Converte o caminho salvo em Documento para um caminho no disco."""
+    caminho = os.path.abspath(os.path.join(DOCUMENTOS_DIR, caminho_relativo))
+    if not caminho.startswith(DOCUMENTOS_DIR + os.sep):
+        raise ValueError("Caminho de documento fora do diretório de armazenamento.")
+    return caminho
+
+
+async def salvar_fluxo(blocos: AsyncIterator[bytes]) -> Tuple[str, int, bool]:
+    """
+    Grava o conteúdo recebido em blocos e o move para o endereço do seu hash.
+    Retorna (caminho_relativo, tamanho, novo). Se o conteúdo já existir, o
+    arquivo temporário é descartado e o caminho existente é reutilizado
+    (novo=False), com o mtime renovado.
+    Lança ArquivoVazio (sem gravar nada no armazenamento) se não vier nenhum byte.
+    """
+    temporarios = os.path.join(DOCUMENTOS_DIR, "tmp")
+    os.makedirs(temporarios, exist_ok=True)
+    descritor, caminho_temp = tempfile.mkstemp(dir=temporarios)
+    resumo = hashlib.sha256()
+    tamanho = 0
+    try:
+        with os.fdopen(descritor, "wb") as arquivo:
+            async for bloco in blocos:
+                if not bloco:
+                    continue
+                tamanho += len(bloco)
+                if tamanho > DOCUMENTOS_TAMANHO_MAXIMO:
+                    raise ArquivoMuitoGrande()
+                resumo.update(bloco)
+                await run_in_threadpool(arquivo.write, bloco)
+        if tamanho == 0:
+            raise ArquivoVazio()
+
+        digest = resumo.hexdigest()
+        caminho_relativo = "/".join(("sha256", digest[:2], digest[2:4], digest))
+        destino = caminho_absoluto(caminho_relativo)
+        novo = not os.path.exists(destino)
+        if novo:
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            os.replace(caminho_temp, destino)
+        else:
+            os.remove(caminho_temp)
+            os.utime(destino)  # em uso: a varredura de órfãos não o apaga agora
+        return caminho_relativo, tamanho, novo
+    except BaseException:
+        if os.path.exists(caminho_temp):
+            os.remove(caminho_temp)
+        raise
+
+
+def listar_arquivos() -> Iterator[str]:
+    """Caminhos relativos de todos os arquivos do armazenamento (incluindo temporários)."""
+    for raiz, _, nomes in os.walk(DOCUMENTOS_DIR):
+        for nome in nomes:
+            yield os.path.relpath(os.path.join(raiz, nome), DOCUMENTOS_DIR).replace(os.sep, "/")
+
+
+def remover(caminho_relativo: str, sem_uso_desde: float) -> bool:
+    """
+    Apaga o arquivo se o seu mtime for anterior a sem_uso_desde (time.time()):
+    um arquivo reaproveitado por outro upload depois disso é mantido.
+    Retorna True se o arquivo foi apagado.
+    """
+    caminho = caminho_absoluto(caminho_relativo)
+    try:
+        if os.stat(caminho).st_mtime > sem_uso_desde:
+            return False
+        os.remove(caminho)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def interpretar_range(cabecalho: Optional[str], tamanho: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta um cabeçalho Range de intervalo único ("bytes=a-b",
+    "bytes=a-" ou "bytes=-n"). Retorna (inicio, fim) inclusivos, ou None
+    quando não há Range aplicável (o arquivo inteiro deve ser enviado):
+    pela RFC 9110, um Range malformado (ex.: "bytes=5-2") é ignorado.
+    Lança IntervaloInvalido só para intervalos válidos que não podem ser
+    atendidos (início além do fim do arquivo, ou "bytes=-0").
+    """
+    if not cabecalho or not cabecalho.startswith("bytes="):
+        return None
+    especificacao = cabecalho[len("bytes="):].strip()
+    if "," in especificacao:
+        return None  # múltiplos intervalos: responde com o arquivo inteiro
+    inicio_txt, separador, fim_txt = especificacao.partition("-")
+    if not separador or not (inicio_txt or fim_txt):
+        return None
+    if (inicio_txt and not inicio_txt.isdigit()) or (fim_txt and not fim_txt.isdigit()):
+        return None
+    if not inicio_txt:
+        sufixo = int(fim_txt)
+        if sufixo == 0 or tamanho == 0:
+            raise IntervaloInvalido()
+        return max(tamanho - sufixo, 0), tamanho - 1
+    inicio = int(inicio_txt)
+    fim = int(fim_txt) if fim_txt else tamanho - 1
+    if fim_txt and fim < inicio:
+        return None
+    if inicio >= tamanho:
+        raise IntervaloInvalido()
+    return inicio, min(fim, tamanho - 1)
+
+
+def ler_intervalo(caminho: str, inicio: int, fim: int) -> Iterator[bytes]:
+    """Lê o trecho [inicio, fim] do arquivo em blocos."""
+    restante = fim - inicio + 1
+    with open(caminho, "rb") as arquivo:
+        arquivo.seek(inicio)
+        while restante > 0:
+            bloco = arquivo.read(min(TAMANHO_BLOCO, restante))
+            if not bloco:
+                break
+            restante -= len(bloco)
+            yield bloco
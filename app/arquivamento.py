@@ -0,0 +1,297 @@
+# Módulo: arquivamento.py
+"""
+Módulo: arquivamento.py
+Arquivamento das manutenções antigas em um banco SQLite separado.
+
+A tabela manutencoes só cresce, e o histórico recente paga por tabelas
+e índices dominados por registros de anos atrás. Com ARQUIVO_DB
+definido (ver database.py), o banco de arquivo é anexado a toda conexão
+como o esquema "arquivo", com cópias das tabelas manutencoes e
+documentos (mesmos ids, sem chaves estrangeiras).
+
+arquivar move, em lotes, as manutenções com data anterior ao corte e os
+seus documentos. Cada lote é copiado (INSERT OR REPLACE) e confirmado
+antes de ser apagado do banco principal: uma interrupção no meio deixa
+no máximo uma cópia duplicada, resolvida na próxima execução e ignorada
+nas leituras (o banco principal prevalece). Só é apagado o que já está
+no arquivo: um documento enviado entre a cópia e a exclusão fica, com a
+sua manutenção, para o lote seguinte.
+
+As leituras continuam vendo o histórico inteiro: crud.py consulta o
+arquivo só quando o pedido pode estar lá (id não encontrado no banco
+principal, página cujo intervalo de ids alcança registros arquivados,
+histórico completo de um veículo, exportação). Para as páginas, o maior
+id arquivado fica em memória no processo e só é relido quando os
+arquivos do banco de arquivo mudam (mtime e tamanho do banco e do -wal),
+o que também cobre arquivamentos feitos por outro processo. O resumo de custos
+continua contando as manutenções arquivadas. A busca textual cobre
+apenas as manutenções do banco principal.
+
+Uso (a partir da raiz do repositório):
+    ARQUIVO_DB=arquivo.db python -m app.arquivamento --dias 730
+"""
+
+import argparse
+import heapq
+import os
+import time
+from datetime import date, timedelta
+from typing import List
+
+from sqlalchemy import Column, Index, MetaData, Table, delete, exists, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import ARQUIVO_DB, ESQUEMA_ARQUIVO
+
+ARQUIVO_DIAS = int(os.getenv("ARQUIVO_DIAS", 730))
+ARQUIVO_LOTE = int(os.getenv("ARQUIVO_LOTE", 1000))
+ARQUIVO_PAUSA_MS = float(os.getenv("ARQUIVO_PAUSA_MS", 5))
+
+metadados = MetaData(schema=ESQUEMA_ARQUIVO)
+
+
+def _copiar_tabela(tabela: Table) -> Table:
+    """Mesmas colunas da tabela principal, sem chaves estrangeiras nem índices."""
+    return Table(tabela.name, metadados, *[
+        Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable) for c in tabela.columns
+    ])
+
+
+ManutencaoArquivada = _copiar_tabela(models.Manutencao.__table__)
+DocumentoArquivado = _copiar_tabela(models.Documento.__table__)
+
+# Caminhos de acesso usados nas leituras: histórico por veículo,
+# última km por tipo (planos) e documentos por manutenção
+Index("ix_manutencoes_veiculo_tipo_km", ManutencaoArquivada.c.veiculo_id,
+      ManutencaoArquivada.c.tipo_manutencao, ManutencaoArquivada.c.km)
+Index("ix_documentos_manutencao", DocumentoArquivado.c.manutencao_id)
+
+
+# (assinatura dos arquivos do banco de arquivo, maior id arquivado)
+_maior_id = (None, 0)
+# Assinaturas com mtime mais recente que isto não são confiáveis: outro
+# commit no mesmo tique do relógio do sistema de arquivos pode não mudá-las
+MARGEM_ASSINATURA_NS = 1_000_000_000
+
+CONSULTA_MAIOR_ID = select(func.max(ManutencaoArquivada.c.id))
+
+
+def ativo() -> bool:
+    """O banco de arquivo está configurado (e anexado às conexões)."""
+    return bool(ARQUIVO_DB)
+
+
+def criar_arquivo(bind):
+    """Cria as tabelas e índices do arquivo, se ainda não existirem."""
+    if ativo() and bind.dialect.name == "sqlite":
+        metadados.create_all(bind)
+
+
+# ============================================================
+# 1. Movimentação para o arquivo
+# ============================================================
+
+def arquivar_lote(db: Session, ids: List[int]) -> int:
+    """
+    Move as manutenções informadas (e os seus documentos) para o arquivo.
+    Faz dois commits: a cópia e, depois, a exclusão do banco principal.
+    A exclusão se limita aos documentos copiados e às manutenções que
+    ficaram sem documentos; as demais são movidas na próxima chamada.
+    Retorna o número de manutenções movidas.
+    """
+    M, D, A = models.Manutencao, models.Documento, DocumentoArquivado
+    db.execute(insert(ManutencaoArquivada).prefix_with("OR REPLACE").from_select(
+        [c.name for c in ManutencaoArquivada.columns], select(M.__table__).where(M.id.in_(ids))
+    ))
+    db.execute(insert(DocumentoArquivado).prefix_with("OR REPLACE").from_select(
+        [c.name for c in DocumentoArquivado.columns], select(D.__table__).where(D.manutencao_id.in_(ids))
+    ))
+    db.commit()
+    # Documentos enviados depois da cópia seguram a manutenção no banco principal
+    copiados = select(A.c.id).where(A.c.manutencao_id.in_(ids))
+    db.execute(delete(D).where(D.manutencao_id.in_(ids), D.id.in_(copiados)))
+    movidas = db.execute(delete(M).where(M.id.in_(ids), ~exists().where(D.manutencao_id == M.id))).rowcount
+    db.commit()
+    return movidas
+
+
+def arquivar(corte: date, lote: int = ARQUIVO_LOTE, pausa_ms: float = ARQUIVO_PAUSA_MS, sessoes=None) -> int:
+    """
+    Move para o arquivo as manutenções com data anterior a corte, `lote`
+    por vez, com uma pausa entre os lotes para não segurar o bloqueio de
+    escrita. Retorna o total de manutenções movidas.
+    """
+    global _maior_id
+    if sessoes is None:
+        from app.database import SessionLocal as sessoes
+
+    M = models.Manutencao
+    consulta = select(M.id).where(M.data < corte).order_by(M.id).limit(lote)
+    total = 0
+    while True:
+        with sessoes() as db:
+            ids = list(db.scalars(consulta))
+            if not ids:
+                break
+            total += arquivar_lote(db, ids)
+        time.sleep(pausa_ms / 1000)
+    _maior_id = (None, 0)
+    if total:
+        with sessoes() as db:
+            # Atualiza as estatísticas do planejador para as tabelas que encolheram
+            db.execute(text("PRAGMA optimize"))
+    return total
+
+
+# ============================================================
+# 2. Leituras (chamadas por crud.py)
+# ============================================================
+
+def buscar_manutencoes(db: Session, ids: List[int]) -> dict:
+    """Manutenções arquivadas com os ids informados. Retorna {id: linha}."""
+    A = ManutencaoArquivada
+    return {linha.id: linha for linha in db.execute(select(A).where(A.c.id.in_(ids)))}
+
+
+def buscar_documentos(db: Session, ids: List[int]) -> dict:
+    """Documentos arquivados com os ids informados. Retorna {id: linha}."""
+    A = DocumentoArquivado
+    return {linha.id: linha for linha in db.execute(select(A).where(A.c.id.in_(ids)))}
+
+
+def assinatura_arquivo() -> tuple:
+    """mtime e tamanho do banco de arquivo e do seu -wal: mudam a cada commit, de qualquer processo."""
+    partes = []
+    for caminho in (ARQUIVO_DB, ARQUIVO_DB + "-wal"):
+        try:
+            estado = os.stat(caminho)
+            partes.append((estado.st_mtime_ns, estado.st_size))
+        except FileNotFoundError:
+            partes.append(None)
+    return tuple(partes)
+
+
+def maior_id_guardado(assinatura: tuple):
+    """Maior id arquivado em memória, ou None se o arquivo mudou desde a leitura."""
+    guardada, valor = _maior_id
+    return valor if guardada == assinatura else None
+
+
+def guardar_maior_id(assinatura: tuple, valor) -> int:
+    """
+    Guarda o maior id lido com CONSULTA_MAIOR_ID (assinatura tomada antes
+    da consulta). Com arquivos alterados há menos de MARGEM_ASSINATURA_NS,
+    o valor não é reaproveitado: a próxima página consulta de novo.
+    """
+    global _maior_id
+    agora = time.time_ns()
+    recente = any(parte and agora - parte[0] < MARGEM_ASSINATURA_NS for parte in assinatura)
+    _maior_id = (None if recente else assinatura, valor or 0)
+    return _maior_id[1]
+
+
+def maior_id_arquivado(db: Session) -> int:
+    """Maior id de manutenção no arquivo (0 se vazio); só consulta o banco se o arquivo mudou."""
+    assinatura = assinatura_arquivo()
+    valor = maior_id_guardado(assinatura)
+    if valor is None:
+        valor = guardar_maior_id(assinatura, db.scalar(CONSULTA_MAIOR_ID))
+    return valor
+
+
+def consulta_pagina(linhas: list, apos_id: int, limite: int, colunas: List[str] = None):
+    """
+    Consulta das manutenções arquivadas no intervalo de uma página do banco
+    principal (em ordem de id). Se a página veio cheia, só o intervalo entre
+    apos_id e o último id dela: uma busca por faixa de rowid, vazia quando
+    não há nada arquivado ali.
+    colunas: nomes das colunas, quando a página é de linhas Core.
+    """
+    A = ManutencaoArquivada
+    # label: chaves str simples nas linhas (o caminho rápido serializa _asdict())
+    consulta = select(*(A.c[nome].label(nome) for nome in colunas or A.c.keys())).where(A.c.id > apos_id)
+    if len(linhas) >= limite:
+        consulta = consulta.where(A.c.id < linhas[-1].id)
+    return consulta.order_by(A.c.id).limit(limite)
+
+
+def juntar_pagina(linhas: list, arquivadas: list, limite: int) -> list:
+    """Intercala as duas listas em ordem de id (o banco principal prevalece) e corta no limite."""
+    if not arquivadas:
+        return linhas
+    ids = {linha.id for linha in linhas}
+    juntas = heapq.merge(linhas, [a for a in arquivadas if a.id not in ids], key=lambda linha: linha.id)
+    return list(juntas)[:limite]
+
+
+def completar_pagina(db: Session, linhas: list, apos_id: int, limite: int, colunas: List[str] = None) -> list:
+    """
+    Junta a uma página de manutenções do banco principal as arquivadas do
+    mesmo intervalo. Sem consulta ao arquivo se nada arquivado passa de apos_id.
+    """
+    if apos_id >= maior_id_arquivado(db):
+        return linhas
+    arquivadas = db.execute(consulta_pagina(linhas, apos_id, limite, colunas)).all()
+    return juntar_pagina(linhas, arquivadas, limite)
+
+
+def historico_do_veiculo(db: Session, veiculo_id: int) -> list:
+    """Manutenções arquivadas do veículo, cada uma com a lista dos seus documentos."""
+    A, D = ManutencaoArquivada, DocumentoArquivado
+    manutencoes = db.execute(select(A).where(A.c.veiculo_id == veiculo_id).order_by(A.c.id)).all()
+    if not manutencoes:
+        return []
+    documentos = {}
+    for documento in db.execute(
+        select(D).where(D.c.manutencao_id.in_([m.id for m in manutencoes])).order_by(D.c.id)
+    ):
+        documentos.setdefault(documento.manutencao_id, []).append(documento)
+    return [(manutencao, documentos.get(manutencao.id, [])) for manutencao in manutencoes]
+
+
+def consulta_exportacao(incluir_documentos: bool):
+    """Mesma consulta de crud.iterar_manutencoes_exportacao, sobre o arquivo."""
+    A, D = ManutencaoArquivada, DocumentoArquivado
+    colunas = [A.c.id, A.c.veiculo_id, A.c.data, A.c.km, A.c.tipo_manutencao,
+               A.c.descricao, A.c.custo, A.c.prestador_servico]
+    if not incluir_documentos:
+        return select(*colunas).order_by(A.c.id)
+    colunas += [D.c.id.label("documento_id"), D.c.nome_arquivo, D.c.tipo, D.c.caminho_arquivo]
+    return (
+        select(*colunas)
+        .outerjoin(D, D.c.manutencao_id == A.c.id)
+        .order_by(A.c.id, D.c.id)
+    )
+
+
+def ultimo_km_arquivado(veiculo_id, tipo_manutencao):
+    """Subconsulta correlacionada: maior km arquivado do veículo e tipo (ver crud._consulta_proximo_servico)."""
+    A = ManutencaoArquivada
+    return (
+        select(func.max(A.c.km))
+        .where(A.c.veiculo_id == veiculo_id, A.c.tipo_manutencao == tipo_manutencao)
+        .scalar_subquery()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move manutenções antigas para o banco de arquivo.")
+    parser.add_argument("--dias", type=int, default=ARQUIVO_DIAS,
+                        help=f"arquiva manutenções com mais de N dias (padrão {ARQUIVO_DIAS})")
+    parser.add_argument("--lote", type=int, default=ARQUIVO_LOTE, help="manutenções por transação")
+    args = parser.parse_args()
+    if not ativo():
+        parser.error("defina ARQUIVO_DB com o caminho do banco de arquivo")
+
+    from app.esquema import garantir_esquema
+
+    garantir_esquema()
+    corte = date.today() - timedelta(days=args.dias)
+    inicio = time.perf_counter()
+    movidas = arquivar(corte, args.lote)
+    print(f"{movidas} manutenção(ões) anteriores a {corte} arquivadas em {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# Módulo: busca.py
+"""
+Módulo: busca.py
+Busca textual no histórico de manutenções (SQLite FTS5).
+
+A tabela virtual manutencoes_fts indexa tipo_manutencao, descricao e
+prestador_servico de manutencoes, sem duplicar o texto (external
+content: o conteúdo continua só em manutencoes). Gatilhos mantêm o
+índice sincronizado em inserções, alterações e exclusões, inclusive
+nas feitas em lote ou diretamente no banco.
+
+O tokenizador unicode61 com remove_diacritics 2 ignora acentos e
+maiúsculas: "oleo" encontra "Troca de Óleo".
+
+Reconstrução do índice (bancos antigos ou após restaurar um backup):
+    python -m app.busca
+"""
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import get_engine
+
+TABELA = "manutencoes_fts"
+COLUNAS = ("tipo_manutencao", "descricao", "prestador_servico")
+
+# Pesos do bm25 por coluna: o tipo pesa mais que a descrição e o prestador
+PESOS = (3.0, 1.0, 1.0)
+
+_CAMPOS = ", ".join(COLUNAS)
+_NOVOS = ", ".join(f"new.{c}" for c in COLUNAS)
+_ANTIGOS = ", ".join(f"old.{c}" for c in COLUNAS)
+
+COMANDOS_CRIACAO = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA} USING fts5(
+        {_CAMPOS},
+        content='manutencoes', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS manutencoes_fts_ai AFTER INSERT ON manutencoes BEGIN
+        INSERT INTO {TABELA}(rowid, {_CAMPOS}) VALUES (new.id, {_NOVOS});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS manutencoes_fts_ad AFTER DELETE ON manutencoes BEGIN
+        INSERT INTO {TABELA}({TABELA}, rowid, {_CAMPOS}) VALUES ('delete', old.id, {_ANTIGOS});
+    END
+    """,
+    # Só reindexa quando uma coluna de texto muda (alterar km ou custo não custa nada)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS manutencoes_fts_au AFTER UPDATE OF {_CAMPOS} ON manutencoes BEGIN
+        INSERT INTO {TABELA}({TABELA}, rowid, {_CAMPOS}) VALUES ('delete', old.id, {_ANTIGOS});
+        INSERT INTO {TABELA}(rowid, {_CAMPOS}) VALUES (new.id, {_NOVOS});
+    END
+    """,
+)
+
+
+def disponivel(bind) -> bool:
+    """A busca textual usa FTS5 e só existe em bancos SQLite."""
+    return bind.dialect.name == "sqlite"
+
+
+def indice_existe(bind) -> bool:
+    """Verifica se a tabela virtual de busca já foi criada."""
+    with bind.connect() as conexao:
+        return conexao.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nome"), {"nome": TABELA}
+        ).first() is not None
+
+
+def criar_indice(bind=None):
+    """
+    Cria a tabela de busca e os gatilhos, se ainda não existirem.
+    Se a tabela for criada agora, ela é populada com as manutenções atuais.
+    """
+    bind = bind or get_engine()
+    if not disponivel(bind):
+        return
+    existia = indice_existe(bind)
+    with bind.begin() as conexao:
+        for comando in COMANDOS_CRIACAO:
+            conexao.execute(text(comando))
+    if not existia:
+        reconstruir(bind)
+
+
+def reconstruir(bind=None):
+    """Reconstrói o índice a partir de manutencoes e compacta seus segmentos."""
+    bind = bind or get_engine()
+    with bind.begin() as conexao:
+        conexao.execute(text(f"INSERT INTO {TABELA}({TABELA}) VALUES ('rebuild')"))
+        conexao.execute(text(f"INSERT INTO {TABELA}({TABELA}) VALUES ('optimize')"))
+
+
+def montar_consulta(termos: str) -> str:
+    """
+    Converte o texto digitado em uma consulta FTS5 segura: cada palavra
+    vira uma frase entre aspas (operadores e aspas do usuário perdem o
+    significado especial) e todas precisam aparecer. A última palavra
+    também casa por prefixo ("pastil" encontra "pastilha").
+    Retorna "" se não houver palavras.
+    """
+    palavras = ['"' + p.replace('"', '""') + '"' for p in termos.split()]
+    if palavras:
+        palavras[-1] += "*"
+    return " ".join(palavras)
+
+
+def buscar(db: Session, termos: str, veiculo_id: int = None, limite: int = 100, deslocamento: int = 0):
+    """
+    Manutenções que contêm os termos, da mais relevante (bm25) para a
+    menos relevante. Retorna linhas com as colunas de manutencoes e a
+    coluna relevancia (menor = mais relevante).
+    """
+    consulta = montar_consulta(termos)
+    if not consulta:
+        return []
+    filtro_veiculo = "AND m.veiculo_id = :veiculo_id" if veiculo_id is not None else ""
+    sql = text(f"""
+        SELECT m.id, m.veiculo_id, m.data, m.km, m.tipo_manutencao, m.descricao,
+               m.custo, m.prestador_servico,
+               bm25({TABELA}, {", ".join(map(str, PESOS))}) AS relevancia
+        FROM {TABELA}
+        JOIN manutencoes AS m ON m.id = {TABELA}.rowid
+        WHERE {TABELA} MATCH :consulta {filtro_veiculo}
+        ORDER BY relevancia, m.id
+        LIMIT :limite OFFSET :deslocamento
+    """)
+    parametros = {"consulta": consulta, "veiculo_id": veiculo_id, "limite": limite, "deslocamento": deslocamento}
+    return db.execute(sql, parametros).all()
+
+
+if __name__ == "__main__":
+    criar_indice()
+    reconstruir()
+    print("Índice de busca reconstruído.")
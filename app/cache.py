@@ -0,0 +1,107 @@
+# Módulo: cache.py
+"""
+Módulo: cache.py
+Cache em memória (LRU com expiração por tempo) para as consultas mais
+frequentes de crud.py. Cada processo/worker tem o seu próprio cache:
+as funções de escrita invalidam as entradas afetadas no processo atual,
+e o TTL limita por quanto tempo outro worker pode ver um dado antigo.
+Por isso, verificações que protegem uma escrita (ex.: o veículo de uma
+nova manutenção existe?) consultam o banco, não o cache.
+
+Preenchimento após leitura: guarde a geracao antes do SELECT e passe-a
+a definir. Se houver uma invalidação entre o SELECT e o definir (um
+commit concorrente), o valor lido é descartado em vez de voltar ao
+cache por todo o TTL.
+
+Configuração por variáveis de ambiente:
+- CACHE_TAMANHO: número máximo de entradas por cache (padrão 10000)
+- CACHE_TTL: validade de cada entrada em segundos (padrão 60)
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Marcador de "não está no cache" (None é um valor válido para guardar)
+AUSENTE = object()
+
+
+class CacheLRU:
+    """Cache LRU com TTL, seguro para uso entre threads."""
+
+    def __init__(self, nome: str, tamanho_maximo: int = 10000, ttl: float = 60.0):
+        self.nome = nome
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self._dados = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.geracao = 0  # incrementada a cada invalidação
+
+    def obter(self, chave):
+        """Retorna o valor guardado ou AUSENTE se não existir/expirou."""
+        agora = time.monotonic()
+        with self._trava:
+            item = self._dados.get(chave)
+            if item is None or item[0] < agora:
+                if item is not None:
+                    del self._dados[chave]
+                self.falhas += 1
+                return AUSENTE
+            self._dados.move_to_end(chave)
+            self.acertos += 1
+            return item[1]
+
+    def definir(self, chave, valor, geracao: int = None):
+        """
+        Guarda um valor, descartando o menos usado se o cache estiver cheio.
+        geracao: valor de self.geracao lido antes de consultar o banco; se
+        houve invalidação desde então, o valor (possivelmente antigo) não é guardado.
+        """
+        expira_em = time.monotonic() + self.ttl
+        with self._trava:
+            if geracao is not None and geracao != self.geracao:
+                return
+            self._dados[chave] = (expira_em, valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.tamanho_maximo:
+                self._dados.popitem(last=False)
+
+    def invalidar(self, chave):
+        """Remove uma entrada (sem erro se ela não existir)."""
+        with self._trava:
+            self._dados.pop(chave, None)
+            self.geracao += 1
+
+    def limpar(self):
+        """Remove todas as entradas e zera os contadores."""
+        with self._trava:
+            self._dados.clear()
+            self.geracao += 1
+            self.acertos = 0
+            self.falhas = 0
+
+    def estatisticas(self) -> dict:
+        """Contadores de uso do cache."""
+        with self._trava:
+            return {
+                "nome": self.nome,
+                "entradas": len(self._dados),
+                "tamanho_maximo": self.tamanho_maximo,
+                "ttl": self.ttl,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+            }
+
+
+CACHE_TAMANHO = int(os.getenv("CACHE_TAMANHO", 10000))
+CACHE_TTL = float(os.getenv("CACHE_TTL", 60))
+
+# Veículos por id (somente veículos existentes são guardados)
+cache_veiculos = CacheLRU("veiculos", CACHE_TAMANHO, CACHE_TTL)
+# Usuários por e-mail (guarda também "não encontrado", usado no cadastro)
+cache_usuarios_email = CacheLRU("usuarios_email", CACHE_TAMANHO, CACHE_TTL)
+
+CACHES = [cache_veiculos, cache_usuarios_email]
@@ -1,26 +1,62 @@
-from sqlalchemy.orm import Session
-from app import models, schemas
+import heapq
+import math
+from datetime import date, timedelta
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List
+from app import arquivamento, busca, exclusao, models, odometro, resumos, schemas, versoes
+from app.cache import AUSENTE, cache_usuarios_email, cache_veiculos
+from app.database import executar_comandos
 
 # ============================================================
 # 1. CRUD de USUÁRIO
 # ============================================================
 
-def criar_usuario(db: Session, usuario: schemas.UsuarioCreate):
-    """Cria um novo usuário no banco."""
+def criar_usuario(db: Session, usuario: schemas.UsuarioCreate, senha_hash: str):
+    """Cria um novo usuário no banco (senha_hash: ver seguranca.gerar_hash_senha)."""
     novo_usuario = models.Usuario(
         nome=usuario.nome,
         email=usuario.email,
-        senha_hash=usuario.senha  # Em produção, utilize gerar_hash_senha(usuario.senha)
+        senha_hash=senha_hash,
     )
     db.add(novo_usuario)
+    aplicar_efeitos_insercao(db, [novo_usuario])
     db.commit()
     db.refresh(novo_usuario)
+    # O e-mail pode estar no cache como "não encontrado"
+    cache_usuarios_email.invalidar(novo_usuario.email)
     return novo_usuario
 
 
-def listar_usuarios(db: Session):
-    """Retorna todos os usuários cadastrados."""
-    return db.query(models.Usuario).all()
+def listar_usuarios(db: Session, apos_id: int = 0, limite: int = 100):
+    """Retorna os usuários cadastrados com id maior que apos_id, em ordem de id (paginação keyset)."""
+    return (
+        db.query(models.Usuario)
+        .filter(models.Usuario.id > apos_id)
+        .order_by(models.Usuario.id)
+        .limit(limite)
+        .all()
+    )
+
+
+def buscar_por_ids(db: Session, modelo, ids: List[int]) -> dict:
+    """Busca vários registros de um modelo com uma única consulta IN. Retorna {id: registro}."""
+    return {registro.id: registro for registro in db.scalars(select(modelo).where(modelo.id.in_(ids)))}
+
+
+def listar_linhas(db: Session, modelo, schema, apos_id: int = 0, limite: int = 100):
+    """
+    Variante de listar_* para o caminho rápido de serialização: seleciona
+    só as colunas do schema de resposta, na ordem dos campos do schema,
+    e devolve linhas Core (tuplas nomeadas) em vez de objetos ORM.
+    """
+    colunas = [getattr(modelo, campo) for campo in schema.__fields__]
+    linhas = db.execute(
+        select(*colunas).where(modelo.id > apos_id).order_by(modelo.id).limit(limite)
+    ).all()
+    if modelo is models.Manutencao and arquivamento.ativo():
+        return arquivamento.completar_pagina(db, linhas, apos_id, limite, list(schema.__fields__))
+    return linhas
 
 
 def buscar_usuario_por_email(db: Session, email: str):
@@ -28,6 +64,25 @@ def buscar_usuario_por_email(db: Session, email: str):
     return db.query(models.Usuario).filter(models.Usuario.email == email).first()
 
 
+def buscar_usuario_por_id(db: Session, usuario_id: int):
+    """Busca um usuário pelo ID."""
+    return db.get(models.Usuario, usuario_id)
+
+
+def obter_usuario_por_email(db: Session, email: str):
+    """
+    Versão com cache de buscar_usuario_por_email, para leitura e
+    verificação de existência. Retorna UsuarioResponse ou None.
+    """
+    usuario = cache_usuarios_email.obter(email)
+    if usuario is AUSENTE:
+        geracao = cache_usuarios_email.geracao
+        encontrado = buscar_usuario_por_email(db, email)
+        usuario = schemas.UsuarioResponse.from_orm(encontrado) if encontrado else None
+        cache_usuarios_email.definir(email, usuario, geracao)
+    return usuario
+
+
 # ============================================================
 # 2. CRUD de VEÍCULO
 # ============================================================
@@ -36,14 +91,22 @@ def criar_veiculo(db: Session, veiculo: schemas.VeiculoCreate):
     """Cria um novo veículo vinculado a um usuário."""
     novo_veiculo = models.Veiculo(**veiculo.dict())
     db.add(novo_veiculo)
+    db.flush()  # gera o id, usado na chave de versão e na leitura de odômetro
+    aplicar_efeitos_insercao(db, [novo_veiculo])
     db.commit()
     db.refresh(novo_veiculo)
     return novo_veiculo
 
 
-def listar_veiculos(db: Session):
-    """Lista todos os veículos cadastrados."""
-    return db.query(models.Veiculo).all()
+def listar_veiculos(db: Session, apos_id: int = 0, limite: int = 100):
+    """Lista os veículos cadastrados com id maior que apos_id, em ordem de id (paginação keyset)."""
+    return (
+        db.query(models.Veiculo)
+        .filter(models.Veiculo.id > apos_id)
+        .order_by(models.Veiculo.id)
+        .limit(limite)
+        .all()
+    )
 
 
 def buscar_veiculo_por_id(db: Session, veiculo_id: int):
@@ -51,28 +114,137 @@ def buscar_veiculo_por_id(db: Session, veiculo_id: int):
     return db.query(models.Veiculo).filter(models.Veiculo.id == veiculo_id).first()
 
 
+def obter_veiculo(db: Session, veiculo_id: int):
+    """
+    Versão com cache de buscar_veiculo_por_id, para leitura.
+    Retorna VeiculoResponse ou None.
+    Para alterar o veículo, ou conferir que ele existe antes de gravar
+    algo que o referencia, use buscar_veiculo_por_id: o cache de outro
+    worker pode guardar um veículo já excluído até o TTL.
+    """
+    veiculo = cache_veiculos.obter(veiculo_id)
+    if veiculo is AUSENTE:
+        geracao = cache_veiculos.geracao
+        encontrado = buscar_veiculo_por_id(db, veiculo_id)
+        if not encontrado:
+            return None
+        veiculo = schemas.VeiculoResponse.from_orm(encontrado)
+        cache_veiculos.definir(veiculo_id, veiculo, geracao)
+    return veiculo
+
+
+def buscar_veiculos_por_ids(db: Session, ids: List[int]) -> dict:
+    """
+    Versão em lote de obter_veiculo: usa o cache e busca os ausentes
+    com uma única consulta IN. Retorna {id: VeiculoResponse}.
+    """
+    veiculos, faltantes = {}, []
+    for veiculo_id in ids:
+        veiculo = cache_veiculos.obter(veiculo_id)
+        if veiculo is AUSENTE:
+            faltantes.append(veiculo_id)
+        else:
+            veiculos[veiculo_id] = veiculo
+    if faltantes:
+        geracao = cache_veiculos.geracao
+        for veiculo_id, encontrado in buscar_por_ids(db, models.Veiculo, faltantes).items():
+            veiculo = veiculos[veiculo_id] = schemas.VeiculoResponse.from_orm(encontrado)
+            cache_veiculos.definir(veiculo_id, veiculo, geracao)
+    return veiculos
+
+
+def buscar_veiculo_completo(db: Session, veiculo_id: int):
+    """
+    Busca um veículo com dono, planos, manutenções e documentos já
+    carregados. Usa no máximo 4 consultas, independente do tamanho do
+    histórico: veículo + usuário (JOIN), planos, manutenções e
+    documentos (cada um com SELECT ... WHERE ... IN).
+    Com o arquivo ativo, inclui as manutenções arquivadas (mais 2 consultas).
+    """
+    veiculo = (
+        db.query(models.Veiculo)
+        .options(
+            joinedload(models.Veiculo.usuario),
+            selectinload(models.Veiculo.planos),
+            selectinload(models.Veiculo.manutencoes).selectinload(models.Manutencao.documentos),
+        )
+        .filter(models.Veiculo.id == veiculo_id)
+        .first()
+    )
+    if not veiculo or not arquivamento.ativo():
+        return veiculo
+    arquivadas = arquivamento.historico_do_veiculo(db, veiculo_id)
+    if not arquivadas:
+        return veiculo
+    completo = schemas.VeiculoCompleto.from_orm(veiculo)
+    ids = {m.id for m in completo.manutencoes}
+    completo.manutencoes = sorted([*completo.manutencoes, *(
+        schemas.ManutencaoComDocumentos(
+            **manutencao._mapping, documentos=[schemas.DocumentoResponse.from_orm(d) for d in documentos]
+        )
+        for manutencao, documentos in arquivadas if manutencao.id not in ids
+    )], key=lambda m: m.id)
+    return completo
+
+
 def atualizar_veiculo(db: Session, veiculo_id: int, dados: schemas.VeiculoBase):
-    """Atualiza os dados de um veículo existente."""
+    """Atualiza os dados de um veículo existente (mudanças de km entram no histórico)."""
     veiculo = buscar_veiculo_por_id(db, veiculo_id)
     if not veiculo:
         return None
+    km_anterior = veiculo.km_atual
     for campo, valor in dados.dict(exclude_unset=True).items():
         setattr(veiculo, campo, valor)
+    versoes.incrementar(db, versoes.chaves_de(veiculo))
+    if veiculo.km_atual != km_anterior:
+        odometro.registrar(db, odometro.leituras_de_veiculo(veiculo))
     db.commit()
     db.refresh(veiculo)
+    cache_veiculos.invalidar(veiculo_id)
     return veiculo
 
 
 def excluir_veiculo(db: Session, veiculo_id: int):
-    """Remove um veículo do banco."""
+    """Remove um veículo e, em cascata, tudo o que depende dele (ver exclusao.py)."""
     veiculo = buscar_veiculo_por_id(db, veiculo_id)
     if not veiculo:
         return None
-    db.delete(veiculo)
+    db.expunge(veiculo)  # mantém os dados carregados para a resposta
+    exclusao.excluir_veiculos(db, [veiculo_id])
     db.commit()
+    exclusao.invalidar_cache([veiculo_id])
     return veiculo
 
 
+def excluir_veiculos(db: Session, ids: List[int]):
+    """
+    Remove vários veículos e os seus dependentes em uma única transação.
+    Retorna (ids excluídos, {tabela: registros excluídos}).
+    """
+    excluidos, contagem = exclusao.excluir_veiculos(db, ids)
+    db.commit()
+    exclusao.invalidar_cache(excluidos)
+    return excluidos, contagem
+
+
+def excluir_frota(db: Session, usuario_id: int):
+    """
+    Remove todos os veículos de um usuário, uma transação por bloco de
+    exclusao.BLOCO_IN veículos, para não segurar o bloqueio de escrita
+    durante a frota inteira. Retorna (ids excluídos, {tabela: registros excluídos}).
+    """
+    ids = list(db.scalars(
+        select(models.Veiculo.id).where(models.Veiculo.usuario_id == usuario_id).order_by(models.Veiculo.id)
+    ))
+    excluidos, contagem = [], {}
+    for inicio in range(0, len(ids), exclusao.BLOCO_IN):
+        bloco, contagem_bloco = excluir_veiculos(db, ids[inicio:inicio + exclusao.BLOCO_IN])
+        excluidos += bloco
+        for tabela, quantidade in contagem_bloco.items():
+            contagem[tabela] = contagem.get(tabela, 0) + quantidade
+    return excluidos, contagem
+
+
 # ============================================================
 # 3. CRUD de MANUTENÇÃO
 # ============================================================
@@ -81,31 +253,159 @@ def criar_manutencao(db: Session, manutencao: schemas.ManutencaoCreate):
     """Cria um registro de manutenção."""
     nova_manutencao = models.Manutencao(**manutencao.dict())
     db.add(nova_manutencao)
+    aplicar_efeitos_insercao(db, [nova_manutencao])
     db.commit()
     db.refresh(nova_manutencao)
     return nova_manutencao
 
 
-def listar_manutencoes(db: Session):
-    """Lista todas as manutenções."""
-    return db.query(models.Manutencao).all()
+def criar_manutencoes_em_lote(db: Session, manutencoes: List[schemas.ManutencaoCreate]):
+    """
+    Cria várias manutenções em uma única transação.
+    - Valida todos os veiculo_id com uma consulta IN.
+    - Insere as válidas com um INSERT em lote (executemany + RETURNING).
+    Retorna uma lista paralela à entrada com o id criado, ou None
+    quando o veículo da manutenção não existe.
+    """
+    veiculos_informados = list({m.veiculo_id for m in manutencoes})
+    existentes = set()
+    # Divide o IN em blocos para respeitar o limite de parâmetros do SQLite
+    for inicio in range(0, len(veiculos_informados), 900):
+        bloco = veiculos_informados[inicio:inicio + 900]
+        existentes.update(
+            db.scalars(select(models.Veiculo.id).where(models.Veiculo.id.in_(bloco)))
+        )
+
+    validas = [m.dict() for m in manutencoes if m.veiculo_id in existentes]
+    novos_ids = iter([])
+    if validas:
+        novos_ids = iter(db.scalars(
+            insert(models.Manutencao).returning(models.Manutencao.id, sort_by_parameter_order=True),
+            validas,
+        ).all())
+        resumos.aplicar_ajustes(db, resumos.agrupar(validas))
+        versoes.incrementar(
+            db, ["manutencoes"] + [versoes.chave_veiculo(m["veiculo_id"]) for m in validas]
+        )
+        odometro.registrar(db, odometro.leituras_de_manutencoes(validas))
+        db.commit()
+    return [next(novos_ids) if m.veiculo_id in existentes else None for m in manutencoes]
+
+
+def listar_manutencoes(db: Session, apos_id: int = 0, limite: int = 100):
+    """
+    Lista as manutenções com id maior que apos_id, em ordem de id (paginação keyset).
+    Inclui as arquivadas do mesmo intervalo (ver arquivamento.completar_pagina).
+    """
+    manutencoes = (
+        db.query(models.Manutencao)
+        .filter(models.Manutencao.id > apos_id)
+        .order_by(models.Manutencao.id)
+        .limit(limite)
+        .all()
+    )
+    if arquivamento.ativo():
+        return arquivamento.completar_pagina(db, manutencoes, apos_id, limite)
+    return manutencoes
 
 
 def buscar_manutencao_por_id(db: Session, manutencao_id: int):
-    """Busca uma manutenção específica."""
-    return db.query(models.Manutencao).filter(models.Manutencao.id == manutencao_id).first()
+    """
+    Busca uma manutenção específica. Se não estiver no banco principal,
+    procura no arquivo (retorna a linha arquivada, ver esta_arquivada).
+    """
+    manutencao = db.query(models.Manutencao).filter(models.Manutencao.id == manutencao_id).first()
+    if manutencao is None and arquivamento.ativo():
+        return arquivamento.buscar_manutencoes(db, [manutencao_id]).get(manutencao_id)
+    return manutencao
+
+
+def esta_arquivada(registro) -> bool:
+    """Indica se um registro retornado por buscar_*_por_id veio do arquivo (somente leitura)."""
+    return not isinstance(registro, (models.Manutencao, models.Documento))
+
+
+def buscar_manutencoes_por_ids(db: Session, ids: List[int]) -> dict:
+    """
+    Busca várias manutenções com uma única consulta IN. Retorna {id: manutenção}.
+    Só os ids ausentes do banco principal são procurados no arquivo.
+    """
+    encontradas = buscar_por_ids(db, models.Manutencao, ids)
+    faltantes = [i for i in ids if i not in encontradas]
+    if faltantes and arquivamento.ativo():
+        encontradas.update(arquivamento.buscar_manutencoes(db, faltantes))
+    return encontradas
+
+
+def buscar_manutencoes_por_texto(db: Session, termos: str, veiculo_id: int = None,
+                                 limite: int = 100, deslocamento: int = 0):
+    """Busca textual (FTS5) em tipo, descrição e prestador, por relevância."""
+    return busca.buscar(db, termos, veiculo_id, limite, deslocamento)
+
+
+def iterar_manutencoes_exportacao(db: Session, incluir_documentos: bool = False, lote: int = 1000):
+    """
+    Percorre todas as manutenções em ordem de id usando cursor no servidor
+    (yield_per), sem carregar a tabela inteira em memória.
+    Com incluir_documentos, faz LEFT JOIN com documentos: uma linha por
+    par manutenção/documento (ou uma linha com colunas nulas se não houver).
+    """
+    colunas = [
+        models.Manutencao.id,
+        models.Manutencao.veiculo_id,
+        models.Manutencao.data,
+        models.Manutencao.km,
+        models.Manutencao.tipo_manutencao,
+        models.Manutencao.descricao,
+        models.Manutencao.custo,
+        models.Manutencao.prestador_servico,
+    ]
+    if incluir_documentos:
+        colunas += [
+            models.Documento.id.label("documento_id"),
+            models.Documento.nome_arquivo,
+            models.Documento.tipo,
+            models.Documento.caminho_arquivo,
+        ]
+    consulta = select(*colunas)
+    if incluir_documentos:
+        consulta = consulta.outerjoin(
+            models.Documento, models.Documento.manutencao_id == models.Manutencao.id
+        ).order_by(models.Manutencao.id, models.Documento.id)
+    else:
+        consulta = consulta.order_by(models.Manutencao.id)
+    linhas = db.execute(consulta.execution_options(yield_per=lote))
+    if not arquivamento.ativo():
+        return linhas
+    # Intercala as manutenções arquivadas, também em ordem de id
+    arquivadas = db.execute(
+        arquivamento.consulta_exportacao(incluir_documentos).execution_options(yield_per=lote)
+    )
+    return heapq.merge(linhas, arquivadas, key=lambda linha: linha.id)
 
 
 def excluir_manutencao(db: Session, manutencao_id: int):
-    """Exclui uma manutenção."""
+    """Exclui uma manutenção (do banco principal ou do arquivo) e os seus documentos."""
     manutencao = buscar_manutencao_por_id(db, manutencao_id)
     if manutencao:
-        db.delete(manutencao)
+        if not esta_arquivada(manutencao):
+            db.expunge(manutencao)  # mantém os dados carregados para a resposta
+        exclusao.excluir_manutencoes(db, [manutencao_id])
         db.commit()
         return manutencao
     return None
 
 
+def excluir_manutencoes(db: Session, ids: List[int]):
+    """
+    Exclui várias manutenções e os seus documentos em uma única transação.
+    Retorna (ids excluídos, {tabela: registros excluídos}).
+    """
+    excluidos, contagem = exclusao.excluir_manutencoes(db, ids)
+    db.commit()
+    return excluidos, contagem
+
+
 # ============================================================
 # 4. CRUD de DOCUMENTOS
 # ============================================================
@@ -114,11 +414,20 @@ def criar_documento(db: Session, documento: schemas.DocumentoCreate):
     """Salva o registro de um documento vinculado a uma manutenção."""
     novo_documento = models.Documento(**documento.dict())
     db.add(novo_documento)
+    aplicar_efeitos_insercao(db, [novo_documento])
     db.commit()
     db.refresh(novo_documento)
     return novo_documento
 
 
+def buscar_documento_por_id(db: Session, documento_id: int):
+    """Busca um documento pelo ID (no banco principal ou, se ausente, no arquivo)."""
+    documento = db.query(models.Documento).filter(models.Documento.id == documento_id).first()
+    if documento is None and arquivamento.ativo():
+        return arquivamento.buscar_documentos(db, [documento_id]).get(documento_id)
+    return documento
+
+
 def listar_documentos(db: Session):
     """Lista todos os documentos cadastrados."""
     return db.query(models.Documento).all()
@@ -128,6 +437,7 @@ def excluir_documento(db: Session, documento_id: int):
     """Remove um documento."""
     doc = db.query(models.Documento).filter(models.Documento.id == documento_id).first()
     if doc:
+        versoes.incrementar(db, versoes.chaves_de(doc))
         db.delete(doc)
         db.commit()
         return doc
@@ -142,21 +452,268 @@ def criar_plano(db: Session, plano: schemas.PlanoManutencaoCreate):
     """Cria um plano de manutenção para um veículo."""
     novo_plano = models.PlanoManutencao(**plano.dict())
     db.add(novo_plano)
+    aplicar_efeitos_insercao(db, [novo_plano])
     db.commit()
     db.refresh(novo_plano)
     return novo_plano
 
 
-def listar_planos(db: Session):
-    """Lista todos os planos de manutenção."""
-    return db.query(models.PlanoManutencao).all()
+def listar_planos(db: Session, apos_id: int = 0, limite: int = 100):
+    """Lista os planos de manutenção com id maior que apos_id, em ordem de id (paginação keyset)."""
+    return (
+        db.query(models.PlanoManutencao)
+        .filter(models.PlanoManutencao.id > apos_id)
+        .order_by(models.PlanoManutencao.id)
+        .limit(limite)
+        .all()
+    )
+
+
+def buscar_planos_por_ids(db: Session, ids: List[int]) -> dict:
+    """Busca vários planos com uma única consulta IN. Retorna {id: plano}."""
+    return buscar_por_ids(db, models.PlanoManutencao, ids)
+
+
+def _consulta_proximo_servico():
+    """
+    Consulta base dos planos com o km do próximo serviço.
+    Retorna (consulta, expressão km_restante).
+
+    km_referencia é tratado como intervalo: o próximo serviço vence em
+    (km da última manutenção do mesmo tipo) + km_referencia, ou em
+    km_referencia se o serviço nunca foi feito. O tipo da manutenção
+    é associado ao plano quando tipo_manutencao == nome_plano.
+    """
+    Manutencao, Plano, Veiculo = models.Manutencao, models.PlanoManutencao, models.Veiculo
+
+    # Última km do mesmo tipo, por plano: subconsulta correlacionada
+    # resolvida no índice ix_manutencoes_veiculo_tipo_km. Com filtro por
+    # usuário ou veículo, só os planos selecionados são calculados (um
+    # GROUP BY materializado percorreria todas as manutenções).
+    ultimo_km = (
+        select(func.max(Manutencao.km))
+        .where(Manutencao.veiculo_id == Plano.veiculo_id, Manutencao.tipo_manutencao == Plano.nome_plano)
+        .scalar_subquery()
+    )
+    if arquivamento.ativo():
+        # coalesce só avalia o arquivo quando o serviço não consta no banco principal
+        ultimo_km = func.coalesce(ultimo_km, arquivamento.ultimo_km_arquivado(Plano.veiculo_id, Plano.nome_plano))
+    km_atual = func.coalesce(Veiculo.km_atual, 0)
+    proximo_km = func.coalesce(ultimo_km, 0) + Plano.km_referencia
+    km_restante = proximo_km - km_atual
+
+    consulta = (
+        select(
+            Plano.id.label("plano_id"),
+            Plano.veiculo_id,
+            Veiculo.placa,
+            Plano.nome_plano,
+            Plano.km_referencia,
+            km_atual.label("km_atual"),
+            ultimo_km.label("ultimo_km"),
+            proximo_km.label("proximo_km"),
+            km_restante.label("km_restante"),
+        )
+        .join(Veiculo, Veiculo.id == Plano.veiculo_id)
+        .where(Plano.km_referencia.isnot(None))
+    )
+    return consulta, km_restante
+
+
+def listar_planos_vencidos(db: Session, margem_km: int = 0, usuario_id: int = None,
+                           limite: int = 1000, deslocamento: int = 0):
+    """
+    Calcula, para a frota inteira e em uma única consulta, os planos
+    vencidos ou que vencem em até margem_km quilômetros.
+    """
+    consulta, km_restante = _consulta_proximo_servico()
+    consulta = (
+        consulta.where(km_restante <= margem_km)
+        .order_by(km_restante, models.PlanoManutencao.id)
+        .limit(limite)
+        .offset(deslocamento)
+    )
+    if usuario_id is not None:
+        consulta = consulta.where(models.Veiculo.usuario_id == usuario_id)
+    return db.execute(consulta).all()
+
+
+def prever_planos(db: Session, usuario_id: int = None, veiculo_id: int = None,
+                  janela_dias: int = 365, hoje: date = None) -> list:
+    """
+    Prevê a data em que cada plano atinge o km do próximo serviço, a
+    partir do km por dia de cada veículo (leituras dos últimos
+    janela_dias, ver odometro.ajustar_km_por_dia). Duas consultas no
+    total: planos e leituras. Retorna dicionários no formato de
+    schemas.PrevisaoPlano, ordenados pela data prevista.
+    """
+    hoje = hoje or date.today()
+    Leitura, Veiculo = models.LeituraOdometro, models.Veiculo
+
+    consulta, _ = _consulta_proximo_servico()
+    leituras = select(Leitura.veiculo_id, Leitura.data, Leitura.km).where(
+        Leitura.data >= hoje - timedelta(days=janela_dias)
+    )
+    if usuario_id is not None:
+        consulta = consulta.where(Veiculo.usuario_id == usuario_id)
+        leituras = leituras.join(Veiculo, Veiculo.id == Leitura.veiculo_id).where(Veiculo.usuario_id == usuario_id)
+    if veiculo_id is not None:
+        consulta = consulta.where(models.PlanoManutencao.veiculo_id == veiculo_id)
+        leituras = leituras.where(Leitura.veiculo_id == veiculo_id)
+
+    planos = db.execute(consulta).all()
+    ajustes = odometro.ajustar_km_por_dia(*odometro.ler_leituras(db, leituras)) if planos else {}
+
+    previsoes = []
+    for plano in planos:
+        km_por_dia, km_lido, dia_lido = ajustes.get(plano.veiculo_id, (None, 0, None))
+        km_base = max(plano.km_atual, km_lido)
+        if plano.proximo_km <= km_base:
+            situacao, data_prevista = "vencido", None
+        elif km_por_dia:
+            # Projeta a partir do dia da leitura mais recente do veículo
+            dias = math.ceil((plano.proximo_km - km_base) / km_por_dia)
+            situacao, data_prevista = "previsto", odometro.EPOCA + timedelta(days=dia_lido + dias)
+        else:
+            situacao, data_prevista = "sem_dados", None
+        previsoes.append({
+            "plano_id": plano.plano_id,
+            "veiculo_id": plano.veiculo_id,
+            "placa": plano.placa,
+            "nome_plano": plano.nome_plano,
+            "proximo_km": plano.proximo_km,
+            "km_atual": km_base,
+            "km_por_dia": round(km_por_dia, 2) if km_por_dia else None,
+            "data_prevista": data_prevista,
+            "situacao": situacao,
+        })
+    previsoes.sort(key=lambda p: (p["data_prevista"] or date.max, p["plano_id"]))
+    return previsoes
 
 
 def excluir_plano(db: Session, plano_id: int):
     """Exclui um plano de manutenção."""
     plano = db.query(models.PlanoManutencao).filter(models.PlanoManutencao.id == plano_id).first()
     if plano:
+        versoes.incrementar(db, versoes.chaves_de(plano))
         db.delete(plano)
         db.commit()
         return plano
     return None
+
+
+# ============================================================
+# 6. CONSULTAS DE CUSTOS (via resumo_custos)
+# ============================================================
+
+def _consulta_resumo(colunas, veiculo_id: int = None, usuario_id: int = None):
+    """Monta a consulta agregada sobre o resumo com os filtros informados."""
+    consulta = select(
+        *colunas,
+        func.coalesce(func.sum(models.ResumoCusto.total), 0).label("total"),
+        func.coalesce(func.sum(models.ResumoCusto.quantidade), 0).label("quantidade"),
+    )
+    if veiculo_id is not None:
+        consulta = consulta.where(models.ResumoCusto.veiculo_id == veiculo_id)
+    if usuario_id is not None:
+        consulta = consulta.join(
+            models.Veiculo, models.Veiculo.id == models.ResumoCusto.veiculo_id
+        ).where(models.Veiculo.usuario_id == usuario_id)
+    return consulta
+
+
+def total_custos(db: Session, veiculo_id: int = None, usuario_id: int = None):
+    """Custo total e quantidade de manutenções (de um veículo ou de um usuário)."""
+    return db.execute(_consulta_resumo([], veiculo_id, usuario_id)).one()
+
+
+def custos_por_mes(db: Session, veiculo_id: int = None, usuario_id: int = None):
+    """Custo e quantidade de manutenções agrupados por mês."""
+    mes = models.ResumoCusto.mes
+    return db.execute(
+        _consulta_resumo([mes], veiculo_id, usuario_id).group_by(mes).order_by(mes)
+    ).all()
+
+
+def custos_por_tipo(db: Session, veiculo_id: int = None, usuario_id: int = None):
+    """Custo e quantidade de manutenções agrupados por tipo de manutenção."""
+    tipo = models.ResumoCusto.tipo_manutencao
+    return db.execute(
+        _consulta_resumo([tipo], veiculo_id, usuario_id).group_by(tipo).order_by(tipo)
+    ).all()
+
+
+# ============================================================
+# 7. EFEITOS DAS INSERÇÕES (também usados por escrita.py)
+# ============================================================
+
+def comandos_efeitos_insercao(objetos: list):
+    """
+    Gerador dos comandos que acompanham a inserção dos objetos: versões
+    dos dados, resumo de custos e leituras de odômetro. Executado por
+    aplicar_efeitos_insercao e, em AsyncSession, por crud_async.
+    Veículos precisam ter id (após flush ou montados a partir do RETURNING).
+    """
+    yield from versoes.comandos_incrementar([chave for objeto in objetos for chave in versoes.chaves_de(objeto)])
+    manutencoes = [o for o in objetos if isinstance(o, models.Manutencao)]
+    if manutencoes:
+        yield from resumos.comandos_ajustes(resumos.agrupar(manutencoes))
+        yield from odometro.comandos_registrar(odometro.leituras_de_manutencoes(manutencoes))
+    yield from odometro.comandos_registrar([
+        leitura for o in objetos if isinstance(o, models.Veiculo) for leitura in odometro.leituras_de_veiculo(o)
+    ])
+
+
+def aplicar_efeitos_insercao(db: Session, objetos: list):
+    """Aplica os efeitos da inserção dos objetos na transação corrente (sem commit)."""
+    executar_comandos(db, comandos_efeitos_insercao(objetos))
+
+
+# ============================================================
+# 8. CONSULTAS DE RELATÓRIOS (ver relatorios.py)
+# ============================================================
+
+def listar_veiculos_do_relatorio(db: Session, usuario_id: int, veiculo_id: int = None) -> list:
+    """Veículos do usuário (ou só o informado), em ordem de id."""
+    consulta = select(models.Veiculo).where(models.Veiculo.usuario_id == usuario_id)
+    if veiculo_id is not None:
+        consulta = consulta.where(models.Veiculo.id == veiculo_id)
+    return list(db.scalars(consulta.order_by(models.Veiculo.id)))
+
+
+def _consulta_relatorio(manutencoes, documentos, usuario_id: int, veiculo_id: int, inicio: date, fim: date):
+    """Manutenções do período com o número de documentos, sobre as tabelas informadas."""
+    M = manutencoes.c
+    quantidade_documentos = (
+        select(func.count()).where(documentos.c.manutencao_id == M.id).scalar_subquery()
+    )
+    consulta = (
+        select(M.id, M.veiculo_id, M.data, M.km, M.tipo_manutencao, M.descricao, M.custo,
+               M.prestador_servico, quantidade_documentos.label("documentos"))
+        .join(models.Veiculo, models.Veiculo.id == M.veiculo_id)
+        .where(models.Veiculo.usuario_id == usuario_id, M.data >= inicio, M.data < fim)
+    )
+    if veiculo_id is not None:
+        consulta = consulta.where(M.veiculo_id == veiculo_id)
+    return consulta.order_by(M.veiculo_id, M.data, M.id)
+
+
+def iterar_manutencoes_relatorio(db: Session, usuario_id: int, inicio: date, fim: date,
+                                 veiculo_id: int = None, lote: int = 1000):
+    """
+    Percorre as manutenções dos veículos do usuário com data em
+    [inicio, fim), em ordem de veículo, data e id, com cursor no servidor
+    (yield_per). Com o arquivo ativo, intercala as manutenções arquivadas.
+    """
+    parametros = (usuario_id, veiculo_id, inicio, fim)
+    linhas = db.execute(
+        _consulta_relatorio(models.Manutencao.__table__, models.Documento.__table__, *parametros)
+        .execution_options(yield_per=lote)
+    )
+    if not arquivamento.ativo():
+        return linhas
+    arquivadas = db.execute(
+        _consulta_relatorio(arquivamento.ManutencaoArquivada, arquivamento.DocumentoArquivado, *parametros)
+        .execution_options(yield_per=lote)
+    )
+    return heapq.merge(linhas, arquivadas, key=lambda linha: (linha.veiculo_id, linha.data, linha.id))
@@ -0,0 +1,138 @@
+"""
+Módulo: crud_async.py
+Versões assíncronas (AsyncSession) das operações de crud.py usadas
+pelas rotas em routes/assincronas.py. Mantêm a mesma semântica das
+funções síncronas de mesmo nome.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import arquivamento, crud, models, schemas
+from app.cache import cache_usuarios_email
+from app.database import executar_comandos_async
+
+
+async def _salvar(db: AsyncSession, objeto):
+    """
+    Adiciona, confirma e recarrega um objeto recém-criado, com os mesmos
+    efeitos da inserção de crud.py (ver crud.comandos_efeitos_insercao).
+    """
+    db.add(objeto)
+    await db.flush()  # gera o id, usado nas chaves de versão e na leitura de odômetro
+    await executar_comandos_async(db, crud.comandos_efeitos_insercao([objeto]))
+    await db.commit()
+    await db.refresh(objeto)
+    return objeto
+
+
+async def _listar(db: AsyncSession, modelo, apos_id: int, limite: int):
+    """Consulta paginada por id (keyset), igual a crud.listar_*."""
+    resultado = await db.scalars(
+        select(modelo).where(modelo.id > apos_id).order_by(modelo.id).limit(limite)
+    )
+    return resultado.all()
+
+
+# ============================================================
+# 1. USUÁRIO
+# ============================================================
+
+async def criar_usuario(db: AsyncSession, usuario: schemas.UsuarioCreate, senha_hash: str):
+    """Cria um novo usuário no banco (senha_hash: ver seguranca.gerar_hash_senha)."""
+    novo_usuario = await _salvar(db, models.Usuario(
+        nome=usuario.nome,
+        email=usuario.email,
+        senha_hash=senha_hash,
+    ))
+    cache_usuarios_email.invalidar(novo_usuario.email)
+    return novo_usuario
+
+
+async def listar_usuarios(db: AsyncSession, apos_id: int = 0, limite: int = 100):
+    """Retorna os usuários com id maior que apos_id, em ordem de id."""
+    return await _listar(db, models.Usuario, apos_id, limite)
+
+
+async def buscar_usuario_por_id(db: AsyncSession, usuario_id: int):
+    """Busca um usuário pelo ID."""
+    return await db.get(models.Usuario, usuario_id)
+
+
+async def buscar_usuario_por_email(db: AsyncSession, email: str):
+    """Busca um usuário pelo e-mail."""
+    return await db.scalar(select(models.Usuario).where(models.Usuario.email == email).limit(1))
+
+
+# ============================================================
+# 2. VEÍCULO
+# ============================================================
+
+async def criar_veiculo(db: AsyncSession, veiculo: schemas.VeiculoCreate):
+    """Cria um novo veículo vinculado a um usuário."""
+    return await _salvar(db, models.Veiculo(**veiculo.dict()))
+
+
+async def listar_veiculos(db: AsyncSession, apos_id: int = 0, limite: int = 100):
+    """Lista os veículos com id maior que apos_id, em ordem de id."""
+    return await _listar(db, models.Veiculo, apos_id, limite)
+
+
+async def buscar_veiculo_por_id(db: AsyncSession, veiculo_id: int):
+    """Busca um veículo pelo ID."""
+    return await db.get(models.Veiculo, veiculo_id)
+
+
+# ============================================================
+# 3. MANUTENÇÃO
+# ============================================================
+
+async def criar_manutencao(db: AsyncSession, manutencao: schemas.ManutencaoCreate):
+    """Cria um registro de manutenção."""
+    return await _salvar(db, models.Manutencao(**manutencao.dict()))
+
+
+async def listar_manutencoes(db: AsyncSession, apos_id: int = 0, limite: int = 100):
+    """Lista as manutenções com id maior que apos_id, em ordem de id (incluindo as arquivadas)."""
+    manutencoes = await _listar(db, models.Manutencao, apos_id, limite)
+    if not arquivamento.ativo():
+        return manutencoes
+    assinatura = arquivamento.assinatura_arquivo()
+    maior_id = arquivamento.maior_id_guardado(assinatura)
+    if maior_id is None:
+        maior_id = arquivamento.guardar_maior_id(assinatura, await db.scalar(arquivamento.CONSULTA_MAIOR_ID))
+    if apos_id >= maior_id:
+        return manutencoes
+    arquivadas = (await db.execute(arquivamento.consulta_pagina(manutencoes, apos_id, limite))).all()
+    return arquivamento.juntar_pagina(manutencoes, arquivadas, limite)
+
+
+async def buscar_manutencao_por_id(db: AsyncSession, manutencao_id: int):
+    """Busca uma manutenção específica (no banco principal ou, se ausente, no arquivo)."""
+    manutencao = await db.get(models.Manutencao, manutencao_id)
+    if manutencao is None and arquivamento.ativo():
+        A = arquivamento.ManutencaoArquivada
+        return (await db.execute(select(A).where(A.c.id == manutencao_id))).first()
+    return manutencao
+
+
+# ============================================================
+# 4. PLANOS DE MANUTENÇÃO
+# ============================================================
+
+async def criar_plano(db: AsyncSession, plano: schemas.PlanoManutencaoCreate):
+    """Cria um plano de manutenção para um veículo."""
+    return await _salvar(db, models.PlanoManutencao(**plano.dict()))
+
+
+async def listar_planos(db: AsyncSession, apos_id: int = 0, limite: int = 100):
+    """Lista os planos com id maior que apos_id, em ordem de id."""
+    return await _listar(db, models.PlanoManutencao, apos_id, limite)
+
+
+async def listar_planos_por_veiculo(db: AsyncSession, veiculo_id: int):
+    """Lista os planos de manutenção de um veículo."""
+    resultado = await db.scalars(
+        select(models.PlanoManutencao).where(models.PlanoManutencao.veiculo_id == veiculo_id)
+    )
+    return resultado.all()
@@ -1,12 +1,215 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 #from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+import importlib.util
 import os
+import threading
+from urllib.parse import quote
 
-DATABASE_URL = "sqlite:///./manutencao_veicular.db"
+from app.metricas import instrumentar_engine
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./manutencao_veicular.db")
+
+# ============================================================
+# Perfis de desempenho
+# ============================================================
+# Cada perfil define os PRAGMAs aplicados a toda conexão SQLite
+# e o dimensionamento do pool. Selecione com DB_PERFIL.
+# - padrao:   comportamento original do SQLite (journal de rollback)
+# - producao: WAL, synchronous=NORMAL, mmap e busy_timeout, para
+#             leitores não bloquearem escritores e evitar
+#             "database is locked" sob escrita concorrente
+
+PERFIS = {
+    "padrao": {
+        "pragmas": {},
+        "pool_size": 5,
+        "max_overflow": 10,
+    },
+    "producao": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": 256 * 1024 * 1024,   # 256 MiB
+            "cache_size": -64 * 1024,         # valor negativo = KiB (64 MiB)
+            "busy_timeout": 5000,             # ms
+            "temp_store": "MEMORY",
+        },
+        # Rotas síncronas seguram a conexão até o fim da serialização,
+        # que também disputa o threadpool (40 threads). O pool deve
+        # cobrir o pico de requisições simultâneas, senão as threads
+        # ficam presas esperando conexão; conexões SQLite são baratas.
+        "pool_size": 40,
+        "max_overflow": 60,
+    },
+}
+
+DB_PERFIL = os.getenv("DB_PERFIL", "padrao")
+if DB_PERFIL not in PERFIS:
+    raise ValueError(f"DB_PERFIL inválido: {DB_PERFIL!r}. Opções: {', '.join(PERFIS)}")
+PERFIL = PERFIS[DB_PERFIL]
+
+
+def _opcoes_engine(url: str) -> dict:
+    """Argumentos de create_engine conforme o banco e o perfil ativo."""
+    url = make_url(url)
+    opcoes = {}
+    if url.get_backend_name() == "sqlite":
+        opcoes["connect_args"] = {"check_same_thread": False}
+        # Bancos em memória usam pools próprios, sem dimensionamento
+        if url.database in (None, "", ":memory:"):
+            return opcoes
+    opcoes["pool_size"] = int(os.getenv("DB_POOL_SIZE", PERFIL["pool_size"]))
+    opcoes["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW", PERFIL["max_overflow"]))
+    opcoes["pool_timeout"] = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    return opcoes
+
+
+# PRAGMAs aplicados em toda conexão SQLite, em qualquer perfil.
+# foreign_keys: sem ele o SQLite ignora as chaves estrangeiras e aceita
+# registros órfãos (ex.: manutenções de um veículo já excluído).
+PRAGMAS_FIXOS = {"foreign_keys": "ON"}
+
+
+def _registrar_pragmas(engine_sync, pragmas: dict = None):
+    """Aplica os PRAGMAs fixos e os do perfil (ou os informados) em cada nova conexão SQLite."""
+    pragmas = {**PRAGMAS_FIXOS, **(PERFIL["pragmas"] if pragmas is None else pragmas)}
+    if engine_sync.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine_sync, "connect")
+    def aplicar_pragmas(conexao_dbapi, registro):
+        cursor = conexao_dbapi.cursor()
+        for nome, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nome}={valor}")
+        cursor.close()
+
+
+# ============================================================
+# Banco de arquivo (histórico antigo)
+# ============================================================
+# Com ARQUIVO_DB (caminho de um arquivo SQLite), o banco de arquivo é
+# anexado a toda conexão (ATTACH ... AS arquivo) e as manutenções
+# antigas podem ser movidas para ele (ver arquivamento.py). O engine
+# somente leitura o anexa também em mode=ro.
+
+ARQUIVO_DB = os.getenv("ARQUIVO_DB")
+ESQUEMA_ARQUIVO = "arquivo"
+
+
+def _registrar_arquivo(engine_sync, somente_leitura: bool = False):
+    """Anexa o banco de arquivo em cada nova conexão SQLite, se configurado."""
+    if not ARQUIVO_DB or engine_sync.dialect.name != "sqlite":
+        return
+    caminho = os.path.abspath(ARQUIVO_DB)
+    alvo = f"file:{quote(caminho)}?mode=ro" if somente_leitura else caminho
+    # journal_mode e synchronous valem por banco anexado
+    pragmas = {} if somente_leitura else {
+        nome: valor for nome, valor in PERFIL["pragmas"].items() if nome in ("journal_mode", "synchronous")
+    }
+
+    @event.listens_for(engine_sync, "connect")
+    def anexar_arquivo(conexao_dbapi, registro):
+        cursor = conexao_dbapi.cursor()
+        cursor.execute(f"ATTACH DATABASE ? AS {ESQUEMA_ARQUIVO}", (alvo,))
+        for nome, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {ESQUEMA_ARQUIVO}.{nome}={valor}")
+        cursor.close()
+
+
+# ============================================================
+# Engine (criado sob demanda)
+# ============================================================
+# O engine só é criado no primeiro uso (get_engine), e não na
+# importação do módulo: importar app.* não abre o banco, e cada worker
+# só se conecta quando de fato começa a atender.
+
+_engine = None
+_trava_engine = threading.Lock()
+
+
+def get_engine():
+    """Retorna o engine síncrono, criando-o na primeira chamada."""
+    global _engine
+    if _engine is None:
+        with _trava_engine:
+            if _engine is None:
+                novo = create_engine(DATABASE_URL, **_opcoes_engine(DATABASE_URL))
+                _registrar_pragmas(novo)
+                _registrar_arquivo(novo)
+                instrumentar_engine(novo)
+                _engine = novo
+    return _engine
+
+
+# ============================================================
+# Engine somente leitura (rotas GET)
+# ============================================================
+# Com SQLite em arquivo, as consultas usam um engine próprio: conexões
+# abertas com mode=ro (URI) e PRAGMA query_only, em um pool separado.
+# Assim as leituras não ocupam as conexões do engine de escrita e, em
+# WAL (DB_PERFIL=producao), leem o último commit sem bloquear o escritor.
+# Em outros bancos, em SQLite em memória ou com DB_LEITURA_SEPARADA=0,
+# get_read_engine devolve o próprio engine principal.
+
+DB_LEITURA_SEPARADA = os.getenv("DB_LEITURA_SEPARADA", "1") == "1"
+
+_read_engine = None
+
+
+def url_somente_leitura(url: str):
+    """
+    URL SQLite equivalente a url, aberta em modo somente leitura
+    (sqlite:///file:<caminho>?mode=ro&uri=true). None se não se aplica.
+    """
+    url = make_url(url)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    if url.query.get("uri"):  # já é uma URI: só acrescenta o modo
+        return url.update_query_dict({"mode": "ro"})
+    caminho = quote(os.path.abspath(url.database))
+    return url.set(database=f"file:{caminho}").update_query_dict({"mode": "ro", "uri": "true"})
+
+
+def get_read_engine():
+    """Retorna o engine das consultas, criando-o na primeira chamada."""
+    global _read_engine
+    if _read_engine is None:
+        url = url_somente_leitura(DATABASE_URL) if DB_LEITURA_SEPARADA else None
+        if url is None:
+            return get_engine()
+        with _trava_engine:
+            if _read_engine is None:
+                novo = create_engine(url, **_opcoes_engine(DATABASE_URL))
+                # journal_mode é do arquivo (definido pelo engine de escrita)
+                pragmas = {nome: valor for nome, valor in PERFIL["pragmas"].items() if nome != "journal_mode"}
+                _registrar_pragmas(novo, {**pragmas, "query_only": 1})
+                _registrar_arquivo(novo, somente_leitura=True)
+                instrumentar_engine(novo)
+                _read_engine = novo
+    return _read_engine
+
+
+class _SessaoAdiada(Session):
+    """Sessão que só resolve o engine (get_engine) quando precisa de conexão."""
+
+    _obter_engine = staticmethod(get_engine)
+
+    def get_bind(self, *args, **kwargs):
+        if self.bind is None:
+            self.bind = self._obter_engine()
+        return super().get_bind(*args, **kwargs)
+
+
+class _SessaoLeituraAdiada(_SessaoAdiada):
+    """Sessão das consultas: usa o engine somente leitura (get_read_engine)."""
+
+    _obter_engine = staticmethod(get_read_engine)
+
+
+SessionLocal = sessionmaker(class_=_SessaoAdiada, autocommit=False, autoflush=False)
+ReadSessionLocal = sessionmaker(class_=_SessaoLeituraAdiada, autocommit=False, autoflush=False)
 Base = declarative_base()
 
 def get_db():
@@ -19,3 +222,115 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """
+    Dependency das rotas de consulta (GET), no engine somente leitura.
+    Usar em endpoints com: db: Session = Depends(get_read_db)
+    Qualquer escrita nesta sessão falha (attempt to write a readonly database).
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# ============================================================
+# Execução de comandos gerados
+# ============================================================
+# Escritas com passos condicionais (ex.: INSERT só se o UPDATE não
+# encontrou a linha) são escritas uma vez, como geradores de pares
+# (comando, parâmetros) que recebem de volta o resultado de cada
+# comando (send). As funções abaixo os executam em uma Session ou
+# em uma AsyncSession, com os mesmos comandos.
+
+def executar_comandos(db: Session, comandos):
+    """Executa os comandos do gerador na transação corrente (sem commit)."""
+    resultado = None
+    try:
+        while True:
+            comando, parametros = comandos.send(resultado)
+            resultado = db.execute(comando, parametros)
+    except StopIteration:
+        pass
+
+
+# ============================================================
+# Modo assíncrono (opcional)
+# ============================================================
+# Disponível quando o driver aiosqlite está instalado. As rotas
+# assíncronas usam este engine; as rotas síncronas continuam no
+# engine acima.
+
+ASYNC_DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+ASYNC_DISPONIVEL = importlib.util.find_spec("aiosqlite") is not None
+
+_async_engine = None
+_async_sessoes = None
+
+
+def get_async_engine():
+    """Retorna o engine assíncrono, criando-o na primeira chamada."""
+    global _async_engine, _async_sessoes
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        with _trava_engine:
+            if _async_engine is None:
+                novo = create_async_engine(ASYNC_DATABASE_URL, **_opcoes_engine(ASYNC_DATABASE_URL))
+                _registrar_pragmas(novo.sync_engine)
+                _registrar_arquivo(novo.sync_engine)
+                instrumentar_engine(novo.sync_engine)
+                _async_sessoes = async_sessionmaker(novo, autoflush=False, expire_on_commit=False)
+                _async_engine = novo
+    return _async_engine
+
+
+async def get_async_db():
+    """
+    Dependency assíncrona para FastAPI.
+    Usar em endpoints async com: db: AsyncSession = Depends(get_async_db)
+    """
+    get_async_engine()
+    async with _async_sessoes() as db:
+        yield db
+
+
+async def executar_comandos_async(db, comandos):
+    """Mesmo que executar_comandos, para AsyncSession."""
+    resultado = None
+    try:
+        while True:
+            comando, parametros = comandos.send(resultado)
+            resultado = await db.execute(comando, parametros)
+    except StopIteration:
+        pass
+
+
+# ============================================================
+# Encerramento
+# ============================================================
+
+async def descartar_engines():
+    """Fecha os pools de conexão (chamado no desligamento da aplicação)."""
+    global _engine, _read_engine, _async_engine, _async_sessoes
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _async_sessoes = None
+    if _read_engine is not None:
+        _read_engine.dispose()
+        _read_engine = None
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
+
+
+def __getattr__(nome):
+    """Compatibilidade: `from app.database import engine` continua funcionando."""
+    if nome == "engine":
+        return get_engine()
+    if nome == "async_engine":
+        return get_async_engine() if ASYNC_DISPONIVEL else None
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
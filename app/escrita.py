@@ -0,0 +1,218 @@
+# Módulo: escrita.py
+"""
+Módulo: escrita.py
+Escrita agrupada (group commit) para os cadastros feitos pelas rotas POST.
+
+Sem este módulo, cada requisição de cadastro faz o próprio commit (e
+uma sincronização com o disco) seguido de um SELECT para recarregar o
+registro; sob carga, os escritores ainda disputam o bloqueio do SQLite.
+Com ESCRITA_AGRUPADA=1, um único escritor por processo junta as
+inserções recebidas em uma janela de poucos milissegundos (ou até
+ESCRITA_LOTE_MAXIMO itens), grava todas em uma transação, com INSERT
+... RETURNING, e devolve a cada requisição a sua linha criada.
+
+Se o lote falhar (ex.: placa duplicada em um dos itens), os itens são
+regravados um a um, para que só a requisição com problema receba o erro.
+As rotas convertem esse erro em resposta HTTP com erros_de_integridade
+(o mesmo vale para o commit feito pela própria requisição).
+
+Configuração por variáveis de ambiente:
+- ESCRITA_AGRUPADA: "1" ativa o escritor (padrão: desativado)
+- ESCRITA_JANELA_MS: espera máxima para juntar um lote (padrão 2)
+- ESCRITA_LOTE_MAXIMO: itens por transação (padrão 256)
+"""
+
+import asyncio
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app import crud, models
+from app.cache import cache_usuarios_email
+from app.database import Base, SessionLocal
+
+ESCRITA_AGRUPADA = os.getenv("ESCRITA_AGRUPADA", "0") == "1"
+ESCRITA_JANELA_MS = float(os.getenv("ESCRITA_JANELA_MS", 2))
+ESCRITA_LOTE_MAXIMO = int(os.getenv("ESCRITA_LOTE_MAXIMO", 256))
+
+# Ordem de inserção dentro de um lote: tabelas referenciadas primeiro
+_ORDEM_TABELAS = {tabela.name: posicao for posicao, tabela in enumerate(Base.metadata.sorted_tables)}
+
+# Escritor ativo neste processo (None = cada requisição grava sozinha)
+escritor = None
+
+
+class EscritorAgrupado:
+    """Junta inserções concorrentes e grava cada lote em uma única transação."""
+
+    def __init__(self, janela_ms: float = ESCRITA_JANELA_MS, lote_maximo: int = ESCRITA_LOTE_MAXIMO,
+                 sessoes=SessionLocal):
+        self.janela = janela_ms / 1000
+        self.lote_maximo = lote_maximo
+        self._sessoes = sessoes
+        self._fila = asyncio.Queue()
+        self._tarefa = None
+        self.lotes = 0
+        self.itens = 0
+
+    # ------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------
+
+    def iniciar(self):
+        """Inicia a tarefa do escritor no event loop atual."""
+        self._tarefa = asyncio.get_running_loop().create_task(self._executar())
+
+    async def encerrar(self):
+        """Grava o que estiver na fila e encerra a tarefa do escritor."""
+        await self._fila.join()
+        self._tarefa.cancel()
+        try:
+            await self._tarefa
+        except asyncio.CancelledError:
+            pass
+
+    # ------------------------------------------------------------
+    # API usada pelas rotas
+    # ------------------------------------------------------------
+
+    async def inserir(self, modelo, valores: dict) -> dict:
+        """
+        Enfileira a inserção e aguarda o commit do lote.
+        Retorna a linha criada (todas as colunas, via RETURNING).
+        Repassa a exceção do banco se a inserção deste item falhar.
+        """
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila.put((modelo, valores, futuro))
+        return await futuro
+
+    # ------------------------------------------------------------
+    # Laço do escritor
+    # ------------------------------------------------------------
+
+    async def _executar(self):
+        while True:
+            pedidos = [await self._fila.get()]
+            limite = time.monotonic() + self.janela
+            while len(pedidos) < self.lote_maximo:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    pedidos.append(await asyncio.wait_for(self._fila.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                # O commit roda em uma thread; enquanto isso, o próximo lote se forma na fila
+                resultados = await asyncio.to_thread(self._gravar, [(m, v) for m, v, _ in pedidos])
+            except Exception as erro:  # falha inesperada: repassa a todas as requisições
+                resultados = [(None, erro)] * len(pedidos)
+            for (_, _, futuro), (linha, erro) in zip(pedidos, resultados):
+                if not futuro.done():  # o cliente pode ter desistido da requisição
+                    if erro is not None:
+                        futuro.set_exception(erro)
+                    else:
+                        futuro.set_result(linha)
+                self._fila.task_done()
+            self.lotes += 1
+            self.itens += len(pedidos)
+
+    def _gravar(self, pedidos: list) -> list:
+        """Grava o lote inteiro; se falhar, grava item a item. Retorna [(linha, erro)]."""
+        with self._sessoes() as db:
+            try:
+                linhas = self._inserir(db, pedidos)
+                db.commit()
+                self._depois_do_commit(pedidos, linhas)
+                return [(linha, None) for linha in linhas]
+            except SQLAlchemyError as erro:
+                db.rollback()
+                if len(pedidos) == 1:
+                    return [(None, erro)]
+
+        resultados = []
+        for pedido in pedidos:
+            with self._sessoes() as db:
+                try:
+                    linhas = self._inserir(db, [pedido])
+                    db.commit()
+                    self._depois_do_commit([pedido], linhas)
+                    resultados.append((linhas[0], None))
+                except SQLAlchemyError as erro:
+                    db.rollback()
+                    resultados.append((None, erro))
+        return resultados
+
+    def _inserir(self, db, pedidos: list) -> list:
+        """Um INSERT ... RETURNING (executemany) por modelo, na transação corrente."""
+        por_modelo = defaultdict(list)
+        for indice, (modelo, valores) in enumerate(pedidos):
+            por_modelo[modelo].append((indice, valores))
+
+        linhas = [None] * len(pedidos)
+        for modelo in sorted(por_modelo, key=lambda m: _ORDEM_TABELAS[m.__tablename__]):
+            itens = por_modelo[modelo]
+            criadas = db.execute(
+                insert(modelo).returning(*modelo.__table__.columns, sort_by_parameter_order=True),
+                [valores for _, valores in itens],
+            ).all()
+            for (indice, _), criada in zip(itens, criadas):
+                linhas[indice] = dict(criada._mapping)
+            # Mesmos efeitos de crud.criar_*: versões, resumo e odômetro. As instâncias
+            # são transitórias (nunca entram na sessão): só carregam as colunas das
+            # linhas do RETURNING, já com o id, para os efeitos lerem
+            crud.aplicar_efeitos_insercao(db, [modelo(**dict(criada._mapping)) for criada in criadas])
+        return linhas
+
+    @staticmethod
+    def _depois_do_commit(pedidos: list, linhas: list):
+        for (modelo, _), linha in zip(pedidos, linhas):
+            if modelo is models.Usuario:
+                cache_usuarios_email.invalidar(linha["email"])
+
+
+# ============================================================
+# Erros de integridade (usado pelas rotas de cadastro)
+# ============================================================
+
+@contextmanager
+def erros_de_integridade(duplicado: str = None, ausente: str = None):
+    """
+    Converte a IntegrityError de um cadastro em resposta HTTP, em vez de 500:
+    - valor único repetido (placa, e-mail) -> 400 com `duplicado`
+    - chave estrangeira sem pai (excluído depois da verificação da rota) -> 404 com `ausente`
+    """
+    try:
+        yield
+    except IntegrityError as erro:
+        mensagem = str(erro.orig)
+        if duplicado and "UNIQUE" in mensagem:
+            raise HTTPException(status_code=400, detail=duplicado) from erro
+        if ausente and "FOREIGN KEY" in mensagem:
+            raise HTTPException(status_code=404, detail=ausente) from erro
+        raise
+
+
+# ============================================================
+# Inicialização (chamada no lifespan de main.py)
+# ============================================================
+
+def iniciar_escritor():
+    """Cria o escritor do processo se ESCRITA_AGRUPADA estiver ativa."""
+    global escritor
+    if ESCRITA_AGRUPADA and escritor is None:
+        escritor = EscritorAgrupado()
+        escritor.iniciar()
+
+
+async def encerrar_escritor():
+    """Grava as inserções pendentes e desativa o escritor."""
+    global escritor
+    if escritor is not None:
+        atual, escritor = escritor, None
+        await atual.encerrar()
@@ -0,0 +1,141 @@
+# Módulo: esquema.py
+"""
+Módulo: esquema.py
+Criação e atualização do esquema do banco.
+
+Base.metadata.create_all só cria tabelas que ainda não existem; em um
+banco já existente ele não adiciona índices novos. criar_esquema cobre
+os dois casos. Na inicialização da aplicação, garantir_esquema compara
+a versão gravada no banco com a dos modelos e só chama criar_esquema
+quando elas diferem. Também pode ser executado manualmente:
+
+    python -m app.esquema             # cria tabelas e índices ausentes
+    python -m app.esquema --explicar  # mostra o plano das consultas principais
+"""
+
+import argparse
+import hashlib
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import arquivamento, busca, models, odometro, resumos
+from app.database import Base, get_engine
+
+# Incrementar ao alterar objetos do banco que não estão nos modelos
+# (gatilhos, tabelas virtuais etc.), para forçar a atualização.
+REVISAO_MANUAL = 2
+
+# Consultas dos caminhos de acesso mais usados, para conferir com
+# EXPLAIN QUERY PLAN que os índices estão sendo aproveitados.
+CONSULTAS_PRINCIPAIS = {
+    "planos por veículo": "SELECT * FROM planos_manutencao WHERE veiculo_id = 1",
+    "manutenções por veículo": "SELECT * FROM manutencoes WHERE veiculo_id = 1",
+    "histórico por veículo e data": (
+        "SELECT * FROM manutencoes WHERE veiculo_id = 1 AND data >= '2024-01-01' ORDER BY data"
+    ),
+    "documentos por manutenção": "SELECT * FROM documentos WHERE manutencao_id = 1",
+    "veículos por usuário": "SELECT * FROM veiculos WHERE usuario_id = 1",
+    "busca textual": "SELECT rowid FROM manutencoes_fts WHERE manutencoes_fts MATCH '\"oleo\"'",
+}
+
+
+def versao_esquema() -> str:
+    """Assinatura do esquema declarado em models.py (tabelas, colunas e índices)."""
+    partes = [str(REVISAO_MANUAL)]
+    tabelas = list(Base.metadata.sorted_tables)
+    if arquivamento.ativo():  # ativar o arquivo depois também atualiza o esquema
+        tabelas += arquivamento.metadados.sorted_tables
+    for tabela in tabelas:
+        partes.append(tabela.fullname)
+        partes.extend(
+            f"{c.name}:{c.type}:{c.nullable}:{c.primary_key}" for c in tabela.columns
+        )
+        partes.extend(
+            sorted(f"{i.name}:{','.join(c.name for c in i.columns)}" for i in tabela.indexes)
+        )
+    return hashlib.sha256("|".join(partes).encode()).hexdigest()
+
+
+def versao_gravada(bind) -> str:
+    """Versão registrada no banco, ou None se ainda não houver."""
+    try:
+        with bind.connect() as conexao:
+            return conexao.execute(select(models.EsquemaVersao.versao)).scalar()
+    except SQLAlchemyError:
+        return None  # tabela de versão ainda não existe
+
+
+def criar_indices(bind=None):
+    """Cria os índices declarados em models.py que ainda não existem no banco."""
+    bind = bind or get_engine()
+    with bind.begin() as conexao:
+        for tabela in Base.metadata.sorted_tables:
+            for indice in tabela.indexes:
+                indice.create(conexao, checkfirst=True)
+
+
+def criar_esquema(bind=None):
+    """
+    Cria as tabelas ausentes e aplica os índices em tabelas já existentes.
+    Tabelas derivadas criadas agora (resumo de custos, índice de busca,
+    histórico de odômetro) são populadas a partir dos dados atuais.
+    Ao final, grava a versão do esquema no banco.
+    """
+    bind = bind or get_engine()
+    existentes = set(inspect(bind).get_table_names())
+    Base.metadata.create_all(bind=bind)
+    criar_indices(bind)
+    arquivamento.criar_arquivo(bind)
+    busca.criar_indice(bind)
+    if models.ResumoCusto.__tablename__ not in existentes:
+        with Session(bind) as sessao:
+            resumos.reconstruir(sessao)
+    if models.LeituraOdometro.__tablename__ not in existentes:
+        with Session(bind) as sessao:
+            odometro.reconstruir(sessao)
+    with Session(bind) as sessao:
+        sessao.merge(models.EsquemaVersao(id=1, versao=versao_esquema()))
+        sessao.commit()
+
+
+def garantir_esquema(bind=None) -> bool:
+    """
+    Verificação barata feita na inicialização: uma única consulta à
+    versão gravada. Só executa criar_esquema se o banco estiver
+    desatualizado. Retorna True quando o esquema foi (re)aplicado.
+    """
+    bind = bind or get_engine()
+    if versao_gravada(bind) == versao_esquema():
+        return False
+    try:
+        criar_esquema(bind)
+    except SQLAlchemyError:
+        # Outro worker pode ter aplicado o esquema ao mesmo tempo
+        if versao_gravada(bind) != versao_esquema():
+            raise
+    return True
+
+
+def explicar_consultas(bind=None):
+    """Retorna o plano de execução (SQLite) de cada consulta principal."""
+    bind = bind or get_engine()
+    planos = {}
+    with bind.connect() as conexao:
+        for nome, sql in CONSULTAS_PRINCIPAIS.items():
+            linhas = conexao.execute(text("EXPLAIN QUERY PLAN " + sql)).all()
+            planos[nome] = [linha[-1] for linha in linhas]
+    return planos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cria/atualiza o esquema do banco.")
+    parser.add_argument("--explicar", action="store_true", help="mostra o plano das consultas principais")
+    args = parser.parse_args()
+
+    criar_esquema()
+    print("Esquema atualizado.")
+    if args.explicar:
+        for nome, detalhes in explicar_consultas().items():
+            print(f"- {nome}: {'; '.join(detalhes)}")
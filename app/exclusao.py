@@ -0,0 +1,376 @@
+# Módulo: exclusao.py
+"""
+Módulo: exclusao.py
+Exclusão em cascata, por conjunto, de veículos e manutenções.
+
+Os registros dependentes não são carregados na sessão: cada tabela é
+limpa com DELETE ... WHERE <coluna> IN (...), com até BLOCO_IN ids por
+comando, dos filhos para os pais, na transação corrente. Com PRAGMA foreign_keys ativo (ver
+database.py), o banco recusa qualquer exclusão que deixaria órfãos.
+
+- documentos                  -> por manutencao_id
+- manutencoes                 -> por veiculo_id (o índice de busca textual
+                                 é atualizado pelos gatilhos de busca.py)
+- arquivo.documentos e arquivo.manutencoes, com o arquivo ativo
+  (ver arquivamento.py), contados junto com as tabelas principais
+- planos_manutencao, resumo_custos, leituras_odometro -> por veiculo_id
+- veiculos                    -> por id
+
+Frotas inteiras (dezenas de milhares de registros) são removidas por
+expurgar_frota, em lotes pequenos, cada um em uma transação curta: o
+bloqueio de escrita do SQLite é liberado entre os lotes e os outros
+escritores não ficam parados até o fim do expurgo.
+
+As exclusões não apagam os arquivos dos documentos: o mesmo conteúdo
+pode ser usado por outros documentos (armazenamento.py). Os arquivos
+que nenhum documento referencia são apagados pela varredura de
+limpar_arquivos_orfaos.
+
+Configuração por variáveis de ambiente:
+- EXPURGO_LOTE: registros apagados por transação no expurgo (padrão 500)
+- EXPURGO_PAUSA_MS: pausa entre os lotes do expurgo (padrão 5)
+- ARQUIVOS_ORFAOS_IDADE_S: tempo sem uso antes de um arquivo sem
+  documento ser apagado pela varredura (padrão 3600)
+
+Remoção dos órfãos deixados antes de as chaves estrangeiras serem ativadas:
+    python -m app.exclusao --orfaos
+
+Remoção dos arquivos de documentos sem referência:
+    python -m app.exclusao --arquivos
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import List
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app import armazenamento, arquivamento, models, resumos, versoes
+from app.cache import cache_veiculos
+
+logger = logging.getLogger("app")
+
+EXPURGO_LOTE = int(os.getenv("EXPURGO_LOTE", 500))
+EXPURGO_PAUSA_MS = float(os.getenv("EXPURGO_PAUSA_MS", 5))
+ARQUIVOS_ORFAOS_IDADE_S = float(os.getenv("ARQUIVOS_ORFAOS_IDADE_S", 3600))
+
+# Ids por cláusula IN, abaixo do limite de parâmetros do SQLite
+BLOCO_IN = 900
+
+# Acima deste número de grupos afetados, o resumo de custos é recalculado
+# por veículo em vez de ajustado grupo a grupo (um UPDATE por grupo)
+RESUMO_AJUSTES_MAXIMO = 20
+
+M, D, V = models.Manutencao, models.Documento, models.Veiculo
+
+# Tabelas que referenciam veiculos.id, apagadas antes do veículo
+# (manutenções depois dos seus documentos)
+DEPENDENTES_VEICULO = (models.Manutencao, models.PlanoManutencao, models.ResumoCusto, models.LeituraOdometro)
+
+
+def _somar(contagem: dict, outra: dict) -> dict:
+    for tabela, quantidade in outra.items():
+        contagem[tabela] = contagem.get(tabela, 0) + quantidade
+    return contagem
+
+
+# ============================================================
+# 1. Exclusão por conjunto (na transação corrente, sem commit)
+# ============================================================
+
+def _tabelas_manutencoes() -> list:
+    """Pares (manutenções, documentos): o banco principal e, com o arquivo ativo, o arquivo."""
+    pares = [(M.__table__, D.__table__)]
+    if arquivamento.ativo():
+        pares.append((arquivamento.ManutencaoArquivada, arquivamento.DocumentoArquivado))
+    return pares
+
+
+def excluir_manutencoes(db: Session, ids: List[int]) -> tuple:
+    """
+    Exclui as manutenções e os seus documentos (do banco principal e do
+    arquivo), ajustando o resumo de custos e as versões.
+    Retorna (ids excluídos, {tabela: registros excluídos}).
+    """
+    linhas, contagem = {}, {}
+    for manutencoes, documentos in _tabelas_manutencoes():
+        c = manutencoes.c
+        encontradas = db.execute(
+            select(c.id, c.veiculo_id, c.data, c.tipo_manutencao, c.custo).where(c.id.in_(ids))
+        ).all()
+        if not encontradas:
+            continue
+        encontrados = [linha.id for linha in encontradas]
+        _somar(contagem, {
+            D.__tablename__: db.execute(
+                delete(documentos).where(documentos.c.manutencao_id.in_(encontrados))
+            ).rowcount,
+            M.__tablename__: db.execute(delete(manutencoes).where(c.id.in_(encontrados))).rowcount,
+        })
+        for linha in encontradas:  # uma cópia duplicada no arquivo não conta duas vezes
+            linhas.setdefault(linha.id, linha)
+    if not linhas:
+        return [], {}
+
+    ajustes = resumos.agrupar(linhas.values(), sinal=-1)
+    veiculos = {linha.veiculo_id for linha in linhas.values()}
+    # Poucos grupos: ajuste incremental; muitos: recálculo por veículo (2 comandos)
+    if len(ajustes) <= RESUMO_AJUSTES_MAXIMO:
+        resumos.aplicar_ajustes(db, ajustes)
+    else:
+        resumos.recalcular_veiculos(db, veiculos)
+    chaves = {versoes.chave_veiculo(veiculo_id) for veiculo_id in veiculos}
+    chaves.add(versoes.CHAVES_TABELA[M])
+    if contagem[D.__tablename__]:
+        chaves.add(versoes.CHAVES_TABELA[D])
+    versoes.incrementar(db, chaves)
+    return list(linhas), contagem
+
+
+def excluir_veiculos(db: Session, ids: List[int]) -> tuple:
+    """
+    Exclui os veículos e tudo o que depende deles (ver DEPENDENTES_VEICULO).
+    Os ids são processados em blocos de BLOCO_IN, na mesma transação.
+    Retorna (ids excluídos, {tabela: registros excluídos}).
+    O cache de veículos deve ser invalidado após o commit (invalidar_cache).
+    """
+    excluidos, contagem = [], {}
+    for inicio in range(0, len(ids), BLOCO_IN):
+        encontrados = list(db.scalars(select(V.id).where(V.id.in_(ids[inicio:inicio + BLOCO_IN]))))
+        if encontrados:
+            excluidos += encontrados
+            _somar(contagem, _excluir_bloco_veiculos(db, encontrados))
+    if not excluidos:
+        return [], {}
+
+    chaves = [versoes.chave_veiculo(veiculo_id) for veiculo_id in excluidos]
+    chaves += [chave for modelo, chave in versoes.CHAVES_TABELA.items()
+               if contagem.get(modelo.__tablename__)]
+    versoes.incrementar(db, chaves)
+    return excluidos, contagem
+
+
+def _excluir_bloco_veiculos(db: Session, encontrados: List[int]) -> dict:
+    """Apaga um bloco de veículos existentes e os seus dependentes. Retorna {tabela: excluídos}."""
+    contagem = {}
+    for manutencoes, documentos in _tabelas_manutencoes():
+        do_veiculo = select(manutencoes.c.id).where(manutencoes.c.veiculo_id.in_(encontrados))
+        _somar(contagem, {D.__tablename__: db.execute(
+            delete(documentos).where(documentos.c.manutencao_id.in_(do_veiculo))
+        ).rowcount})
+    for modelo in DEPENDENTES_VEICULO:
+        contagem[modelo.__tablename__] = db.execute(
+            delete(modelo).where(modelo.veiculo_id.in_(encontrados))
+        ).rowcount
+    if arquivamento.ativo():
+        A = arquivamento.ManutencaoArquivada
+        contagem[M.__tablename__] += db.execute(delete(A).where(A.c.veiculo_id.in_(encontrados))).rowcount
+    contagem[V.__tablename__] = db.execute(delete(V).where(V.id.in_(encontrados))).rowcount
+    return contagem
+
+
+def invalidar_cache(veiculo_ids: List[int]):
+    """Remove os veículos excluídos do cache (chamar após o commit)."""
+    for veiculo_id in veiculo_ids:
+        cache_veiculos.invalidar(veiculo_id)
+
+
+# ============================================================
+# 2. Expurgo de frota em segundo plano
+# ============================================================
+# A situação de cada expurgo fica em memória, no processo que o
+# executa (GET /usuarios/{id}/expurgo consulta o mesmo processo).
+
+expurgos = {}
+_trava_expurgos = threading.Lock()
+
+
+def _nova_situacao(usuario_id: int) -> dict:
+    return {"usuario_id": usuario_id, "situacao": "em_andamento", "excluidos": {}, "erro": None}
+
+
+def reservar_expurgo(usuario_id: int) -> bool:
+    """Registra um novo expurgo do usuário; False se já houver um em andamento."""
+    with _trava_expurgos:
+        atual = expurgos.get(usuario_id)
+        if atual and atual["situacao"] == "em_andamento":
+            return False
+        expurgos[usuario_id] = _nova_situacao(usuario_id)
+        return True
+
+
+def _apagar_em_lotes(sessoes, situacao: dict, consulta_ids, excluir, lote: int, pausa: float):
+    """Repete excluir(db, ids) com até `lote` ids por transação, até consulta_ids não trazer nada."""
+    while True:
+        with sessoes() as db:
+            ids = list(db.scalars(consulta_ids.limit(lote)))
+            if not ids:
+                return
+            _somar(situacao["excluidos"], excluir(db, ids))
+            db.commit()
+        time.sleep(pausa)
+
+
+def _excluir_manutencoes(db: Session, ids: List[int]) -> dict:
+    return excluir_manutencoes(db, ids)[1]
+
+
+def _excluir_leituras(db: Session, ids: List[int]) -> dict:
+    L = models.LeituraOdometro
+    return {L.__tablename__: db.execute(delete(L).where(L.id.in_(ids))).rowcount}
+
+
+def expurgar_frota(usuario_id: int, lote: int = EXPURGO_LOTE, pausa_ms: float = EXPURGO_PAUSA_MS, sessoes=None):
+    """
+    Exclui todos os veículos do usuário e os seus dependentes, em lotes.
+    Os maiores volumes (manutenções e leituras de odômetro) saem primeiro,
+    `lote` registros por transação; por fim os veículos, com a exclusão
+    em cascata, que também apaga o que tiver sido criado nesse meio tempo.
+    Atualiza expurgos[usuario_id] (chamar reservar_expurgo antes).
+    """
+    if sessoes is None:
+        from app.database import SessionLocal as sessoes
+
+    situacao = expurgos.setdefault(usuario_id, _nova_situacao(usuario_id))
+    pausa = pausa_ms / 1000
+    frota = select(V.id).where(V.usuario_id == usuario_id)
+    L = models.LeituraOdometro
+    try:
+        _apagar_em_lotes(sessoes, situacao, select(M.id).where(M.veiculo_id.in_(frota)).order_by(M.id),
+                         _excluir_manutencoes, lote, pausa)
+        if arquivamento.ativo():
+            A = arquivamento.ManutencaoArquivada
+            _apagar_em_lotes(sessoes, situacao, select(A.c.id).where(A.c.veiculo_id.in_(frota)).order_by(A.c.id),
+                             _excluir_manutencoes, lote, pausa)
+        _apagar_em_lotes(sessoes, situacao, select(L.id).where(L.veiculo_id.in_(frota)).order_by(L.id),
+                         _excluir_leituras, lote, pausa)
+
+        with sessoes() as db:
+            veiculo_ids = list(db.scalars(select(V.id).where(V.usuario_id == usuario_id).order_by(V.id)))
+        for inicio in range(0, len(veiculo_ids), lote):
+            with sessoes() as db:
+                excluidos, contagem = excluir_veiculos(db, veiculo_ids[inicio:inicio + lote])
+                db.commit()
+            invalidar_cache(excluidos)
+            _somar(situacao["excluidos"], contagem)
+            time.sleep(pausa)
+    except Exception as erro:
+        logger.exception("Falha no expurgo da frota do usuário %s", usuario_id)
+        situacao.update(situacao="erro", erro=str(erro))
+        return situacao
+    situacao["situacao"] = "concluido"
+    return situacao
+
+
+# ============================================================
+# 3. Órfãos (registros anteriores às chaves estrangeiras)
+# ============================================================
+
+def limpar_orfaos(db: Session) -> dict:
+    """
+    Apaga os registros que apontam para pais inexistentes (e os que
+    dependem deles), dos filhos para os pais. Retorna {tabela: excluídos}.
+    O resumo de custos deve ser reconstruído em seguida (resumos.reconstruir).
+    """
+    usuarios = select(models.Usuario.id)
+    veiculos_validos = select(V.id).where(V.usuario_id.is_(None) | V.usuario_id.in_(usuarios))
+    manutencoes_validas = select(M.id).where(M.veiculo_id.in_(veiculos_validos))
+    contagem = {D.__tablename__: db.execute(
+        delete(D).where(D.manutencao_id.not_in(manutencoes_validas))
+    ).rowcount}
+    for modelo in DEPENDENTES_VEICULO:
+        contagem[modelo.__tablename__] = db.execute(
+            delete(modelo).where(modelo.veiculo_id.not_in(veiculos_validos))
+        ).rowcount
+    if arquivamento.ativo():
+        A, AD = arquivamento.ManutencaoArquivada, arquivamento.DocumentoArquivado
+        contagem[M.__tablename__] += db.execute(
+            delete(A).where(A.c.veiculo_id.not_in(veiculos_validos))
+        ).rowcount
+        contagem[D.__tablename__] += db.execute(
+            delete(AD).where(AD.c.manutencao_id.not_in(select(A.c.id)))
+        ).rowcount
+    contagem[V.__tablename__] = db.execute(
+        delete(V).where(V.usuario_id.is_not(None), V.usuario_id.not_in(usuarios))
+    ).rowcount
+    db.commit()
+    return contagem
+
+
+# ============================================================
+# 4. Arquivos de documentos sem referência
+# ============================================================
+
+def _tabelas_documentos() -> list:
+    tabelas = [D.__table__]
+    if arquivamento.ativo():
+        tabelas.append(arquivamento.DocumentoArquivado)
+    return tabelas
+
+
+def _caminhos_referenciados(db: Session) -> set:
+    """Caminhos de arquivo usados por documentos do banco principal e do arquivo."""
+    caminhos = set()
+    for tabela in _tabelas_documentos():
+        consulta = select(tabela.c.caminho_arquivo).distinct().where(tabela.c.caminho_arquivo.is_not(None))
+        caminhos.update(db.scalars(consulta.execution_options(yield_per=10000)))
+    return caminhos
+
+
+def limpar_arquivos_orfaos(db: Session, idade_s: float = ARQUIVOS_ORFAOS_IDADE_S) -> int:
+    """
+    Apaga do armazenamento os arquivos que nenhum documento referencia e
+    que estão sem uso há mais de idade_s segundos (o upload grava o
+    arquivo antes de criar o documento). Retorna o número de arquivos apagados.
+    """
+    sem_uso_desde = time.time() - idade_s
+    referenciados = _caminhos_referenciados(db)
+    db.rollback()  # encerra a leitura: a varredura do disco pode demorar
+    return sum(
+        armazenamento.remover(caminho, sem_uso_desde)
+        for caminho in armazenamento.listar_arquivos() if caminho not in referenciados
+    )
+
+
+def descartar_arquivo(db: Session, caminho: str, salvo_em: float) -> bool:
+    """
+    Apaga o arquivo de um upload cujo documento não chegou a ser criado,
+    se nenhum documento o referencia e nenhum outro upload o reaproveitou
+    depois de salvo_em (time.time() logo após salvar). Retorna True se apagou.
+    """
+    db.rollback()  # a sessão pode ter ficado inválida com a falha do INSERT
+    for tabela in _tabelas_documentos():
+        if db.scalar(select(tabela.c.id).where(tabela.c.caminho_arquivo == caminho).limit(1)) is not None:
+            return False
+    return armazenamento.remover(caminho, salvo_em)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Manutenção de exclusões em cascata.")
+    parser.add_argument("--orfaos", action="store_true", help="apaga registros órfãos")
+    parser.add_argument("--arquivos", action="store_true", help="apaga arquivos de documentos sem referência")
+    args = parser.parse_args()
+    if not (args.orfaos or args.arquivos):
+        parser.error("informe uma operação (ex.: --orfaos)")
+
+    sessao = SessionLocal()
+    try:
+        if args.orfaos:
+            excluidos = limpar_orfaos(sessao)
+            if any(excluidos.values()):
+                resumos.reconstruir(sessao)
+                versoes.invalidar_tudo(sessao)
+            cache_veiculos.limpar()
+            for tabela, quantidade in excluidos.items():
+                print(f"{tabela}: {quantidade} órfão(s) excluído(s)")
+        if args.arquivos:
+            print(f"arquivos: {limpar_arquivos_orfaos(sessao)} órfão(s) excluído(s)")
+    finally:
+        sessao.close()
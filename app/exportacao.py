@@ -0,0 +1,104 @@
+# Módulo: exportacao.py
+"""
+Módulo: exportacao.py
+Serialização em fluxo (streaming) do histórico de manutenções.
+As funções recebem um iterador de linhas vindo do banco e produzem
+blocos de bytes prontos para um StreamingResponse, sem nunca
+materializar o resultado completo em memória.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import date
+from typing import Iterable, Iterator
+
+# Colunas exportadas, na ordem em que aparecem no CSV
+CAMPOS_MANUTENCAO = [
+    "id", "veiculo_id", "data", "km", "tipo_manutencao",
+    "descricao", "custo", "prestador_servico",
+]
+CAMPOS_DOCUMENTO = ["documento_id", "nome_arquivo", "tipo", "caminho_arquivo"]
+
+LINHAS_POR_BLOCO = 1000
+
+
+def _valor(valor):
+    """Converte valores do banco para tipos serializáveis."""
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return valor
+
+
+def _blocos_ndjson(linhas: Iterable, incluir_documentos: bool) -> Iterator[str]:
+    """Agrupa as linhas em blocos de texto NDJSON (um objeto por manutenção)."""
+    buffer = []
+    atual = None
+
+    def fechar(registro):
+        return json.dumps(registro, ensure_ascii=False, separators=(",", ":"))
+
+    for linha in linhas:
+        mapa = linha._mapping
+        if atual is None or atual["id"] != mapa["id"]:
+            if atual is not None:
+                buffer.append(fechar(atual))
+                if len(buffer) >= LINHAS_POR_BLOCO:
+                    yield "\n".join(buffer) + "\n"
+                    buffer = []
+            atual = {campo: _valor(mapa[campo]) for campo in CAMPOS_MANUTENCAO}
+            if incluir_documentos:
+                atual["documentos"] = []
+        if incluir_documentos and mapa["documento_id"] is not None:
+            atual["documentos"].append({
+                "id": mapa["documento_id"],
+                "nome_arquivo": mapa["nome_arquivo"],
+                "tipo": mapa["tipo"],
+                "caminho_arquivo": mapa["caminho_arquivo"],
+            })
+    if atual is not None:
+        buffer.append(fechar(atual))
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def _blocos_csv(linhas: Iterable, incluir_documentos: bool) -> Iterator[str]:
+    """Gera blocos de texto CSV (uma linha por manutenção/documento)."""
+    campos = CAMPOS_MANUTENCAO + (CAMPOS_DOCUMENTO if incluir_documentos else [])
+    saida = io.StringIO()
+    escritor = csv.writer(saida)
+    escritor.writerow(campos)
+    contador = 0
+    for linha in linhas:
+        mapa = linha._mapping
+        escritor.writerow([_valor(mapa[campo]) for campo in campos])
+        contador += 1
+        if contador >= LINHAS_POR_BLOCO:
+            yield saida.getvalue()
+            saida.seek(0)
+            saida.truncate(0)
+            contador = 0
+    if saida.tell():
+        yield saida.getvalue()
+
+
+def gerar_exportacao(linhas: Iterable, formato: str, incluir_documentos: bool = False,
+                     compactar: bool = False) -> Iterator[bytes]:
+    """
+    Produz o conteúdo da exportação em blocos de bytes.
+    - formato: "ndjson" ou "csv"
+    - compactar: aplica gzip incremental sobre os blocos
+    """
+    blocos = _blocos_csv if formato == "csv" else _blocos_ndjson
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compactar else None
+    for bloco in blocos(linhas, incluir_documentos):
+        dados = bloco.encode("utf-8")
+        if compressor is None:
+            yield dados
+            continue
+        dados = compressor.compress(dados)
+        if dados:
+            yield dados
+    if compressor is not None:
+        yield compressor.flush()
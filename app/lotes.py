@@ -0,0 +1,83 @@
+# Módulo: lotes.py
+"""
+Módulo: lotes.py
+Utilitários das rotas de busca em lote por ids (GET /<recurso>/lote?ids=1,2,3).
+Uma chamada substitui várias requisições GET /<recurso>/{id} e resolve
+todos os ids com uma única consulta IN. As exclusões em lote
+(DELETE /<recurso>/lote?ids=1,2,3) usam os mesmos parâmetros.
+"""
+
+import re
+from typing import List
+
+from fastapi import HTTPException, Query
+
+from app.paginacao import ID_MAXIMO
+
+# Mantém o IN bem abaixo do limite de parâmetros por consulta do SQLite
+IDS_MAXIMO = 500
+
+_PARTE = re.compile(r"[^,]+")
+
+
+class LoteGrande(Exception):
+    """O lote pedido tem mais ids do que o máximo permitido (413)."""
+
+
+def interpretar_ids(texto: str, maximo: int = None) -> List[int]:
+    """
+    Converte "3,1,2" em [3, 1, 2], sem repetições e na ordem pedida.
+    Lança ValueError se algum valor não for um inteiro positivo (que
+    caiba em um inteiro do SQLite) e
+    LoteGrande assim que surgir o id distinto de número maximo + 1,
+    sem percorrer o restante do texto.
+    """
+    ids = {}
+    for encontrada in _PARTE.finditer(texto):
+        parte = encontrada.group().strip()
+        if not parte:
+            continue
+        if not parte.isdigit() or not 0 < int(parte) <= ID_MAXIMO:
+            raise ValueError(parte)
+        ids[int(parte)] = None
+        if maximo is not None and len(ids) > maximo:
+            raise LoteGrande()
+    return list(ids)
+
+
+def parametros_ids(
+    ids: str = Query(..., description=f"Ids separados por vírgula (até {IDS_MAXIMO}), ex.: 1,2,3."),
+) -> List[int]:
+    """
+    Dependency para as rotas de lote.
+    Retorna a lista de ids já validada.
+    """
+    try:
+        lista = interpretar_ids(ids, IDS_MAXIMO)
+    except ValueError as erro:
+        raise HTTPException(status_code=400, detail=f"Id inválido: {erro}.")
+    except LoteGrande:
+        raise HTTPException(status_code=413, detail=f"O lote aceita no máximo {IDS_MAXIMO} ids.")
+    if not lista:
+        raise HTTPException(status_code=400, detail="Informe ao menos um id.")
+    return lista
+
+
+def montar_lote(ids: List[int], encontrados: dict) -> dict:
+    """
+    Monta a resposta do lote a partir de {id: registro}: os registros
+    na ordem dos ids pedidos e a lista dos ids que não existem.
+    """
+    return {
+        "itens": [encontrados[i] for i in ids if i in encontrados],
+        "nao_encontrados": [i for i in ids if i not in encontrados],
+    }
+
+
+def montar_exclusao(ids: List[int], excluidos: List[int], contagem: dict) -> dict:
+    """Resposta da exclusão em lote: registros removidos por tabela e ids inexistentes."""
+    removidos = set(excluidos)
+    return {
+        "excluidos": contagem,
+        "nao_encontrados": [i for i in ids if i not in removidos],
+    }
@@ -6,20 +6,49 @@ Responsável por:
 - Inicializar o app
 - Configurar o banco de dados
 - Importar e registrar as rotas
-- Criar as tabelas (se não existirem)
+- Criar as tabelas (se não existirem), na inicialização (lifespan)
 """
 
+import logging
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.database import Base, engine
-from app.routes import veiculos, usuarios, manutencoes, planos
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from app import escrita, metricas, seguranca
+from app.cache import CACHES
+from app.database import ASYNC_DISPONIVEL, descartar_engines
+from app.esquema import garantir_esquema
+from app.relatorios import encerrar_pool as encerrar_pool_relatorios
+from app.routes import veiculos, usuarios, manutencoes, planos, custos, documentos, relatorios
+
+logger = logging.getLogger("app")
 
 
 # ============================================================
-# 1. Criação das tabelas do banco
+# 1. Inicialização e encerramento (lifespan)
 # ============================================================
-# O SQLAlchemy cria automaticamente todas as tabelas
-# definidas em models.py se elas ainda não existirem.
-Base.metadata.create_all(bind=engine)
+# Nada acessa o banco na importação do módulo: o engine é criado
+# e o esquema verificado quando o servidor inicia o app. Se o banco
+# já está na versão atual, a verificação é uma única consulta.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    inicio = time.perf_counter()
+    esquema_aplicado = await run_in_threadpool(garantir_esquema)
+    duracao = time.perf_counter() - inicio
+    metricas.definir_indicador("app_startup_seconds", duracao, "Tempo de inicialização do processo.")
+    logger.info(
+        "Inicialização em %.1f ms (%s)", duracao * 1000,
+        "esquema aplicado" if esquema_aplicado else "esquema já atualizado",
+    )
+    escrita.iniciar_escritor()
+    yield
+    await escrita.encerrar_escritor()
+    await run_in_threadpool(seguranca.encerrar_pool)
+    await run_in_threadpool(encerrar_pool_relatorios)
+    await descartar_engines()
+
 
 # ============================================================
 # 2. Inicialização do aplicativo FastAPI
@@ -27,8 +56,11 @@ Base.metadata.create_all(bind=engine)
 app = FastAPI(
     title="API - Minha Manutenção Veicular",
     description="Sistema para cadastro e controle de manutenção de veículos.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
+# Latência por rota e consultas SQL por requisição (ver GET /metrics)
+app.add_middleware(metricas.MiddlewareMetricas)
 
 # ============================================================
 # 3. Registro das rotas
@@ -41,6 +73,16 @@ app.include_router(usuarios.router)
 app.include_router(manutencoes.router)
 # Aqui adicionamos o módulo de planos de manutenção
 app.include_router(planos.router)
+# Aqui adicionamos o módulo de custos
+app.include_router(custos.router)
+# Aqui adicionamos o módulo de documentos (upload/download de arquivos)
+app.include_router(documentos.router)
+# Aqui adicionamos o módulo de relatórios (gerados em segundo plano)
+app.include_router(relatorios.router)
+# Versões assíncronas das rotas (somente com o driver aiosqlite instalado)
+if ASYNC_DISPONIVEL:
+    from app.routes import assincronas
+    app.include_router(assincronas.router)
 
 # ============================================================
 # 4. Rota inicial (opcional)
@@ -51,3 +93,32 @@ def home():
     Endpoint inicial de boas-vindas.
     """
     return {"mensagem": "Bem-vindo à API de Manutenção Veicular 🚗"}
+
+
+# ============================================================
+# 5. Estatísticas do cache em memória
+# ============================================================
+@app.get("/cache/estatisticas", tags=["Diagnóstico"])
+def estatisticas_cache():
+    """
+    Contadores de acertos/falhas dos caches deste processo.
+    """
+    return [cache.estatisticas() for cache in CACHES]
+
+
+# ============================================================
+# 6. Métricas no formato Prometheus
+# ============================================================
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def exportar_metricas():
+    """
+    Métricas de desempenho deste processo no formato texto do Prometheus.
+    """
+    extras = ["# TYPE cache_hits_total counter", "# TYPE cache_misses_total counter"]
+    for cache in CACHES:
+        dados = cache.estatisticas()
+        extras.append(f'cache_hits_total{{cache="{dados["nome"]}"}} {dados["acertos"]}')
+        extras.append(f'cache_misses_total{{cache="{dados["nome"]}"}} {dados["falhas"]}')
+    return PlainTextResponse(
+        metricas.exportar_prometheus(extras), media_type="text/plain; version=0.0.4"
+    )
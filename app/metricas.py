@@ -0,0 +1,200 @@
+# Módulo: metricas.py
+"""
+Módulo: metricas.py
+Instrumentação de desempenho por requisição, exportada no formato texto
+do Prometheus em GET /metrics.
+
+- MiddlewareMetricas (ASGI puro) mede a latência de cada requisição e a
+  registra por método, rota (o modelo do caminho, ex.: /veiculos/{veiculo_id})
+  e status.
+- instrumentar_engine registra os eventos before/after_cursor_execute do
+  SQLAlchemy, que contam e cronometram as consultas da requisição atual.
+- Consultas lentas podem ser registradas no log com o SQL (e, se
+  habilitado, os parâmetros).
+
+As métricas ficam na memória de cada processo (worker).
+
+Configuração por variáveis de ambiente:
+- METRICAS_CONSULTA_LENTA_MS: limite para log de consulta lenta (0 = desligado)
+- METRICAS_LOG_PARAMETROS: "1" para incluir os parâmetros no log (podem
+  conter dados pessoais; desligado por padrão)
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+logger = logging.getLogger("app.metricas")
+
+CONSULTA_LENTA_MS = float(os.getenv("METRICAS_CONSULTA_LENTA_MS", 0))
+LOG_PARAMETROS = os.getenv("METRICAS_LOG_PARAMETROS") == "1"
+
+# Acumulador [quantidade, segundos] das consultas da requisição atual.
+# É uma lista (mutável) para que as threads do threadpool, que recebem
+# uma cópia do contexto, atualizem o mesmo objeto.
+_consultas_requisicao: ContextVar = ContextVar("consultas_requisicao", default=None)
+
+
+class Histograma:
+    """Histograma cumulativo no estilo Prometheus, com rótulos."""
+
+    def __init__(self, nome: str, descricao: str, rotulos: tuple, limites: tuple):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = rotulos
+        self.limites = limites
+        self._series = {}
+        self._trava = threading.Lock()
+
+    def observar(self, valor: float, *rotulos):
+        indice = bisect.bisect_left(self.limites, valor)
+        with self._trava:
+            serie = self._series.get(rotulos)
+            if serie is None:
+                # contagens por faixa (+Inf no fim), soma, total
+                serie = self._series[rotulos] = [[0] * (len(self.limites) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def exportar(self) -> list:
+        linhas = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} histogram"]
+        with self._trava:
+            series = [(r, list(s[0]), s[1], s[2]) for r, s in self._series.items()]
+        for rotulos, contagens, soma, total in sorted(series):
+            base = ",".join(f'{n}="{_escapar(v)}"' for n, v in zip(self.rotulos, rotulos))
+            separador = "," if base else ""
+            acumulado = 0
+            for limite, contagem in zip(self.limites + ("+Inf",), contagens):
+                acumulado += contagem
+                linhas.append(f'{self.nome}_bucket{{{base}{separador}le="{limite}"}} {acumulado}')
+            sufixo = f"{{{base}}}" if base else ""
+            linhas.append(f"{self.nome}_sum{sufixo} {soma}")
+            linhas.append(f"{self.nome}_count{sufixo} {total}")
+        return linhas
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+LIMITES_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+duracao_requisicoes = Histograma(
+    "http_request_duration_seconds", "Latência das requisições HTTP.",
+    ("method", "route", "status"), LIMITES_SEGUNDOS,
+)
+consultas_por_requisicao = Histograma(
+    "db_queries_per_request", "Quantidade de consultas SQL por requisição.",
+    ("method", "route"), (0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+tempo_banco_por_requisicao = Histograma(
+    "db_time_per_request_seconds", "Tempo total em consultas SQL por requisição.",
+    ("method", "route"), LIMITES_SEGUNDOS,
+)
+duracao_consultas = Histograma(
+    "db_query_duration_seconds", "Latência de cada consulta SQL.",
+    (), LIMITES_SEGUNDOS,
+)
+HISTOGRAMAS = [duracao_requisicoes, consultas_por_requisicao, tempo_banco_por_requisicao, duracao_consultas]
+
+
+# ============================================================
+# 1. Eventos do SQLAlchemy
+# ============================================================
+
+def instrumentar_engine(engine_sync):
+    """Conta e cronometra as consultas executadas pelo engine."""
+
+    # O início fica no contexto de execução do comando, e não na conexão:
+    # um comando que falha (sem after_cursor_execute) não deixa resto
+    # para ser lido pelo próximo comando da mesma conexão do pool.
+    @event.listens_for(engine_sync, "before_cursor_execute")
+    def antes_da_consulta(conexao, cursor, sql, parametros, contexto, executemany):
+        contexto._inicio_consulta = time.perf_counter()
+
+    @event.listens_for(engine_sync, "after_cursor_execute")
+    def depois_da_consulta(conexao, cursor, sql, parametros, contexto, executemany):
+        duracao = time.perf_counter() - contexto._inicio_consulta
+        duracao_consultas.observar(duracao)
+        acumulador = _consultas_requisicao.get()
+        if acumulador is not None:
+            acumulador[0] += 1
+            acumulador[1] += duracao
+        if CONSULTA_LENTA_MS and duracao * 1000 >= CONSULTA_LENTA_MS:
+            if LOG_PARAMETROS:
+                logger.warning("Consulta lenta (%.1f ms): %s | parâmetros: %r", duracao * 1000, sql, parametros)
+            else:
+                logger.warning("Consulta lenta (%.1f ms): %s", duracao * 1000, sql)
+
+
+# ============================================================
+# 2. Middleware de latência por rota
+# ============================================================
+
+class MiddlewareMetricas:
+    """Middleware ASGI que registra latência e consultas de cada requisição."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        acumulador = [0, 0.0]
+        token = _consultas_requisicao.set(acumulador)
+        status_resposta = [500]
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                status_resposta[0] = mensagem["status"]
+            await send(mensagem)
+
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracao = time.perf_counter() - inicio
+            _consultas_requisicao.reset(token)
+            # O roteador grava a rota encontrada no próprio scope; usar o
+            # modelo do caminho evita uma série por id acessado
+            rota = scope.get("route")
+            caminho = getattr(rota, "path", None) or "<nao_encontrada>"
+            metodo = scope["method"]
+            duracao_requisicoes.observar(duracao, metodo, caminho, str(status_resposta[0]))
+            consultas_por_requisicao.observar(acumulador[0], metodo, caminho)
+            tempo_banco_por_requisicao.observar(acumulador[1], metodo, caminho)
+
+
+# ============================================================
+# 3. Indicadores simples (gauges)
+# ============================================================
+
+_indicadores = {}
+
+
+def definir_indicador(nome: str, valor: float, descricao: str):
+    """Registra (ou substitui) o valor de um indicador pontual."""
+    _indicadores[nome] = (valor, descricao)
+
+
+# ============================================================
+# 4. Exportação
+# ============================================================
+
+def exportar_prometheus(extras: list = ()) -> str:
+    """Todas as métricas no formato texto do Prometheus (versão 0.0.4)."""
+    linhas = []
+    for histograma in HISTOGRAMAS:
+        linhas.extend(histograma.exportar())
+    for nome, (valor, descricao) in sorted(_indicadores.items()):
+        linhas.extend([f"# HELP {nome} {descricao}", f"# TYPE {nome} gauge", f"{nome} {valor}"])
+    linhas.extend(extras)
+    return "\n".join(linhas) + "\n"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, Text, Index, PrimaryKeyConstraint
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -28,7 +28,7 @@ class Veiculo(Base):
     marca = Column(String(100))
     ano = Column(Integer)
     km_atual = Column(Integer)
-    usuario_id = Column(Integer, ForeignKey("usuarios.id"))
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), index=True)
 
     # Relacionamentos
     usuario = relationship("Usuario", back_populates="veiculos")
@@ -40,6 +40,13 @@ class Veiculo(Base):
 # -----------------------------------------------------------
 class Manutencao(Base):
     __tablename__ = "manutencoes"
+    __table_args__ = (
+        # Histórico de um veículo em ordem de data. Também atende as
+        # buscas só por veiculo_id (coluna inicial do índice).
+        Index("ix_manutencoes_veiculo_data", "veiculo_id", "data"),
+        # Última quilometragem por veículo e tipo (cálculo de vencimentos)
+        Index("ix_manutencoes_veiculo_tipo_km", "veiculo_id", "tipo_manutencao", "km"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     veiculo_id = Column(Integer, ForeignKey("veiculos.id"), nullable=False)
@@ -61,7 +68,7 @@ class Documento(Base):
     __tablename__ = "documentos"
 
     id = Column(Integer, primary_key=True, index=True)
-    manutencao_id = Column(Integer, ForeignKey("manutencoes.id"), nullable=False)
+    manutencao_id = Column(Integer, ForeignKey("manutencoes.id"), nullable=False, index=True)
     nome_arquivo = Column(String(200), nullable=False)
     tipo = Column(String(50))
     caminho_arquivo = Column(String(250))
@@ -76,10 +83,70 @@ class PlanoManutencao(Base):
     __tablename__ = "planos_manutencao"
 
     id = Column(Integer, primary_key=True, index=True)
-    veiculo_id = Column(Integer, ForeignKey("veiculos.id"), nullable=False)
+    veiculo_id = Column(Integer, ForeignKey("veiculos.id"), nullable=False, index=True)
     nome_plano = Column(String(100))
     km_referencia = Column(Integer)
     servicos = Column(Text)
 
     # Relacionamento com veículo
     veiculo = relationship("Veiculo", back_populates="planos")
+
+# -----------------------------------------------------------
+# 6. Resumo de custos (tabela derivada)
+# -----------------------------------------------------------
+# Totais de manutenções por veículo, mês e tipo. Mantida de forma
+# incremental pelas funções de escrita em crud.py e reconstruída
+# do zero com: python -m app.resumos
+class ResumoCusto(Base):
+    __tablename__ = "resumo_custos"
+    __table_args__ = (
+        PrimaryKeyConstraint("veiculo_id", "mes", "tipo_manutencao"),
+    )
+
+    veiculo_id = Column(Integer, ForeignKey("veiculos.id"), nullable=False)
+    mes = Column(String(7), nullable=False)                # "AAAA-MM" ou "" (sem data)
+    tipo_manutencao = Column(String(100), nullable=False)  # "" quando não informado
+    total = Column(Float, nullable=False, default=0)
+    quantidade = Column(Integer, nullable=False, default=0)
+
+# -----------------------------------------------------------
+# 7. Versão do esquema
+# -----------------------------------------------------------
+# Linha única com a assinatura do esquema aplicado ao banco. Permite
+# pular a criação de tabelas/índices na inicialização quando o banco
+# já está atualizado (ver esquema.garantir_esquema).
+class EsquemaVersao(Base):
+    __tablename__ = "esquema_versao"
+
+    id = Column(Integer, primary_key=True)
+    versao = Column(String(64), nullable=False)
+
+# -----------------------------------------------------------
+# 8. Versões dos dados
+# -----------------------------------------------------------
+# Contadores incrementados a cada escrita, por tabela ("veiculos",
+# "planos"...) e por veículo ("veiculo:42"). Servem de base para os
+# ETags das listagens (ver versoes.py).
+class VersaoDados(Base):
+    __tablename__ = "versoes_dados"
+
+    chave = Column(String(100), primary_key=True)
+    versao = Column(Integer, nullable=False, default=0)
+
+# -----------------------------------------------------------
+# 9. Leituras de odômetro
+# -----------------------------------------------------------
+# Histórico de quilometragem (somente inserção): uma leitura a cada
+# alteração de km_atual e a cada manutenção com km. Leituras antigas
+# são reduzidas a uma por veículo e mês com: python -m app.odometro
+class LeituraOdometro(Base):
+    __tablename__ = "leituras_odometro"
+    __table_args__ = (
+        Index("ix_leituras_odometro_veiculo_data", "veiculo_id", "data"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    veiculo_id = Column(Integer, ForeignKey("veiculos.id"), nullable=False)
+    data = Column(Date, nullable=False)
+    km = Column(Integer, nullable=False)
+    origem = Column(String(20), nullable=False)  # "veiculo" ou "manutencao"
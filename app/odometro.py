@@ -0,0 +1,206 @@
+# Módulo: odometro.py
+"""
+Módulo: odometro.py
+Histórico de quilometragem (tabela leituras_odometro) e previsão de
+quando cada plano de manutenção vai vencer.
+
+As funções de escrita de crud.py registram uma leitura, na mesma
+transação, sempre que km_atual de um veículo muda e a cada manutenção
+com km informado. A tabela só recebe inserções; para limitar seu
+tamanho, leituras antigas são reduzidas a uma por veículo e mês
+(a de maior km), o que preserva a tendência de uso:
+
+    python -m app.odometro              # compacta leituras com mais de 180 dias
+    python -m app.odometro --dias 365
+
+A previsão ajusta uma reta km x dia por veículo (mínimos quadrados),
+para a frota inteira de uma vez, com operações vetorizadas do NumPy
+(np.bincount por grupo). NumPy é opcional: sem ele, a previsão fica
+indisponível e o restante da aplicação funciona normalmente.
+"""
+
+import argparse
+from datetime import date, timedelta
+from typing import Iterable
+
+from sqlalchemy import String, cast, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import executar_comandos
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+NUMPY_DISPONIVEL = np is not None
+
+Leitura = models.LeituraOdometro
+
+DIAS_COMPACTACAO = 180
+
+# Dias das leituras nos arrays do NumPy são contados a partir desta data
+EPOCA = date(1970, 1, 1)
+
+
+# ============================================================
+# 1. Registro de leituras
+# ============================================================
+
+def leitura(veiculo_id: int, km: int, data: date = None, origem: str = "veiculo") -> dict:
+    """Linha de leitura pronta para inserção (data padrão: hoje)."""
+    return {"veiculo_id": veiculo_id, "data": data or date.today(), "km": km, "origem": origem}
+
+
+def leituras_de_veiculo(veiculo) -> list:
+    """Leitura do km_atual de um veículo (nenhuma se o km não foi informado)."""
+    if veiculo.km_atual is None:
+        return []
+    return [leitura(veiculo.id, veiculo.km_atual)]
+
+
+def leituras_de_manutencoes(manutencoes: Iterable) -> list:
+    """
+    Leituras de várias manutenções (objetos ORM ou dicionários).
+    Manutenções sem km são ignoradas; sem data, vale a data do registro.
+    """
+    linhas = []
+    for m in manutencoes:
+        if isinstance(m, dict):
+            veiculo_id, km, data = m["veiculo_id"], m.get("km"), m.get("data")
+        else:
+            veiculo_id, km, data = m.veiculo_id, m.km, m.data
+        if km is not None:
+            linhas.append(leitura(veiculo_id, km, data, "manutencao"))
+    return linhas
+
+
+def comandos_registrar(leituras: list):
+    """Gerador do comando de registrar (ver database.executar_comandos)."""
+    if leituras:
+        yield insert(Leitura), leituras
+
+
+def registrar(db: Session, leituras: list):
+    """Insere as leituras na transação corrente (sem commit)."""
+    executar_comandos(db, comandos_registrar(leituras))
+
+
+# ============================================================
+# 2. Compactação e reconstrução
+# ============================================================
+
+def compactar(db: Session, dias: int = DIAS_COMPACTACAO, hoje: date = None) -> int:
+    """
+    Mantém só a leitura de maior km por veículo e mês entre as leituras
+    com mais de `dias` dias. Retorna o número de leituras removidas.
+    """
+    limite = (hoje or date.today()) - timedelta(days=dias)
+    mes = func.substr(cast(Leitura.data, String), 1, 7)
+    ordem = func.row_number().over(
+        partition_by=(Leitura.veiculo_id, mes), order_by=(Leitura.km.desc(), Leitura.id.desc())
+    )
+    antigas = select(Leitura.id, ordem.label("ordem")).where(Leitura.data < limite).subquery()
+    removidas = db.execute(
+        delete(Leitura).where(Leitura.id.in_(select(antigas.c.id).where(antigas.c.ordem > 1)))
+    ).rowcount
+    db.commit()
+    return removidas
+
+
+def reconstruir(db: Session):
+    """
+    Recria o histórico a partir dos dados atuais (bancos criados antes
+    desta tabela): uma leitura por manutenção com data e km e o
+    km_atual de cada veículo, com a data de hoje.
+    """
+    M, V = models.Manutencao, models.Veiculo
+    colunas = ["veiculo_id", "data", "km", "origem"]
+    db.execute(delete(Leitura))
+    db.execute(insert(Leitura).from_select(colunas, select(
+        M.veiculo_id, M.data, M.km, literal("manutencao")
+    ).where(M.km.isnot(None), M.data.isnot(None))))
+    db.execute(insert(Leitura).from_select(colunas, select(
+        V.id, literal(date.today()), V.km_atual, literal("veiculo")
+    ).where(V.km_atual.isnot(None))))
+    db.commit()
+
+
+# ============================================================
+# 3. Ajuste de km por dia (NumPy)
+# ============================================================
+
+def ler_leituras(db: Session, consulta):
+    """
+    Executa uma consulta (veiculo_id, data, km) e devolve três arrays
+    paralelos, com as datas em dias desde EPOCA. As linhas são lidas
+    direto do cursor do driver: para centenas de milhares de leituras,
+    montar objetos Row e date custaria mais que o próprio ajuste.
+    """
+    resultado = db.connection().execute(consulta)
+    try:
+        linhas = resultado.cursor.fetchall()
+    finally:
+        resultado.close()
+    quantidade = len(linhas)
+    veiculo_ids = np.fromiter((linha[0] for linha in linhas), np.int64, quantidade)
+    # O driver entrega a data como texto ISO (SQLite) ou date; o NumPy converte os dois
+    dias = np.array([linha[1] for linha in linhas], dtype="datetime64[D]").astype(np.int64)
+    kms = np.fromiter((linha[2] for linha in linhas), np.float64, quantidade)
+    return veiculo_ids, dias, kms
+
+
+def ajustar_km_por_dia(veiculo_ids, dias, kms) -> dict:
+    """
+    Ajusta km = a + b * dia para cada veículo, com as leituras de toda a
+    frota em arrays paralelos (ver ler_leituras).
+
+    Retorna {veiculo_id: (km_por_dia, km_referencia, dia_referencia)},
+    onde a referência é a maior km lida e o dia mais recente. km_por_dia
+    é None quando não há leituras suficientes ou o km não cresce.
+    """
+    ids = np.asarray(veiculo_ids)
+    x = np.asarray(dias, dtype=np.float64)
+    y = np.asarray(kms, dtype=np.float64)
+    veiculos, grupo = np.unique(ids, return_inverse=True)
+    quantidade = len(veiculos)
+
+    # Somas por veículo em uma passada cada: n, médias, Sxx e Sxy centrados
+    n = np.bincount(grupo, minlength=quantidade)
+    media_x = np.bincount(grupo, x, quantidade) / n
+    media_y = np.bincount(grupo, y, quantidade) / n
+    dx = x - media_x[grupo]
+    dy = y - media_y[grupo]
+    sxx = np.bincount(grupo, dx * dx, quantidade)
+    sxy = np.bincount(grupo, dx * dy, quantidade)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inclinacao = np.where(sxx > 0, sxy / sxx, np.nan)
+
+    km_referencia = np.full(quantidade, -np.inf)
+    np.maximum.at(km_referencia, grupo, y)
+    dia_referencia = np.full(quantidade, -np.inf)
+    np.maximum.at(dia_referencia, grupo, x)
+
+    return {
+        veiculo: ((b if b > 0 else None), int(km), int(dia))
+        for veiculo, b, km, dia in zip(
+            veiculos.tolist(), np.nan_to_num(inclinacao, nan=0.0).tolist(),
+            km_referencia.tolist(), dia_referencia.tolist(),
+        )
+    }
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Compacta o histórico de leituras de odômetro.")
+    parser.add_argument("--dias", type=int, default=DIAS_COMPACTACAO,
+                        help="idade mínima (em dias) das leituras compactadas")
+    args = parser.parse_args()
+
+    sessao = SessionLocal()
+    try:
+        print(f"Leituras removidas: {compactar(sessao, args.dias)}")
+    finally:
+        sessao.close()
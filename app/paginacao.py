@@ -0,0 +1,71 @@
+# Módulo: paginacao.py
+"""
+Módulo: paginacao.py
+Utilitários de paginação por cursor (keyset) usados pelas rotas de listagem.
+O cursor é opaco para o cliente e carrega apenas o último id retornado,
+permitindo consultas do tipo WHERE id > :cursor ORDER BY id LIMIT n.
+"""
+
+import base64
+import binascii
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Query
+
+LIMITE_PADRAO = 100
+LIMITE_MAXIMO = 1000
+
+# Maior inteiro do SQLite: ids acima disso nem chegam ao banco (OverflowError)
+ID_MAXIMO = 2**63 - 1
+
+
+def codificar_cursor(ultimo_id: int) -> str:
+    """Gera o cursor opaco a partir do último id da página."""
+    return base64.urlsafe_b64encode(f"id:{ultimo_id}".encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: Optional[str]) -> int:
+    """
+    Converte o cursor recebido no último id já entregue.
+    Retorna 0 quando não há cursor (primeira página).
+    Lança ValueError se o cursor for inválido.
+    """
+    if not cursor:
+        return 0
+    try:
+        preenchimento = "=" * (-len(cursor) % 4)
+        texto = base64.urlsafe_b64decode(cursor + preenchimento).decode()
+    except (binascii.Error, UnicodeDecodeError) as erro:
+        raise ValueError("Cursor inválido.") from erro
+    prefixo, _, valor = texto.partition(":")
+    if prefixo != "id" or not valor.isdigit() or int(valor) > ID_MAXIMO:
+        raise ValueError("Cursor inválido.")
+    return int(valor)
+
+
+def montar_pagina(itens: list, limite: int) -> dict:
+    """
+    Monta a resposta paginada.
+    Espera receber até limite + 1 itens: o item excedente indica
+    que existe uma próxima página e não é devolvido ao cliente.
+    """
+    proximo = None
+    if len(itens) > limite:
+        itens = itens[:limite]
+        proximo = codificar_cursor(itens[-1].id)
+    return {"itens": itens, "next_cursor": proximo}
+
+
+def parametros_paginacao(
+    limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO, description="Quantidade máxima de itens."),
+    cursor: Optional[str] = Query(None, description="Valor de next_cursor da página anterior."),
+) -> Tuple[int, int]:
+    """
+    Dependency para as rotas de listagem.
+    Retorna (apos_id, limite) já validados.
+    """
+    try:
+        apos_id = decodificar_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido.")
+    return apos_id, limit
@@ -0,0 +1,374 @@
+# Módulo: relatorios.py
+"""
+Módulo: relatorios.py
+Relatórios anuais de manutenção (por veículo ou da frota do usuário),
+gerados em segundo plano.
+
+Montar o relatório de uma frota grande leva de segundos a minutos, então
+a rota só enfileira o pedido: a geração roda em um pool de processos
+próprio (separado do pool de senhas de seguranca.py), percorre as
+consultas de crud.py em fluxo e grava o arquivo em RELATORIOS_DIR. O
+cliente acompanha em GET /relatorios/{id} e baixa o arquivo pronto.
+
+O id do relatório é o hash do pedido (usuário, veículo, ano, formato),
+do dia e das versões dos dados (versoes.py) de cada veículo incluído e
+da tabela de documentos. O arquivo gravado com esse id é o próprio
+cache: repetir o pedido sem que nada tenha mudado responde na hora com o
+relatório já pronto, inclusive depois de reiniciar o servidor, e pedidos
+iguais simultâneos compartilham a mesma geração. Qualquer escrita nos
+veículos, manutenções, planos ou documentos muda o id, e o próximo
+pedido gera um relatório novo.
+
+Os processos usam o método "spawn": scripts que usem este módulo
+diretamente precisam do bloco `if __name__ == "__main__":`.
+
+Configuração por variáveis de ambiente:
+- RELATORIOS_DIR: diretório dos arquivos gerados (padrão ./relatorios)
+- RELATORIOS_WORKERS: processos do pool (padrão 1)
+- RELATORIOS_RETENCAO_DIAS: arquivos mais antigos são apagados quando
+  o pool é criado (padrão 7)
+"""
+
+import csv
+import functools
+import hashlib
+import html
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas, versoes
+
+RELATORIOS_DIR = os.path.abspath(os.getenv("RELATORIOS_DIR", "./relatorios"))
+RELATORIOS_WORKERS = int(os.getenv("RELATORIOS_WORKERS", 1))
+RELATORIOS_RETENCAO_DIAS = float(os.getenv("RELATORIOS_RETENCAO_DIAS", 7))
+
+TIPOS_CONTEUDO = {
+    schemas.FormatoRelatorio.csv: "text/csv",
+    schemas.FormatoRelatorio.html: "text/html",
+}
+
+# Situação dos relatórios pedidos a este processo, por id
+trabalhos = {}
+_trava_trabalhos = threading.Lock()
+
+_pool = None
+_trava_pool = threading.Lock()
+
+
+# ============================================================
+# 1. Montagem do relatório (executada nos processos do pool)
+# ============================================================
+
+def _acumular(totais: dict, chave, custo: float, documentos: int, quantidade: int = 1):
+    """Soma (quantidade, custo, documentos) em totais[chave]."""
+    anterior = totais.get(chave, (0, 0.0, 0))
+    totais[chave] = (anterior[0] + quantidade, anterior[1] + (custo or 0), anterior[2] + documentos)
+
+
+def _secoes(db: Session, parametros: dict, hoje: date):
+    """
+    Para cada veículo do relatório: (veículo, manutenções do ano em
+    ordem de data, previsões dos planos). As manutenções chegam em um
+    único fluxo ordenado por veículo e são repartidas sem materializar.
+    """
+    usuario_id, veiculo_id, ano = parametros["usuario_id"], parametros["veiculo_id"], parametros["ano"]
+    veiculos = crud.listar_veiculos_do_relatorio(db, usuario_id, veiculo_id)
+    planos = {}
+    for previsao in crud.prever_planos(db, usuario_id=usuario_id, veiculo_id=veiculo_id, hoje=hoje):
+        planos.setdefault(previsao["veiculo_id"], []).append(previsao)
+    linhas = crud.iterar_manutencoes_relatorio(db, usuario_id, date(ano, 1, 1), date(ano + 1, 1, 1), veiculo_id)
+
+    grupos = itertools.groupby(linhas, key=lambda linha: linha.veiculo_id)
+    grupo = next(grupos, None)
+    for veiculo in veiculos:
+        # Veículos cadastrados depois da listagem acima ficam de fora
+        while grupo is not None and grupo[0] < veiculo.id:
+            grupo = next(grupos, None)
+        if grupo is not None and grupo[0] == veiculo.id:
+            yield veiculo, grupo[1], planos.get(veiculo.id, [])
+            grupo = next(grupos, None)
+        else:
+            yield veiculo, (), planos.get(veiculo.id, [])
+
+
+def _montar(db: Session, parametros: dict, hoje: date, saida):
+    """Percorre as seções do relatório, acumulando os totais, e as entrega à saída (CSV ou HTML)."""
+    frota = {}
+    saida.inicio(parametros["ano"], hoje)
+    for veiculo, manutencoes, planos in _secoes(db, parametros, hoje):
+        saida.veiculo(veiculo)
+        por_tipo = {}
+        for manutencao in manutencoes:
+            saida.manutencao(veiculo, manutencao)
+            _acumular(por_tipo, manutencao.tipo_manutencao or "", manutencao.custo, manutencao.documentos)
+        total = tuple(map(sum, zip(*por_tipo.values()))) or (0, 0.0, 0)
+        _acumular(frota, None, total[1], total[2], total[0])
+        saida.totais(veiculo, por_tipo, total)
+        saida.planos(veiculo, planos)
+    saida.fim(frota.get(None, (0, 0.0, 0)))
+
+
+class _SaidaCsv:
+    """Uma linha por manutenção, total por tipo, total do veículo e plano (coluna secao)."""
+
+    CAMPOS = [
+        "secao", "veiculo_id", "placa", "data", "km", "tipo_manutencao", "descricao", "custo",
+        "prestador_servico", "documentos", "quantidade", "proximo_km", "data_prevista", "situacao",
+    ]
+
+    def __init__(self, arquivo):
+        self.escritor = csv.DictWriter(arquivo, self.CAMPOS)
+
+    def inicio(self, ano, hoje):
+        self.escritor.writeheader()
+
+    def veiculo(self, veiculo):
+        pass
+
+    def manutencao(self, veiculo, linha):
+        self.escritor.writerow({
+            "secao": "manutencao", "veiculo_id": veiculo.id, "placa": veiculo.placa, "data": linha.data,
+            "km": linha.km, "tipo_manutencao": linha.tipo_manutencao, "descricao": linha.descricao,
+            "custo": linha.custo, "prestador_servico": linha.prestador_servico, "documentos": linha.documentos,
+        })
+
+    def totais(self, veiculo, por_tipo, total):
+        for tipo, (quantidade, custo, documentos) in sorted(por_tipo.items()):
+            self.escritor.writerow({
+                "secao": "total_tipo", "veiculo_id": veiculo.id, "placa": veiculo.placa, "tipo_manutencao": tipo,
+                "custo": round(custo, 2), "documentos": documentos, "quantidade": quantidade,
+            })
+        self.escritor.writerow({
+            "secao": "total_veiculo", "veiculo_id": veiculo.id, "placa": veiculo.placa,
+            "custo": round(total[1], 2), "documentos": total[2], "quantidade": total[0],
+        })
+
+    def planos(self, veiculo, planos):
+        for plano in planos:
+            self.escritor.writerow({
+                "secao": "plano", "veiculo_id": veiculo.id, "placa": veiculo.placa,
+                "km": plano["km_atual"], "tipo_manutencao": plano["nome_plano"],
+                "proximo_km": plano["proximo_km"], "data_prevista": plano["data_prevista"],
+                "situacao": plano["situacao"],
+            })
+
+    def fim(self, total):
+        self.escritor.writerow({
+            "secao": "total_frota", "custo": round(total[1], 2), "documentos": total[2], "quantidade": total[0],
+        })
+
+
+def _celulas(*valores, tag: str = "td") -> str:
+    return "<tr>" + "".join(
+        f"<{tag}>{html.escape('' if valor is None else str(valor))}</{tag}>" for valor in valores
+    ) + "</tr>\n"
+
+
+class _SaidaHtml:
+    """Página para impressão: uma seção por veículo com manutenções, totais por tipo e planos."""
+
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+
+    def inicio(self, ano, hoje):
+        self.arquivo.write(
+            "<!DOCTYPE html>\n<html lang=\"pt-BR\"><head><meta charset=\"utf-8\">"
+            f"<title>Relatório de manutenções {ano}</title>"
+            "<style>body{font-family:sans-serif}table{border-collapse:collapse;margin-bottom:1em}"
+            "td,th{border:1px solid #999;padding:2px 6px}h2{page-break-before:auto}</style>"
+            f"</head><body>\n<h1>Relatório de manutenções {ano}</h1>\n<p>Gerado em {hoje.isoformat()}</p>\n"
+        )
+
+    def veiculo(self, veiculo):
+        titulo = " ".join(str(parte) for parte in (veiculo.placa, veiculo.marca, veiculo.modelo, veiculo.ano) if parte)
+        self.arquivo.write(f"<h2>{html.escape(titulo)}</h2>\n<table>\n")
+        self.arquivo.write(_celulas("Data", "Km", "Tipo", "Descrição", "Custo", "Prestador", "Documentos", tag="th"))
+
+    def manutencao(self, veiculo, linha):
+        custo = None if linha.custo is None else f"{linha.custo:.2f}"
+        self.arquivo.write(_celulas(
+            linha.data, linha.km, linha.tipo_manutencao, linha.descricao, custo, linha.prestador_servico,
+            linha.documentos,
+        ))
+
+    def totais(self, veiculo, por_tipo, total):
+        self.arquivo.write("</table>\n<table>\n" + _celulas("Tipo", "Quantidade", "Custo", "Documentos", tag="th"))
+        for tipo, (quantidade, custo, documentos) in sorted(por_tipo.items()):
+            self.arquivo.write(_celulas(tipo, quantidade, f"{custo:.2f}", documentos))
+        self.arquivo.write(_celulas("Total", total[0], f"{total[1]:.2f}", total[2], tag="th") + "</table>\n")
+
+    def planos(self, veiculo, planos):
+        if not planos:
+            return
+        self.arquivo.write("<table>\n" + _celulas("Plano", "Km atual", "Próximo km", "Data prevista", "Situação", tag="th"))
+        for plano in planos:
+            self.arquivo.write(_celulas(
+                plano["nome_plano"], plano["km_atual"], plano["proximo_km"], plano["data_prevista"], plano["situacao"],
+            ))
+        self.arquivo.write("</table>\n")
+
+    def fim(self, total):
+        self.arquivo.write(
+            f"<h2>Total</h2>\n<p>{total[0]} manutenção(ões), custo {total[1]:.2f}, "
+            f"{total[2]} documento(s)</p>\n</body></html>\n"
+        )
+
+
+SAIDAS = {schemas.FormatoRelatorio.csv: _SaidaCsv, schemas.FormatoRelatorio.html: _SaidaHtml}
+
+
+def gerar(parametros: dict, hoje: date, caminho: str) -> int:
+    """
+    Gera o relatório em caminho (por um arquivo temporário no mesmo
+    diretório, renomeado ao final). Retorna o tamanho em bytes.
+    """
+    from app.database import ReadSessionLocal
+
+    descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix=".tmp")
+    try:
+        with os.fdopen(descritor, "w", encoding="utf-8", newline="") as arquivo, ReadSessionLocal() as db:
+            saida = SAIDAS[schemas.FormatoRelatorio(parametros["formato"])](arquivo)
+            _montar(db, parametros, hoje, saida)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return os.path.getsize(caminho)
+
+
+# ============================================================
+# 2. Identificação e arquivos dos relatórios
+# ============================================================
+
+def calcular_id(db: Session, parametros: dict, hoje: date) -> str:
+    """
+    Hash do pedido, do dia (as previsões dos planos dependem dele) e das
+    versões dos dados que entram no relatório.
+    """
+    veiculos = [v.id for v in crud.listar_veiculos_do_relatorio(db, parametros["usuario_id"], parametros["veiculo_id"])]
+    chaves = [versoes.chave_veiculo(veiculo_id) for veiculo_id in veiculos]
+    chaves.append(versoes.CHAVES_TABELA[models.Documento])
+    base = json.dumps([parametros, hoje.isoformat(), veiculos, versoes.obter(db, chaves)], sort_keys=True)
+    return hashlib.sha256(base.encode()).hexdigest()[:32]
+
+
+def caminho_relatorio(relatorio_id: str, formato: str) -> str:
+    return os.path.join(RELATORIOS_DIR, f"{relatorio_id}.{formato}")
+
+
+def _situacao(relatorio_id: str, formato: str, situacao: str, tamanho: int = None, erro: str = None) -> dict:
+    return {"id": relatorio_id, "situacao": situacao, "formato": formato, "tamanho": tamanho, "erro": erro}
+
+
+def _no_disco(relatorio_id: str) -> Optional[dict]:
+    """Situação "concluido" se o arquivo do relatório existe."""
+    for formato in schemas.FormatoRelatorio:
+        caminho = caminho_relatorio(relatorio_id, formato.value)
+        if os.path.exists(caminho):
+            return _situacao(relatorio_id, formato.value, "concluido", os.path.getsize(caminho))
+    return None
+
+
+def remover_expirados(dias: float = RELATORIOS_RETENCAO_DIAS) -> int:
+    """Apaga os relatórios (e temporários) com mais de `dias` dias. Retorna quantos."""
+    limite = time.time() - dias * 86400
+    removidos = 0
+    with os.scandir(RELATORIOS_DIR) as entradas:
+        for entrada in entradas:
+            if entrada.is_file() and entrada.stat().st_mtime < limite:
+                os.remove(entrada.path)
+                removidos += 1
+    return removidos
+
+
+# ============================================================
+# 3. Pool de processos e fila
+# ============================================================
+
+def obter_pool() -> ProcessPoolExecutor:
+    """Retorna o pool de processos, criando-o no primeiro uso."""
+    global _pool
+    if _pool is None:
+        with _trava_pool:
+            if _pool is None:
+                os.makedirs(RELATORIOS_DIR, exist_ok=True)
+                remover_expirados()
+                # "spawn" evita herdar threads e conexões do processo do servidor
+                _pool = ProcessPoolExecutor(
+                    max_workers=RELATORIOS_WORKERS, mp_context=multiprocessing.get_context("spawn")
+                )
+    return _pool
+
+
+def encerrar_pool():
+    """Encerra os processos do pool, cancelando os relatórios ainda na fila."""
+    global _pool
+    with _trava_pool:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def _concluir(relatorio_id: str, formato: str, futuro):
+    """Callback do futuro: registra o resultado da geração."""
+    if futuro.cancelled():
+        situacao = _situacao(relatorio_id, formato, "erro", erro="Geração cancelada.")
+    elif futuro.exception() is not None:
+        situacao = _situacao(relatorio_id, formato, "erro", erro=str(futuro.exception()))
+    else:
+        situacao = _situacao(relatorio_id, formato, "concluido", futuro.result())
+    with _trava_trabalhos:
+        trabalhos[relatorio_id] = situacao
+
+
+def solicitar(db: Session, pedido: schemas.RelatorioCreate) -> dict:
+    """
+    Enfileira a geração do relatório, a menos que ele já exista no disco
+    ou já esteja sendo gerado. Retorna a situação (schemas.SituacaoRelatorio).
+    """
+    parametros = {**pedido.dict(), "formato": pedido.formato.value}
+    hoje = date.today()
+    relatorio_id = calcular_id(db, parametros, hoje)
+    with _trava_trabalhos:
+        atual = trabalhos.get(relatorio_id)
+        if atual and atual["situacao"] == "em_andamento":
+            return atual
+        pronto = _no_disco(relatorio_id)
+        if pronto:
+            trabalhos[relatorio_id] = pronto
+            return pronto
+        trabalhos[relatorio_id] = situacao = _situacao(relatorio_id, parametros["formato"], "em_andamento")
+    try:
+        futuro = obter_pool().submit(gerar, parametros, hoje, caminho_relatorio(relatorio_id, parametros["formato"]))
+    except Exception as erro:
+        with _trava_trabalhos:
+            trabalhos[relatorio_id] = _situacao(relatorio_id, parametros["formato"], "erro", erro=str(erro))
+        raise
+    futuro.add_done_callback(functools.partial(_concluir, relatorio_id, parametros["formato"]))
+    return situacao
+
+
+def consultar(relatorio_id: str) -> Optional[dict]:
+    """Situação do relatório (None se desconhecido ou já removido do disco)."""
+    if not re.fullmatch(r"[0-9a-f]{32}", relatorio_id):
+        return None
+    with _trava_trabalhos:
+        atual = trabalhos.get(relatorio_id)
+        if atual and atual["situacao"] != "concluido":
+            return atual
+        pronto = _no_disco(relatorio_id)
+        if pronto is None:
+            trabalhos.pop(relatorio_id, None)
+        return pronto
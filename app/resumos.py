@@ -0,0 +1,145 @@
+# Módulo: resumos.py
+"""
+Módulo: resumos.py
+Manutenção da tabela resumo_custos (totais por veículo, mês e tipo).
+
+As funções de escrita de manutenções chamam aplicar_ajustes dentro da
+própria transação, de modo que o resumo nunca diverge dos registros.
+As consultas de custos leem apenas o resumo: o custo é proporcional ao
+número de grupos, não ao número de manutenções. Manutenções movidas para
+o banco de arquivo (arquivamento.py) continuam contadas.
+
+Reconstrução completa (após importações diretas no banco, por exemplo):
+    python -m app.resumos
+"""
+
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from sqlalchemy import String, cast, delete, func, insert, select, union, update
+from sqlalchemy.orm import Session
+
+from app import arquivamento, models
+from app.database import executar_comandos
+
+Resumo = models.ResumoCusto
+
+
+def chave_resumo(veiculo_id: int, data, tipo_manutencao: Optional[str]) -> tuple:
+    """Chave do grupo no resumo para uma manutenção."""
+    mes = data.isoformat()[:7] if data else ""
+    return veiculo_id, mes, tipo_manutencao or ""
+
+
+def agrupar(manutencoes: Iterable, sinal: int = 1) -> dict:
+    """
+    Soma os valores de várias manutenções por grupo.
+    Aceita objetos ORM ou dicionários com veiculo_id, data,
+    tipo_manutencao e custo. sinal=-1 para exclusões.
+    """
+    ajustes = defaultdict(lambda: [0.0, 0])
+    for m in manutencoes:
+        if isinstance(m, dict):
+            veiculo_id, data, tipo, custo = m["veiculo_id"], m.get("data"), m.get("tipo_manutencao"), m.get("custo")
+        else:
+            veiculo_id, data, tipo, custo = m.veiculo_id, m.data, m.tipo_manutencao, m.custo
+        ajuste = ajustes[chave_resumo(veiculo_id, data, tipo)]
+        ajuste[0] += sinal * (custo or 0)
+        ajuste[1] += sinal
+    return ajustes
+
+
+def comandos_ajuste(chave: tuple, total: float, quantidade: int):
+    """
+    Comandos para aplicar um ajuste a um grupo: UPDATE incremental,
+    INSERT caso o grupo ainda não exista e DELETE do grupo zerado.
+    """
+    veiculo_id, mes, tipo = chave
+    filtro = (Resumo.veiculo_id == veiculo_id, Resumo.mes == mes, Resumo.tipo_manutencao == tipo)
+    atualizar = (
+        update(Resumo)
+        .where(*filtro)
+        .values(total=Resumo.total + total, quantidade=Resumo.quantidade + quantidade)
+    )
+    inserir = insert(Resumo).values(
+        veiculo_id=veiculo_id, mes=mes, tipo_manutencao=tipo, total=total, quantidade=quantidade
+    )
+    remover_vazio = delete(Resumo).where(*filtro, Resumo.quantidade <= 0)
+    return atualizar, inserir, remover_vazio
+
+
+def comandos_ajustes(ajustes: dict):
+    """Gerador dos comandos de aplicar_ajustes (ver database.executar_comandos)."""
+    for chave, (total, quantidade) in ajustes.items():
+        atualizar, inserir, remover_vazio = comandos_ajuste(chave, total, quantidade)
+        if (yield atualizar, None).rowcount == 0:
+            if quantidade > 0:
+                yield inserir, None
+        elif quantidade < 0:
+            yield remover_vazio, None
+
+
+def aplicar_ajustes(db: Session, ajustes: dict):
+    """Aplica os ajustes no resumo, na transação corrente (sem commit)."""
+    executar_comandos(db, comandos_ajustes(ajustes))
+
+
+def _fonte_manutencoes(veiculo_ids=None):
+    """
+    Manutenções que entram no resumo: as do banco principal e, com o
+    arquivo ativo, também as arquivadas (UNION descarta uma eventual
+    cópia duplicada por um arquivamento interrompido).
+    """
+    tabelas = [models.Manutencao.__table__]
+    if arquivamento.ativo():
+        tabelas.append(arquivamento.ManutencaoArquivada)
+    consultas = []
+    for tabela in tabelas:
+        consulta = select(tabela.c.id, tabela.c.veiculo_id, tabela.c.data, tabela.c.tipo_manutencao, tabela.c.custo)
+        if veiculo_ids is not None:
+            consulta = consulta.where(tabela.c.veiculo_id.in_(veiculo_ids))
+        consultas.append(consulta)
+    return (union(*consultas) if len(consultas) > 1 else consultas[0]).subquery()
+
+
+def _inserir_agregado(veiculo_ids=None):
+    """INSERT ... SELECT com os totais das manutenções (dos veículos informados) por grupo."""
+    M = _fonte_manutencoes(veiculo_ids).c
+    mes = func.coalesce(func.substr(cast(M.data, String), 1, 7), "")
+    tipo = func.coalesce(M.tipo_manutencao, "")
+    agregado = (
+        select(M.veiculo_id, mes, tipo, func.sum(func.coalesce(M.custo, 0)), func.count())
+        .group_by(M.veiculo_id, mes, tipo)
+    )
+    return insert(Resumo).from_select(
+        ["veiculo_id", "mes", "tipo_manutencao", "total", "quantidade"], agregado
+    )
+
+
+def recalcular_veiculos(db: Session, veiculo_ids):
+    """
+    Recalcula o resumo dos veículos informados, na transação corrente
+    (sem commit). Mais barato que aplicar_ajustes quando a alteração
+    atinge muitos grupos (ex.: exclusão de centenas de manutenções).
+    """
+    veiculo_ids = list(veiculo_ids)
+    db.execute(delete(Resumo).where(Resumo.veiculo_id.in_(veiculo_ids)))
+    db.execute(_inserir_agregado(veiculo_ids))
+
+
+def reconstruir(db: Session):
+    """Recalcula todo o resumo a partir da tabela de manutenções."""
+    db.execute(delete(Resumo))
+    db.execute(_inserir_agregado())
+    db.commit()
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    sessao = SessionLocal()
+    try:
+        reconstruir(sessao)
+        print("Resumo de custos reconstruído.")
+    finally:
+        sessao.close()
@@ -0,0 +1,151 @@
+#Módulo: routes/assincronas.py
+#Versões assíncronas das principais rotas, sob o prefixo /async.
+#Usam AsyncSession (aiosqlite) e rodam direto no event loop, sem
+#ocupar o threadpool do FastAPI. Só são registradas em main.py
+#quando o driver assíncrono está disponível.
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app import crud_async, schemas, seguranca
+from app.database import get_async_db
+from app.escrita import erros_de_integridade
+from app.paginacao import montar_pagina, parametros_paginacao
+
+# ============================================================
+# 1. Inicialização do roteador
+# ============================================================
+
+router = APIRouter(
+    prefix="/async",
+    tags=["Assíncrono"]
+)
+
+# ============================================================
+# 2. Usuários
+# ============================================================
+
+@router.post("/usuarios/", response_model=schemas.UsuarioResponse, status_code=status.HTTP_201_CREATED)
+async def criar_usuario(usuario: schemas.UsuarioCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Cadastra um novo usuário (versão assíncrona de POST /usuarios/).
+    """
+    if await crud_async.buscar_usuario_por_email(db, usuario.email):
+        raise HTTPException(status_code=400, detail="E-mail já cadastrado.")
+    senha_hash = await seguranca.gerar_hash_senha(usuario.senha)
+    with erros_de_integridade(duplicado="E-mail já cadastrado."):
+        return await crud_async.criar_usuario(db, usuario, senha_hash)
+
+
+@router.get("/usuarios/", response_model=schemas.PaginaUsuarios)
+async def listar_usuarios(paginacao=Depends(parametros_paginacao), db: AsyncSession = Depends(get_async_db)):
+    """
+    Retorna os usuários cadastrados, paginados por cursor.
+    """
+    apos_id, limite = paginacao
+    return montar_pagina(await crud_async.listar_usuarios(db, apos_id, limite + 1), limite)
+
+
+# ============================================================
+# 3. Veículos
+# ============================================================
+
+@router.post("/veiculos/", response_model=schemas.VeiculoResponse, status_code=status.HTTP_201_CREATED)
+async def criar_veiculo(veiculo: schemas.VeiculoCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Cadastra um novo veículo (versão assíncrona de POST /veiculos/).
+    """
+    if not await crud_async.buscar_usuario_por_id(db, veiculo.usuario_id):
+        raise HTTPException(status_code=404, detail="Usuário não encontrado.")
+    with erros_de_integridade(duplicado="Placa já cadastrada.", ausente="Usuário não encontrado."):
+        return await crud_async.criar_veiculo(db, veiculo)
+
+
+@router.get("/veiculos/", response_model=schemas.PaginaVeiculos)
+async def listar_veiculos(paginacao=Depends(parametros_paginacao), db: AsyncSession = Depends(get_async_db)):
+    """
+    Retorna os veículos cadastrados, paginados por cursor.
+    """
+    apos_id, limite = paginacao
+    return montar_pagina(await crud_async.listar_veiculos(db, apos_id, limite + 1), limite)
+
+
+@router.get("/veiculos/{veiculo_id}", response_model=schemas.VeiculoResponse)
+async def buscar_veiculo(veiculo_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Busca um veículo específico pelo ID.
+    """
+    veiculo = await crud_async.buscar_veiculo_por_id(db, veiculo_id)
+    if not veiculo:
+        raise HTTPException(status_code=404, detail="Veículo não encontrado.")
+    return veiculo
+
+
+# ============================================================
+# 4. Manutenções
+# ============================================================
+
+@router.post("/manutencoes/", response_model=schemas.ManutencaoResponse, status_code=status.HTTP_201_CREATED)
+async def criar_manutencao(manutencao: schemas.ManutencaoCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Cadastra uma nova manutenção (versão assíncrona de POST /manutencoes/).
+    """
+    if not await crud_async.buscar_veiculo_por_id(db, manutencao.veiculo_id):
+        raise HTTPException(status_code=404, detail="Veículo não encontrado.")
+    with erros_de_integridade(ausente="Veículo não encontrado."):
+        return await crud_async.criar_manutencao(db, manutencao)
+
+
+@router.get("/manutencoes/", response_model=schemas.PaginaManutencoes)
+async def listar_manutencoes(paginacao=Depends(parametros_paginacao), db: AsyncSession = Depends(get_async_db)):
+    """
+    Retorna as manutenções cadastradas, paginadas por cursor.
+    """
+    apos_id, limite = paginacao
+    return montar_pagina(await crud_async.listar_manutencoes(db, apos_id, limite + 1), limite)
+
+
+@router.get("/manutencoes/{manutencao_id}", response_model=schemas.ManutencaoResponse)
+async def buscar_manutencao(manutencao_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Busca uma manutenção específica pelo ID.
+    """
+    manutencao = await crud_async.buscar_manutencao_por_id(db, manutencao_id)
+    if not manutencao:
+        raise HTTPException(status_code=404, detail="Manutenção não encontrada.")
+    return manutencao
+
+
+# ============================================================
+# 5. Planos de manutenção
+# ============================================================
+
+@router.post("/planos/", response_model=schemas.PlanoManutencaoResponse, status_code=status.HTTP_201_CREATED)
+async def criar_plano(plano: schemas.PlanoManutencaoCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Cadastra um novo plano de manutenção (versão assíncrona de POST /planos/).
+    """
+    if not await crud_async.buscar_veiculo_por_id(db, plano.veiculo_id):
+        raise HTTPException(status_code=404, detail="Veículo não encontrado.")
+    with erros_de_integridade(ausente="Veículo não encontrado."):
+        return await crud_async.criar_plano(db, plano)
+
+
+@router.get("/planos/", response_model=schemas.PaginaPlanos)
+async def listar_planos(paginacao=Depends(parametros_paginacao), db: AsyncSession = Depends(get_async_db)):
+    """
+    Retorna os planos de manutenção cadastrados, paginados por cursor.
+    """
+    apos_id, limite = paginacao
+    return montar_pagina(await crud_async.listar_planos(db, apos_id, limite + 1), limite)
+
+
+@router.get("/planos/veiculo/{veiculo_id}", response_model=List[schemas.PlanoManutencaoResponse])
+async def listar_planos_por_veiculo(veiculo_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Lista todos os planos de manutenção vinculados a um veículo.
+    """
+    if not await crud_async.buscar_veiculo_por_id(db, veiculo_id):
+        raise HTTPException(status_code=404, detail="Veículo não encontrado.")
+    return await crud_async.listar_planos_por_veiculo(db, veiculo_id)
@@ -0,0 +1,87 @@
+#Módulo: routes/custos.py
+#Consultas de custos de manutenção por veículo, usuário, mês e tipo.
+#Todas leem a tabela resumo_custos, mantida incrementalmente por crud.py.
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app import crud, schemas
+from app.database import get_read_db
+
+# ============================================================
+# 1. Inicialização do roteador
+# ============================================================
+
+router = APIRouter(
+    prefix="/custos",
+    tags=["Custos"]
+)
+
+
+def _total(linha) -> dict:
+    return {"total": round(linha.total, 2), "quantidade": linha.quantidade}
+
+
+# ============================================================
+# 2. Custo total de um veículo
+# ============================================================
+
+@router.get("/veiculos/{veiculo_id}", response_model=schemas.CustoTotal)
+def custo_do_veiculo(veiculo_id: int, db: Session = Depends(get_read_db)):
+    """
+    Retorna o custo total e a quantidade de manutenções de um veículo.
+    """
+    if not crud.obter_veiculo(db, veiculo_id):
+        raise HTTPException(status_code=404, detail="Veículo não encontrado.")
+    return _total(crud.total_custos(db, veiculo_id=veiculo_id))
+
+
+# ============================================================
+# 3. Custo total da frota de um usuário
+# ============================================================
+
+@router.get("/usuarios/{usuario_id}", response_model=schemas.CustoTotal)
+def custo_do_usuario(usuario_id: int, db: Session = Depends(get_read_db)):
+    """
+    Retorna o custo total e a quantidade de manutenções dos veículos de um usuário.
+    """
+    return _total(crud.total_custos(db, usuario_id=usuario_id))
+
+
+# ============================================================
+# 4. Custos por mês
+# ============================================================
+
+@router.get("/mensal", response_model=List[schemas.CustoMensal])
+def custos_por_mes(
+    veiculo_id: Optional[int] = Query(None, description="Filtra por veículo."),
+    usuario_id: Optional[int] = Query(None, description="Filtra pela frota de um usuário."),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Retorna o custo das manutenções agrupado por mês (AAAA-MM).
+    """
+    return [
+        {"mes": linha.mes or None, **_total(linha)}
+        for linha in crud.custos_por_mes(db, veiculo_id, usuario_id)
+    ]
+
+
+# ============================================================
+# 5. Custos por tipo de manutenção
+# ============================================================
+
+@router.get("/tipos", response_model=List[schemas.CustoPorTipo])
+def custos_por_tipo(
+    veiculo_id: Optional[int] = Query(None, description="Filtra por veículo."),
+    usuario_id: Optional[int] = Query(None, description="Filtra pela frota de um usuário."),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Retorna o custo das manutenções agrupado por tipo de manutenção.
+    """
+    return [
+        {"tipo_manutencao": linha.tipo_manutencao or None, **_total(linha)}
+        for linha in crud.custos_por_tipo(db, veiculo_id, usuario_id)
+    ]
@@ -0,0 +1,145 @@
+#Módulo: routes/documentos.py
+#Upload e download dos arquivos de documentos (notas fiscais, fotos...).
+#Os arquivos são gravados em disco por app/armazenamento.py, endereçados
+#pelo SHA-256 do conteúdo, e vinculados a registros Documento.
+#Os downloads só são de cópia zero (sendfile) atrás do nginx, com
+#DOCUMENTOS_X_ACCEL_PREFIXO definido; sem ele, o arquivo passa pelo Python.
+
+import os
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import armazenamento, crud, escrita, exclusao, schemas
+from app.database import get_db, get_read_db
+
+# ============================================================
+# 1. Inicialização do roteador
+# ============================================================
+
+router = APIRouter(
+    prefix="/documentos",
+    tags=["Documentos"]
+)
+
+# ============================================================
+# 2. Enviar arquivo de documento
+# ============================================================
+
+@router.post("/", response_model=schemas.DocumentoResponse, status_code=status.HTTP_201_CREATED)
+async def enviar_documento(
+    request: Request,
+    manutencao_id: int = Query(..., description="Manutenção à qual o documento pertence."),
+    nome_arquivo: str = Query(..., max_length=200),
+    db: Session = Depends(get_db),
+):
+    """
+    Recebe o conteúdo do arquivo no corpo da requisição (binário, sem
+    multipart) e o grava em disco em blocos.
+    - O Content-Type enviado é salvo como tipo do documento.
+    - Arquivos idênticos são armazenados uma única vez.
+    - Se o documento não puder ser criado, o arquivo recém-gravado é apagado.
+    """
+    manutencao = await run_in_threadpool(crud.buscar_manutencao_por_id, db, manutencao_id)
+    if not manutencao:
+        raise HTTPException(status_code=404, detail="Manutenção não encontrada.")
+    if crud.esta_arquivada(manutencao):
+        raise HTTPException(status_code=409, detail="Manutenção arquivada: não aceita novos documentos.")
+
+    try:
+        caminho, _, novo = await armazenamento.salvar_fluxo(request.stream())
+    except armazenamento.ArquivoMuitoGrande:
+        raise HTTPException(status_code=413, detail="Arquivo excede o tamanho máximo permitido.")
+    except armazenamento.ArquivoVazio:
+        raise HTTPException(status_code=400, detail="Arquivo vazio.")
+    salvo_em = time.time()
+
+    documento = schemas.DocumentoCreate(
+        manutencao_id=manutencao_id,
+        nome_arquivo=nome_arquivo,
+        tipo=request.headers.get("content-type"),
+        caminho_arquivo=caminho,
+    )
+    try:
+        # A manutenção pode ter sido excluída depois da verificação acima
+        with escrita.erros_de_integridade(ausente="Manutenção não encontrada."):
+            return await run_in_threadpool(crud.criar_documento, db, documento)
+    except BaseException:
+        if novo:
+            await run_in_threadpool(exclusao.descartar_arquivo, db, caminho, salvo_em)
+        raise
+
+
+# ============================================================
+# 3. Dados de um documento
+# ============================================================
+
+@router.get("/{documento_id}", response_model=schemas.DocumentoResponse)
+def buscar_documento(documento_id: int, db: Session = Depends(get_read_db)):
+    """
+    Retorna os dados cadastrais de um documento.
+    """
+    documento = crud.buscar_documento_por_id(db, documento_id)
+    if not documento:
+        raise HTTPException(status_code=404, detail="Documento não encontrado.")
+    return documento
+
+
+# ============================================================
+# 4. Baixar arquivo de documento
+# ============================================================
+
+@router.get("/{documento_id}/arquivo")
+def baixar_documento(documento_id: int, request: Request, db: Session = Depends(get_read_db)):
+    """
+    Envia o arquivo do documento.
+    - Suporta o cabeçalho Range (um intervalo), respondendo 206.
+    - Com DOCUMENTOS_X_ACCEL_PREFIXO (recomendado em produção), o nginx
+      envia o arquivo com sendfile; sem ele, o arquivo é lido e enviado
+      em blocos pelo processo da aplicação.
+    """
+    documento = crud.buscar_documento_por_id(db, documento_id)
+    if not documento or not documento.caminho_arquivo:
+        raise HTTPException(status_code=404, detail="Documento não encontrado.")
+    caminho = armazenamento.caminho_absoluto(documento.caminho_arquivo)
+    if not os.path.isfile(caminho):
+        raise HTTPException(status_code=404, detail="Arquivo do documento não encontrado.")
+
+    tipo = documento.tipo or "application/octet-stream"
+    etag = '"' + os.path.basename(caminho) + '"'  # o nome do arquivo é o próprio hash
+
+    # Atrás do nginx: ele envia o arquivo (sendfile) e trata os intervalos
+    if armazenamento.DOCUMENTOS_X_ACCEL_PREFIXO:
+        return Response(headers={
+            "X-Accel-Redirect": armazenamento.DOCUMENTOS_X_ACCEL_PREFIXO.rstrip("/") + "/" + documento.caminho_arquivo,
+            "Content-Type": tipo,
+            "ETag": etag,
+        })
+
+    tamanho = os.path.getsize(caminho)
+    try:
+        intervalo = armazenamento.interpretar_range(request.headers.get("range"), tamanho)
+    except armazenamento.IntervaloInvalido:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{tamanho}"})
+
+    if intervalo is None:
+        return FileResponse(
+            caminho, media_type=tipo, filename=documento.nome_arquivo,
+            headers={"Accept-Ranges": "bytes", "ETag": etag},
+        )
+
+    inicio, fim = intervalo
+    return StreamingResponse(
+        armazenamento.ler_intervalo(caminho, inicio, fim),
+        status_code=206,
+        media_type=tipo,
+        headers={
+            "Accept-Ranges": "bytes",
+            "Content-Range": f"bytes {inicio}-{fim}/{tamanho}",
+            "Content-Length": str(fim - inicio + 1),
+            "ETag": etag,
+        },
+    )
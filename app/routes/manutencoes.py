@@ -1,12 +1,18 @@
 #Módulo: routes/manutencoes.py
 #Define as rotas para cadastro, listagem e gerenciamento de manutenções.
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 
-from app import crud, schemas
-from app.database import get_db
+from app import busca, crud, escrita, schemas, models, versoes
+from app.database import ReadSessionLocal, get_db, get_read_db
+from app.exportacao import gerar_exportacao
+from app.lotes import montar_exclusao, montar_lote, parametros_ids
+from app.paginacao import montar_pagina, parametros_paginacao
+from app.serializacao import pagina_rapida
 
 # ============================================================
 # 1. Inicialização do roteador
@@ -22,30 +28,166 @@ router = APIRouter(
 # ============================================================
 
 @router.post("/", response_model=schemas.ManutencaoResponse, status_code=status.HTTP_201_CREATED)
-def criar_manutencao(manutencao: schemas.ManutencaoCreate, db: Session = Depends(get_db)):
+async def criar_manutencao(manutencao: schemas.ManutencaoCreate, db: Session = Depends(get_db)):
     """
     Cadastra uma nova manutenção.
     - Requer: veiculo_id, data, km, tipo_manutencao, descricao, custo, prestador_servico.
+    - Com ESCRITA_AGRUPADA=1, o commit é feito em lote com outros cadastros (ver escrita.py).
     """
     # Verifica se o veículo existe
-    veiculo = crud.buscar_veiculo_por_id(db, manutencao.veiculo_id)
+    # Sem cache: o veículo pode ter sido excluído por outro worker
+    veiculo = await run_in_threadpool(crud.buscar_veiculo_por_id, db, manutencao.veiculo_id)
     if not veiculo:
         raise HTTPException(status_code=404, detail="Veículo não encontrado.")
 
-    nova_manutencao = crud.criar_manutencao(db, manutencao)
+    # O veículo ainda pode ser excluído antes do commit: a chave estrangeira vira 404
+    with escrita.erros_de_integridade(ausente="Veículo não encontrado."):
+        if escrita.escritor:
+            return await escrita.escritor.inserir(models.Manutencao, manutencao.dict())
+        nova_manutencao = await run_in_threadpool(crud.criar_manutencao, db, manutencao)
     return nova_manutencao
 
 
+# ============================================================
+# 2.1 Criar manutenções em lote
+# ============================================================
+
+LOTE_MAXIMO = 5000
+
+
+@router.post("/bulk", response_model=List[schemas.ManutencaoLoteResultado], status_code=status.HTTP_201_CREATED)
+def criar_manutencoes_em_lote(manutencoes: List[schemas.ManutencaoCreate], db: Session = Depends(get_db)):
+    """
+    Cadastra várias manutenções em uma única transação.
+    - Recebe uma lista de manutenções (até 5000 por requisição).
+    - Retorna o resultado de cada item na mesma ordem do envio;
+      itens com veículo inexistente são rejeitados sem afetar os demais.
+    """
+    if len(manutencoes) > LOTE_MAXIMO:
+        raise HTTPException(status_code=413, detail=f"O lote aceita no máximo {LOTE_MAXIMO} manutenções.")
+
+    novos_ids = crud.criar_manutencoes_em_lote(db, manutencoes)
+    return [
+        schemas.ManutencaoLoteResultado(indice=indice, sucesso=True, id=novo_id)
+        if novo_id is not None else
+        schemas.ManutencaoLoteResultado(indice=indice, sucesso=False, erro="Veículo não encontrado.")
+        for indice, novo_id in enumerate(novos_ids)
+    ]
+
+
 # ============================================================
 # 3. Listar todas as manutenções
 # ============================================================
 
-@router.get("/", response_model=List[schemas.ManutencaoResponse])
-def listar_manutencoes(db: Session = Depends(get_db)):
+@router.get("/", response_model=schemas.PaginaManutencoes)
+def listar_manutencoes(
+    paginacao=Depends(parametros_paginacao),
+    rapido: bool = Query(False, description="Serialização rápida (mesmo JSON, sem validação por item)."),
+    cabecalhos=Depends(versoes.condicional("manutencoes")),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Retorna as manutenções cadastradas, paginadas por cursor.
+    - Use o next_cursor da resposta no parâmetro cursor para obter a próxima página.
+    - Com rapido=true, as colunas são lidas sem objetos ORM e serializadas direto.
+    - Responde 304 se If-None-Match trouxer o ETag atual (nada mudou).
+    """
+    apos_id, limite = paginacao
+    if rapido:
+        linhas = crud.listar_linhas(db, models.Manutencao, schemas.ManutencaoResponse, apos_id, limite + 1)
+        return pagina_rapida(montar_pagina(linhas, limite), schemas.ManutencaoResponse, cabecalhos)
+    return montar_pagina(crud.listar_manutencoes(db, apos_id, limite + 1), limite)
+
+
+# ============================================================
+# 3.1 Exportar histórico completo (streaming)
+# ============================================================
+# Declarada antes de /{manutencao_id} para não ser capturada por ela.
+
+TIPOS_CONTEUDO = {
+    schemas.FormatoExportacao.ndjson: "application/x-ndjson",
+    schemas.FormatoExportacao.csv: "text/csv",
+}
+
+
+@router.get("/export")
+def exportar_manutencoes(
+    formato: schemas.FormatoExportacao = schemas.FormatoExportacao.ndjson,
+    documentos: bool = Query(False, description="Inclui os documentos de cada manutenção."),
+    gzip: bool = Query(False, description="Compacta a resposta com gzip."),
+):
+    """
+    Exporta todas as manutenções em NDJSON ou CSV, enviadas em blocos.
+    - O uso de memória é constante, independente do número de registros.
+    """
+    def conteudo():
+        # A sessão é aberta aqui (e não via Depends) porque precisa
+        # continuar viva enquanto a resposta é transmitida.
+        db = ReadSessionLocal()
+        try:
+            linhas = crud.iterar_manutencoes_exportacao(db, incluir_documentos=documentos)
+            yield from gerar_exportacao(linhas, formato.value, documentos, compactar=gzip)
+        finally:
+            db.close()
+
+    cabecalhos = {"Content-Disposition": f'attachment; filename="manutencoes.{formato.value}"'}
+    if gzip:
+        cabecalhos["Content-Encoding"] = "gzip"
+    return StreamingResponse(conteudo(), media_type=TIPOS_CONTEUDO[formato], headers=cabecalhos)
+
+
+# ============================================================
+# 3.2 Busca textual no histórico
+# ============================================================
+# Também declarada antes de /{manutencao_id}.
+
+@router.get("/busca", response_model=List[schemas.ManutencaoBusca])
+def buscar_manutencoes_por_texto(
+    q: str = Query(..., min_length=1, max_length=200, description="Palavras a procurar."),
+    veiculo_id: Optional[int] = Query(None, description="Restringe a um veículo."),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Procura manutenções pelo tipo, descrição ou prestador do serviço.
+    - Todas as palavras precisam aparecer; acentos e maiúsculas são ignorados.
+    - Resultados do mais relevante para o menos relevante.
+    Exemplo: /manutencoes/busca?q=pastilha de freio&veiculo_id=1
+    """
+    if not busca.disponivel(db.get_bind()):
+        raise HTTPException(status_code=501, detail="Busca textual disponível apenas com SQLite.")
+    return crud.buscar_manutencoes_por_texto(db, q, veiculo_id, limit, offset)
+
+
+# ============================================================
+# 3.3 Buscar várias manutenções por ID (lote)
+# ============================================================
+# Também declarada antes de /{manutencao_id}.
+
+@router.get("/lote", response_model=schemas.LoteManutencoes)
+def buscar_manutencoes_em_lote(ids=Depends(parametros_ids), db: Session = Depends(get_read_db)):
+    """
+    Busca várias manutenções em uma chamada: /manutencoes/lote?ids=3,1,2
+    - As manutenções vêm na ordem pedida; ids inexistentes em nao_encontrados.
+    """
+    return montar_lote(ids, crud.buscar_manutencoes_por_ids(db, ids))
+
+
+# ============================================================
+# 3.4 Excluir várias manutenções por ID (lote)
+# ============================================================
+# Também declarada antes de /{manutencao_id}.
+
+@router.delete("/lote", response_model=schemas.ResultadoExclusao)
+def excluir_manutencoes_em_lote(ids=Depends(parametros_ids), db: Session = Depends(get_db)):
     """
-    Retorna a lista de todas as manutenções cadastradas.
+    Exclui várias manutenções (e os seus documentos) em uma transação:
+    /manutencoes/lote?ids=3,1,2
+    - Ids inexistentes são ignorados e listados em nao_encontrados.
     """
-    return crud.listar_manutencoes(db)
+    excluidos, contagem = crud.excluir_manutencoes(db, ids)
+    return montar_exclusao(ids, excluidos, contagem)
 
 
 # ============================================================
@@ -53,7 +195,7 @@ def listar_manutencoes(db: Session = Depends(get_db)):
 # ============================================================
 
 @router.get("/{manutencao_id}", response_model=schemas.ManutencaoResponse)
-def buscar_manutencao(manutencao_id: int, db: Session = Depends(get_db)):
+def buscar_manutencao(manutencao_id: int, db: Session = Depends(get_read_db)):
     """
     Busca uma manutenção específica pelo ID.
     """
@@ -70,7 +212,7 @@ def buscar_manutencao(manutencao_id: int, db: Session = Depends(get_db)):
 @router.delete("/{manutencao_id}", response_model=schemas.ManutencaoResponse)
 def excluir_manutencao(manutencao_id: int, db: Session = Depends(get_db)):
     """
-    Remove uma manutenção do banco de dados.
+    Remove uma manutenção do banco de dados, com os seus documentos.
     """
     manutencao = crud.excluir_manutencao(db, manutencao_id)
     if not manutencao:
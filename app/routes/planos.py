@@ -2,12 +2,16 @@
 #Define as rotas de gerenciamento dos planos de manutenção preventiva.
 
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 
-from app import crud, schemas
-from app.database import get_db
+from app import crud, escrita, odometro, schemas, models, versoes
+from app.database import get_db, get_read_db
+from app.lotes import montar_lote, parametros_ids
+from app.paginacao import montar_pagina, parametros_paginacao
+from app.serializacao import pagina_rapida
 
 # ============================================================
 # 1. Inicialização do roteador
@@ -23,16 +27,22 @@ router = APIRouter(
 # ============================================================
 
 @router.post("/", response_model=schemas.PlanoManutencaoResponse, status_code=status.HTTP_201_CREATED)
-def criar_plano(plano: schemas.PlanoManutencaoCreate, db: Session = Depends(get_db)):
+async def criar_plano(plano: schemas.PlanoManutencaoCreate, db: Session = Depends(get_db)):
     """
     Cadastra um novo plano de manutenção preventiva.
     - Requer: veiculo_id, nome_plano, km_referencia, servicos.
+    - Com ESCRITA_AGRUPADA=1, o commit é feito em lote com outros cadastros (ver escrita.py).
     """
-    veiculo = crud.buscar_veiculo_por_id(db, plano.veiculo_id)
+    # Sem cache: o veículo pode ter sido excluído por outro worker
+    veiculo = await run_in_threadpool(crud.buscar_veiculo_por_id, db, plano.veiculo_id)
     if not veiculo:
         raise HTTPException(status_code=404, detail="Veículo não encontrado.")
 
-    novo_plano = crud.criar_plano(db, plano)
+    # O veículo ainda pode ser excluído antes do commit: a chave estrangeira vira 404
+    with escrita.erros_de_integridade(ausente="Veículo não encontrado."):
+        if escrita.escritor:
+            return await escrita.escritor.inserir(models.PlanoManutencao, plano.dict())
+        novo_plano = await run_in_threadpool(crud.criar_plano, db, plano)
     return novo_plano
 
 
@@ -40,24 +50,41 @@ def criar_plano(plano: schemas.PlanoManutencaoCreate, db: Session = Depends(get_
 # 3. Listar todos os planos
 # ============================================================
 
-@router.get("/", response_model=List[schemas.PlanoManutencaoResponse])
-def listar_planos(db: Session = Depends(get_db)):
+@router.get("/", response_model=schemas.PaginaPlanos)
+def listar_planos(
+    paginacao=Depends(parametros_paginacao),
+    rapido: bool = Query(False, description="Serialização rápida (mesmo JSON, sem validação por item)."),
+    cabecalhos=Depends(versoes.condicional("planos")),
+    db: Session = Depends(get_read_db),
+):
     """
-    Retorna todos os planos de manutenção cadastrados.
+    Retorna os planos de manutenção cadastrados, paginados por cursor.
+    - Use o next_cursor da resposta no parâmetro cursor para obter a próxima página.
+    - Com rapido=true, as colunas são lidas sem objetos ORM e serializadas direto.
+    - Responde 304 se If-None-Match trouxer o ETag atual (nada mudou).
     """
-    return crud.listar_planos(db)
+    apos_id, limite = paginacao
+    if rapido:
+        linhas = crud.listar_linhas(db, models.PlanoManutencao, schemas.PlanoManutencaoResponse, apos_id, limite + 1)
+        return pagina_rapida(montar_pagina(linhas, limite), schemas.PlanoManutencaoResponse, cabecalhos)
+    return montar_pagina(crud.listar_planos(db, apos_id, limite + 1), limite)
 
 
 # ============================================================
 # 4. Buscar planos de um veículo específico
 # ============================================================
 
-@router.get("/veiculo/{veiculo_id}", response_model=List[schemas.PlanoManutencaoResponse])
-def listar_planos_por_veiculo(veiculo_id: int, db: Session = Depends(get_db)):
+@router.get(
+    "/veiculo/{veiculo_id}",
+    response_model=List[schemas.PlanoManutencaoResponse],
+    dependencies=[Depends(versoes.condicional("veiculo:{veiculo_id}"))],
+)
+def listar_planos_por_veiculo(veiculo_id: int, db: Session = Depends(get_read_db)):
     """
     Lista todos os planos de manutenção vinculados a um veículo.
+    - Responde 304 se If-None-Match trouxer o ETag atual (nada mudou).
     """
-    veiculo = crud.buscar_veiculo_por_id(db, veiculo_id)
+    veiculo = crud.obter_veiculo(db, veiculo_id)
     if not veiculo:
         raise HTTPException(status_code=404, detail="Veículo não encontrado.")
 
@@ -65,6 +92,71 @@ def listar_planos_por_veiculo(veiculo_id: int, db: Session = Depends(get_db)):
     return planos
 
 
+# ============================================================
+# 4.1 Planos vencidos ou próximos do vencimento (frota inteira)
+# ============================================================
+
+@router.get("/vencidos", response_model=List[schemas.PlanoVencido])
+def listar_planos_vencidos(
+    margem_km: int = Query(0, ge=0, description="Inclui planos que vencem em até N km."),
+    usuario_id: Optional[int] = Query(None, description="Restringe à frota de um usuário."),
+    limit: int = Query(1000, ge=1, le=10000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Lista os planos vencidos (e, com margem_km, os próximos de vencer)
+    de todos os veículos, do mais atrasado para o menos urgente.
+    - O cálculo usa a última manutenção do mesmo tipo do plano.
+    """
+    linhas = crud.listar_planos_vencidos(db, margem_km, usuario_id, limit, offset)
+    return [
+        schemas.PlanoVencido(
+            **linha._mapping,
+            situacao="vencido" if linha.km_restante <= 0 else "proximo",
+        )
+        for linha in linhas
+    ]
+
+
+# ============================================================
+# 4.2 Previsão de vencimento por data (histórico de odômetro)
+# ============================================================
+
+@router.get("/previsoes", response_model=List[schemas.PrevisaoPlano])
+def prever_planos(
+    usuario_id: Optional[int] = Query(None, description="Restringe à frota de um usuário."),
+    veiculo_id: Optional[int] = Query(None, description="Restringe a um veículo."),
+    janela_dias: int = Query(365, ge=7, le=3650, description="Período de leituras usado no cálculo."),
+    limit: int = Query(1000, ge=1, le=10000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Estima a data em que cada plano vai vencer, pelo km por dia de cada
+    veículo (regressão sobre as leituras de odômetro do período).
+    - situacao: "vencido", "previsto" ou "sem_dados" (menos de duas leituras).
+    - Ordenado pela data prevista.
+    """
+    if not odometro.NUMPY_DISPONIVEL:
+        raise HTTPException(status_code=503, detail="Previsão indisponível: NumPy não instalado.")
+    previsoes = crud.prever_planos(db, usuario_id, veiculo_id, janela_dias)
+    return previsoes[offset:offset + limit]
+
+
+# ============================================================
+# 4.3 Buscar vários planos por ID (lote)
+# ============================================================
+
+@router.get("/lote", response_model=schemas.LotePlanos)
+def buscar_planos_em_lote(ids=Depends(parametros_ids), db: Session = Depends(get_read_db)):
+    """
+    Busca vários planos em uma chamada: /planos/lote?ids=3,1,2
+    - Os planos vêm na ordem pedida; ids inexistentes em nao_encontrados.
+    """
+    return montar_lote(ids, crud.buscar_planos_por_ids(db, ids))
+
+
 # ============================================================
 # 5. Excluir um plano de manutenção
 # ============================================================
@@ -0,0 +1,84 @@
+#Módulo: routes/relatorios.py
+#Relatórios anuais de manutenção, gerados em segundo plano (ver app/relatorios.py).
+#Permite pedir um relatório, acompanhar a geração e baixar o arquivo pronto.
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app import crud, relatorios, schemas
+from app.database import get_read_db
+
+# ============================================================
+# 1. Inicialização do roteador
+# ============================================================
+
+router = APIRouter(
+    prefix="/relatorios",
+    tags=["Relatórios"]
+)
+
+# ============================================================
+# 2. Pedir relatório
+# ============================================================
+
+@router.post("/", response_model=schemas.SituacaoRelatorio, status_code=status.HTTP_202_ACCEPTED)
+def pedir_relatorio(pedido: schemas.RelatorioCreate, response: Response, db: Session = Depends(get_read_db)):
+    """
+    Enfileira o relatório do ano para um veículo (veiculo_id) ou para
+    toda a frota do usuário.
+    - Responde 202 na hora; acompanhe em GET /relatorios/{relatorio_id}.
+    - Se um relatório com os mesmos parâmetros e os mesmos dados já foi
+      gerado, responde 200 com ele concluído.
+    """
+    if not crud.buscar_usuario_por_id(db, pedido.usuario_id):
+        raise HTTPException(status_code=404, detail="Usuário não encontrado.")
+    if pedido.veiculo_id is not None:
+        veiculo = crud.buscar_veiculo_por_id(db, pedido.veiculo_id)
+        if not veiculo or veiculo.usuario_id != pedido.usuario_id:
+            raise HTTPException(status_code=404, detail="Veículo não encontrado.")
+    situacao = relatorios.solicitar(db, pedido)
+    if situacao["situacao"] == "concluido":
+        response.status_code = status.HTTP_200_OK
+    return situacao
+
+
+# ============================================================
+# 3. Situação do relatório
+# ============================================================
+
+@router.get("/{relatorio_id}", response_model=schemas.SituacaoRelatorio)
+def consultar_relatorio(relatorio_id: str):
+    """
+    Situação da geração: "em_andamento", "concluido" (baixe em
+    GET /relatorios/{relatorio_id}/arquivo) ou "erro".
+    """
+    situacao = relatorios.consultar(relatorio_id)
+    if not situacao:
+        raise HTTPException(status_code=404, detail="Relatório não encontrado.")
+    return situacao
+
+
+# ============================================================
+# 4. Baixar relatório
+# ============================================================
+
+@router.get("/{relatorio_id}/arquivo")
+def baixar_relatorio(relatorio_id: str):
+    """
+    Envia o arquivo do relatório concluído.
+    - Responde 409 enquanto a geração não terminou (ou se falhou).
+    """
+    situacao = relatorios.consultar(relatorio_id)
+    if not situacao:
+        raise HTTPException(status_code=404, detail="Relatório não encontrado.")
+    if situacao["situacao"] != "concluido":
+        raise HTTPException(status_code=409, detail=f"Relatório não disponível: {situacao['situacao']}.")
+    formato = schemas.FormatoRelatorio(situacao["formato"])
+    return FileResponse(
+        relatorios.caminho_relatorio(relatorio_id, formato.value),
+        media_type=relatorios.TIPOS_CONTEUDO[formato],
+        filename=f"relatorio_{relatorio_id[:8]}.{formato.value}",
+        # o conteúdo de um id nunca muda (ver app/relatorios.py)
+        headers={"ETag": f'"{relatorio_id}"', "Cache-Control": "private, max-age=86400, immutable"},
+    )
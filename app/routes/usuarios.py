@@ -1,14 +1,16 @@
 #Módulo: routes/usuarios.py
 #Define as rotas relacionadas à entidade Usuário.
-#Permite criar, listar e buscar usuários.
+#Permite criar, listar e buscar usuários, conferir a senha (login) e excluir a frota.
 
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
 
-from app import schemas, crud
-from app.database import get_db
+from app import schemas, crud, escrita, exclusao, models, seguranca, versoes
+from app.database import get_db, get_read_db
+from app.paginacao import montar_pagina, parametros_paginacao
+from app.serializacao import pagina_rapida
 
 # ============================================================
 # 1. Inicialização do roteador
@@ -24,17 +26,27 @@ router = APIRouter(
 # ============================================================
 
 @router.post("/", response_model=schemas.UsuarioResponse, status_code=status.HTTP_201_CREATED)
-def criar_usuario(usuario: schemas.UsuarioCreate, db: Session = Depends(get_db)):
+async def criar_usuario(usuario: schemas.UsuarioCreate, db: Session = Depends(get_db)):
     """
     Cadastra um novo usuário.
     - Requer: nome, email e senha.
     - O e-mail deve ser único.
+    - O hash da senha é calculado no pool de processos (seguranca.py),
+      sem ocupar o event loop nem as threads das demais requisições.
+    - Com ESCRITA_AGRUPADA=1, o commit é feito em lote com outros cadastros (ver escrita.py).
     """
-    usuario_existente = crud.buscar_usuario_por_email(db, usuario.email)
+    usuario_existente = await run_in_threadpool(crud.obter_usuario_por_email, db, usuario.email)
     if usuario_existente:
         raise HTTPException(status_code=400, detail="E-mail já cadastrado.")
 
-    novo_usuario = crud.criar_usuario(db, usuario)
+    senha_hash = await seguranca.gerar_hash_senha(usuario.senha)
+    # Outro cadastro com o mesmo e-mail pode ter sido gravado depois da verificação
+    with escrita.erros_de_integridade(duplicado="E-mail já cadastrado."):
+        if escrita.escritor:
+            return await escrita.escritor.inserir(
+                models.Usuario, {"nome": usuario.nome, "email": usuario.email, "senha_hash": senha_hash}
+            )
+        novo_usuario = await run_in_threadpool(crud.criar_usuario, db, usuario, senha_hash)
     return novo_usuario
 
 
@@ -42,12 +54,24 @@ def criar_usuario(usuario: schemas.UsuarioCreate, db: Session = Depends(get_db))
 # 3. Endpoint: Listar usuários
 # ============================================================
 
-@router.get("/", response_model=List[schemas.UsuarioResponse])
-def listar_usuarios(db: Session = Depends(get_db)):
+@router.get("/", response_model=schemas.PaginaUsuarios)
+def listar_usuarios(
+    paginacao=Depends(parametros_paginacao),
+    rapido: bool = Query(False, description="Serialização rápida (mesmo JSON, sem validação por item)."),
+    cabecalhos=Depends(versoes.condicional("usuarios")),
+    db: Session = Depends(get_read_db),
+):
     """
-    Retorna todos os usuários cadastrados.
+    Retorna os usuários cadastrados, paginados por cursor.
+    - Use o next_cursor da resposta no parâmetro cursor para obter a próxima página.
+    - Com rapido=true, as colunas são lidas sem objetos ORM e serializadas direto.
+    - Responde 304 se If-None-Match trouxer o ETag atual (nada mudou).
     """
-    return crud.listar_usuarios(db)
+    apos_id, limite = paginacao
+    if rapido:
+        linhas = crud.listar_linhas(db, models.Usuario, schemas.UsuarioResponse, apos_id, limite + 1)
+        return pagina_rapida(montar_pagina(linhas, limite), schemas.UsuarioResponse, cabecalhos)
+    return montar_pagina(crud.listar_usuarios(db, apos_id, limite + 1), limite)
 
 
 # ============================================================
@@ -55,12 +79,81 @@ def listar_usuarios(db: Session = Depends(get_db)):
 # ============================================================
 
 @router.get("/buscar", response_model=schemas.UsuarioResponse)
-def buscar_usuario(email: str, db: Session = Depends(get_db)):
+def buscar_usuario(email: str, db: Session = Depends(get_read_db)):
     """
     Busca um usuário pelo e-mail.
     Exemplo de uso: /usuarios/buscar?email=teste@exemplo.com
     """
-    usuario = crud.buscar_usuario_por_email(db, email)
+    usuario = crud.obter_usuario_por_email(db, email)
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuário não encontrado.")
     return usuario
+
+
+# ============================================================
+# 5. Endpoint: Conferir senha (login)
+# ============================================================
+
+@router.post("/login", response_model=schemas.UsuarioResponse)
+async def login(credenciais: schemas.UsuarioLogin, db: Session = Depends(get_db)):
+    """
+    Confere e-mail e senha e retorna o usuário.
+    - E-mail inexistente e senha errada têm a mesma resposta (401) e
+      custo semelhante, para não revelar quais e-mails estão cadastrados.
+    """
+    usuario = await run_in_threadpool(crud.buscar_usuario_por_email, db, credenciais.email)
+    senha_hash = usuario.senha_hash if usuario else None
+    if not await seguranca.verificar_senha(credenciais.senha, senha_hash):
+        raise HTTPException(status_code=401, detail="E-mail ou senha inválidos.")
+    return usuario
+
+
+# ============================================================
+# 6. Endpoint: Excluir a frota do usuário
+# ============================================================
+
+@router.delete("/{usuario_id}/veiculos", response_model=schemas.ResultadoExclusao)
+def excluir_frota(usuario_id: int, db: Session = Depends(get_db)):
+    """
+    Exclui todos os veículos do usuário, com tudo o que depende deles,
+    em uma transação por bloco de veículos (ver crud.excluir_frota).
+    - Para frotas grandes, prefira POST /usuarios/{usuario_id}/expurgo,
+      que apaga em lotes sem bloquear os outros escritores.
+    """
+    if not crud.buscar_usuario_por_id(db, usuario_id):
+        raise HTTPException(status_code=404, detail="Usuário não encontrado.")
+    _, contagem = crud.excluir_frota(db, usuario_id)
+    return {"excluidos": contagem}
+
+
+# ============================================================
+# 7. Endpoint: Expurgo da frota em segundo plano
+# ============================================================
+
+@router.post("/{usuario_id}/expurgo", response_model=schemas.SituacaoExpurgo,
+             status_code=status.HTTP_202_ACCEPTED)
+def iniciar_expurgo(usuario_id: int, tarefas: BackgroundTasks, db: Session = Depends(get_db)):
+    """
+    Agenda a exclusão de todos os veículos do usuário e dos seus
+    dependentes, em lotes de transações curtas (ver exclusao.py).
+    - Responde 202 na hora; acompanhe em GET /usuarios/{usuario_id}/expurgo.
+    - Responde 409 se já houver um expurgo em andamento para o usuário.
+    """
+    if not crud.buscar_usuario_por_id(db, usuario_id):
+        raise HTTPException(status_code=404, detail="Usuário não encontrado.")
+    if not exclusao.reservar_expurgo(usuario_id):
+        raise HTTPException(status_code=409, detail="Já existe um expurgo em andamento para este usuário.")
+    tarefas.add_task(exclusao.expurgar_frota, usuario_id)
+    return exclusao.expurgos[usuario_id]
+
+
+@router.get("/{usuario_id}/expurgo", response_model=schemas.SituacaoExpurgo)
+def consultar_expurgo(usuario_id: int):
+    """
+    Situação do último expurgo da frota do usuário neste processo,
+    com o número de registros já excluídos por tabela.
+    """
+    situacao = exclusao.expurgos.get(usuario_id)
+    if not situacao:
+        raise HTTPException(status_code=404, detail="Nenhum expurgo registrado para este usuário.")
+    return situacao
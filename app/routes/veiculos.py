@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
 
-from app import schemas, crud
-from app.database import get_db
+from app import schemas, crud, escrita, models, versoes
+from app.database import get_db, get_read_db
+from app.lotes import montar_exclusao, montar_lote, parametros_ids
+from app.paginacao import montar_pagina, parametros_paginacao
+from app.serializacao import pagina_rapida
 
 # ============================================================
 # 1. Inicialização do roteador
@@ -19,12 +22,21 @@ router = APIRouter(
 # ============================================================
 
 @router.post("/", response_model=schemas.VeiculoResponse, status_code=status.HTTP_201_CREATED)
-def criar_veiculo(veiculo: schemas.VeiculoCreate, db: Session = Depends(get_db)):
+async def criar_veiculo(veiculo: schemas.VeiculoCreate, db: Session = Depends(get_db)):
     """
     Cadastra um novo veículo no sistema.
     - Requer JSON com: placa, modelo, marca, ano, km_atual, usuario_id.
+    - A placa deve ser única (400 se já cadastrada).
+    - Com ESCRITA_AGRUPADA=1, o commit é feito em lote com outros cadastros (ver escrita.py).
     """
-    novo_veiculo = crud.criar_veiculo(db, veiculo)
+    usuario = await run_in_threadpool(crud.buscar_usuario_por_id, db, veiculo.usuario_id)
+    if not usuario:
+        raise HTTPException(status_code=404, detail="Usuário não encontrado.")
+
+    with escrita.erros_de_integridade(duplicado="Placa já cadastrada.", ausente="Usuário não encontrado."):
+        if escrita.escritor:
+            return await escrita.escritor.inserir(models.Veiculo, veiculo.dict())
+        novo_veiculo = await run_in_threadpool(crud.criar_veiculo, db, veiculo)
     return novo_veiculo
 
 
@@ -32,12 +44,55 @@ def criar_veiculo(veiculo: schemas.VeiculoCreate, db: Session = Depends(get_db))
 # 3. Endpoint: Listar veículos
 # ============================================================
 
-@router.get("/", response_model=List[schemas.VeiculoResponse])
-def listar_veiculos(db: Session = Depends(get_db)):
+@router.get("/", response_model=schemas.PaginaVeiculos)
+def listar_veiculos(
+    paginacao=Depends(parametros_paginacao),
+    rapido: bool = Query(False, description="Serialização rápida (mesmo JSON, sem validação por item)."),
+    cabecalhos=Depends(versoes.condicional("veiculos")),
+    db: Session = Depends(get_read_db),
+):
     """
-    Retorna a lista de todos os veículos cadastrados.
+    Retorna os veículos cadastrados, paginados por cursor.
+    - Use o next_cursor da resposta no parâmetro cursor para obter a próxima página.
+    - Com rapido=true, as colunas são lidas sem objetos ORM e serializadas direto.
+    - Responde 304 se If-None-Match trouxer o ETag atual (nada mudou).
     """
-    return crud.listar_veiculos(db)
+    apos_id, limite = paginacao
+    if rapido:
+        linhas = crud.listar_linhas(db, models.Veiculo, schemas.VeiculoResponse, apos_id, limite + 1)
+        return pagina_rapida(montar_pagina(linhas, limite), schemas.VeiculoResponse, cabecalhos)
+    return montar_pagina(crud.listar_veiculos(db, apos_id, limite + 1), limite)
+
+
+# ============================================================
+# 3.1 Endpoint: Buscar vários veículos por ID (lote)
+# ============================================================
+# Declarada antes de /{veiculo_id} para não ser capturada por ela.
+
+@router.get("/lote", response_model=schemas.LoteVeiculos)
+def buscar_veiculos_em_lote(ids=Depends(parametros_ids), db: Session = Depends(get_read_db)):
+    """
+    Busca vários veículos em uma chamada: /veiculos/lote?ids=3,1,2
+    - Os veículos vêm na ordem pedida; ids inexistentes em nao_encontrados.
+    """
+    return montar_lote(ids, crud.buscar_veiculos_por_ids(db, ids))
+
+
+# ============================================================
+# 3.2 Endpoint: Excluir vários veículos por ID (lote)
+# ============================================================
+# Também declarada antes de /{veiculo_id}.
+
+@router.delete("/lote", response_model=schemas.ResultadoExclusao)
+def excluir_veiculos_em_lote(ids=Depends(parametros_ids), db: Session = Depends(get_db)):
+    """
+    Exclui vários veículos, com tudo o que depende deles, em uma transação:
+    /veiculos/lote?ids=3,1,2
+    - Ids inexistentes são ignorados e listados em nao_encontrados.
+    - Para a frota inteira de um usuário, veja DELETE /usuarios/{usuario_id}/veiculos.
+    """
+    excluidos, contagem = crud.excluir_veiculos(db, ids)
+    return montar_exclusao(ids, excluidos, contagem)
 
 
 # ============================================================
@@ -45,11 +100,27 @@ def listar_veiculos(db: Session = Depends(get_db)):
 # ============================================================
 
 @router.get("/{veiculo_id}", response_model=schemas.VeiculoResponse)
-def buscar_veiculo(veiculo_id: int, db: Session = Depends(get_db)):
+def buscar_veiculo(veiculo_id: int, db: Session = Depends(get_read_db)):
     """
     Busca um veículo específico pelo ID.
     """
-    veiculo = crud.buscar_veiculo_por_id(db, veiculo_id)
+    veiculo = crud.obter_veiculo(db, veiculo_id)
+    if not veiculo:
+        raise HTTPException(status_code=404, detail="Veículo não encontrado.")
+    return veiculo
+
+
+# ============================================================
+# 4.1 Endpoint: Detalhe completo do veículo
+# ============================================================
+
+@router.get("/{veiculo_id}/completo", response_model=schemas.VeiculoCompleto)
+def buscar_veiculo_completo(veiculo_id: int, db: Session = Depends(get_read_db)):
+    """
+    Retorna o veículo com dono, planos, manutenções e documentos
+    em uma única chamada (número fixo de consultas ao banco).
+    """
+    veiculo = crud.buscar_veiculo_completo(db, veiculo_id)
     if not veiculo:
         raise HTTPException(status_code=404, detail="Veículo não encontrado.")
     return veiculo
@@ -79,6 +150,8 @@ def atualizar_veiculo(veiculo_id: int, dados: schemas.VeiculoBase, db: Session =
 def excluir_veiculo(veiculo_id: int, db: Session = Depends(get_db)):
     """
     Exclui um veículo do banco de dados.
+    - Manutenções, documentos, planos, resumo de custos e leituras de
+      odômetro do veículo são excluídos junto (ver exclusao.py).
     """
     veiculo = crud.excluir_veiculo(db, veiculo_id)
     if not veiculo:
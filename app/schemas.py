@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field
+from typing import Dict, Optional, List
 from datetime import date
+from enum import Enum
 
 # ============================================================
 # 1. Schemas de USUÁRIO
@@ -11,7 +12,11 @@ class UsuarioBase(BaseModel):
     email: EmailStr
 
 class UsuarioCreate(UsuarioBase):
-    senha: str  # senha em texto puro, será convertida para hash depois
+    senha: str  # senha em texto puro; o banco guarda apenas o hash (ver seguranca.py)
+
+class UsuarioLogin(BaseModel):
+    email: EmailStr
+    senha: str
 
 class UsuarioResponse(UsuarioBase):
     id: int
@@ -66,6 +71,15 @@ class ManutencaoResponse(ManutencaoBase):
     class Config:
         orm_mode = True
 
+class ManutencaoBusca(ManutencaoResponse):
+    relevancia: float      # bm25: quanto menor, mais relevante
+
+class ManutencaoLoteResultado(BaseModel):
+    indice: int            # posição do item na lista enviada
+    sucesso: bool
+    id: Optional[int] = None
+    erro: Optional[str] = None
+
 
 # ============================================================
 # 4. Schemas de DOCUMENTOS
@@ -105,3 +119,148 @@ class PlanoManutencaoResponse(PlanoManutencaoBase):
 
     class Config:
         orm_mode = True
+
+class PlanoVencido(BaseModel):
+    plano_id: int
+    veiculo_id: int
+    placa: str
+    nome_plano: Optional[str] = None
+    km_referencia: int
+    km_atual: int
+    ultimo_km: Optional[int] = None   # km da última manutenção do mesmo tipo
+    proximo_km: int                   # ultimo_km (ou 0) + km_referencia
+    km_restante: int                  # negativo = já passou do ponto
+    situacao: str                     # "vencido" ou "proximo"
+
+
+class PrevisaoPlano(BaseModel):
+    plano_id: int
+    veiculo_id: int
+    placa: str
+    nome_plano: Optional[str] = None
+    proximo_km: int
+    km_atual: int                     # maior entre km_atual e a última leitura
+    km_por_dia: Optional[float] = None
+    data_prevista: Optional[date] = None
+    situacao: str                     # "vencido", "previsto" ou "sem_dados"
+
+
+# ============================================================
+# 5.1 Schemas de DETALHE DO VEÍCULO
+# ============================================================
+# Visão completa do veículo, com dono, planos e histórico de
+# manutenções (cada uma com seus documentos).
+
+class ManutencaoComDocumentos(ManutencaoResponse):
+    documentos: List[DocumentoResponse] = []
+
+class VeiculoCompleto(VeiculoResponse):
+    usuario: Optional[UsuarioResponse] = None
+    planos: List[PlanoManutencaoResponse] = []
+    manutencoes: List[ManutencaoComDocumentos] = []
+
+
+# ============================================================
+# 6. Schemas de PAGINAÇÃO
+# ============================================================
+# Respostas das rotas de listagem: itens da página atual e o
+# cursor opaco para buscar a próxima (None na última página).
+
+class PaginaUsuarios(BaseModel):
+    itens: List[UsuarioResponse]
+    next_cursor: Optional[str] = None
+
+class PaginaVeiculos(BaseModel):
+    itens: List[VeiculoResponse]
+    next_cursor: Optional[str] = None
+
+class PaginaManutencoes(BaseModel):
+    itens: List[ManutencaoResponse]
+    next_cursor: Optional[str] = None
+
+class PaginaPlanos(BaseModel):
+    itens: List[PlanoManutencaoResponse]
+    next_cursor: Optional[str] = None
+
+
+# ============================================================
+# 6.1 Schemas de BUSCA EM LOTE
+# ============================================================
+# Respostas das rotas /lote: registros na ordem dos ids pedidos
+# e os ids que não foram encontrados.
+
+class LoteVeiculos(BaseModel):
+    itens: List[VeiculoResponse]
+    nao_encontrados: List[int]
+
+class LoteManutencoes(BaseModel):
+    itens: List[ManutencaoResponse]
+    nao_encontrados: List[int]
+
+class LotePlanos(BaseModel):
+    itens: List[PlanoManutencaoResponse]
+    nao_encontrados: List[int]
+
+
+# ============================================================
+# 6.2 Schemas de EXCLUSÃO EM LOTE
+# ============================================================
+# excluidos: registros removidos por tabela, incluindo os dependentes
+# apagados em cascata (ex.: {"veiculos": 2, "manutencoes": 40, ...}).
+
+class ResultadoExclusao(BaseModel):
+    excluidos: Dict[str, int]
+    nao_encontrados: List[int] = []
+
+class SituacaoExpurgo(BaseModel):
+    usuario_id: int
+    situacao: str                  # "em_andamento", "concluido" ou "erro"
+    excluidos: Dict[str, int]
+    erro: Optional[str] = None
+
+
+# ============================================================
+# 7. Schemas de EXPORTAÇÃO
+# ============================================================
+
+class FormatoExportacao(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+# ============================================================
+# 8. Schemas de CUSTOS
+# ============================================================
+
+class CustoTotal(BaseModel):
+    total: float
+    quantidade: int
+
+class CustoMensal(CustoTotal):
+    mes: Optional[str] = None              # "AAAA-MM"; None = sem data
+
+class CustoPorTipo(CustoTotal):
+    tipo_manutencao: Optional[str] = None  # None = tipo não informado
+
+
+# ============================================================
+# 9. Schemas de RELATÓRIOS
+# ============================================================
+# Relatórios anuais gerados em segundo plano (ver relatorios.py).
+
+class FormatoRelatorio(str, Enum):
+    csv = "csv"
+    html = "html"      # resumo para impressão (ou "salvar como PDF" no navegador)
+
+class RelatorioCreate(BaseModel):
+    usuario_id: int
+    veiculo_id: Optional[int] = None   # None = frota inteira do usuário
+    ano: int = Field(..., ge=1900, le=2100)
+    formato: FormatoRelatorio = FormatoRelatorio.csv
+
+class SituacaoRelatorio(BaseModel):
+    id: str
+    situacao: str                  # "em_andamento", "concluido" ou "erro"
+    formato: FormatoRelatorio
+    tamanho: Optional[int] = None  # bytes do arquivo, quando concluído
+    erro: Optional[str] = None
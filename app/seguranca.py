@@ -0,0 +1,139 @@
+# Módulo: seguranca.py
+"""
+Módulo: seguranca.py
+Hash e verificação de senhas com scrypt (hashlib, biblioteca padrão).
+
+A derivação de chave é propositalmente cara em CPU e memória. Para não
+travar o event loop nem as threads que atendem requisições, ela roda em
+um pool de processos de tamanho limitado; as rotas apenas aguardam o
+resultado (await).
+
+Formato armazenado em senha_hash:
+    scrypt$<n>$<r>$<p>$<sal base64>$<hash base64>
+Os parâmetros ficam no próprio hash, então hashes antigos continuam
+verificáveis depois de ajustar o custo.
+
+Os processos usam o método "spawn": scripts que usem este módulo
+diretamente precisam do bloco `if __name__ == "__main__":`.
+
+Configuração por variáveis de ambiente:
+- SENHA_SCRYPT_N, SENHA_SCRYPT_R, SENHA_SCRYPT_P: custo do scrypt
+  (padrão n=16384, r=8, p=1: ~16 MiB de memória por hash)
+- HASH_WORKERS: número de processos do pool (padrão: núcleos da máquina)
+"""
+
+import asyncio
+import base64
+import functools
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+SCRYPT_N = int(os.getenv("SENHA_SCRYPT_N", 2 ** 14))
+SCRYPT_R = int(os.getenv("SENHA_SCRYPT_R", 8))
+SCRYPT_P = int(os.getenv("SENHA_SCRYPT_P", 1))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", os.cpu_count() or 1))
+
+TAMANHO_SAL = 16
+TAMANHO_HASH = 32
+
+_pool = None
+_trava_pool = threading.Lock()
+
+
+# ============================================================
+# 1. Funções executadas nos processos do pool
+# ============================================================
+
+def _derivar(senha: str, sal: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        senha.encode("utf-8"), salt=sal, n=n, r=r, p=p,
+        maxmem=256 * n * r * p, dklen=TAMANHO_HASH,
+    )
+
+
+def gerar_hash_sincrono(senha: str, n: int = SCRYPT_N, r: int = SCRYPT_R, p: int = SCRYPT_P) -> str:
+    """Gera o hash no processo atual (bloqueante)."""
+    sal = os.urandom(TAMANHO_SAL)
+    chave = _derivar(senha, sal, n, r, p)
+    return "$".join((
+        "scrypt", str(n), str(r), str(p),
+        base64.b64encode(sal).decode(), base64.b64encode(chave).decode(),
+    ))
+
+
+@functools.lru_cache(maxsize=1)
+def _hash_ficticio() -> str:
+    return gerar_hash_sincrono(base64.b64encode(os.urandom(12)).decode())
+
+
+def verificar_sincrono(senha: str, senha_hash: str = None) -> bool:
+    """
+    Confere a senha com o hash armazenado no processo atual (bloqueante).
+    Sem hash (usuário inexistente), faz o mesmo trabalho contra um hash
+    fictício e retorna False, para que o tempo de resposta não revele
+    se o e-mail está cadastrado.
+    """
+    if senha_hash is None:
+        verificar_sincrono(senha, _hash_ficticio())
+        return False
+    try:
+        algoritmo, n, r, p, sal, esperado = senha_hash.split("$")
+        if algoritmo != "scrypt":
+            return False
+        chave = _derivar(senha, base64.b64decode(sal), int(n), int(r), int(p))
+    except (ValueError, AttributeError):
+        return False
+    return hmac.compare_digest(chave, base64.b64decode(esperado))
+
+
+# ============================================================
+# 2. Pool de processos
+# ============================================================
+
+def obter_pool() -> ProcessPoolExecutor:
+    """Retorna o pool de processos, criando-o no primeiro uso."""
+    global _pool
+    if _pool is None:
+        with _trava_pool:
+            if _pool is None:
+                # "spawn" evita herdar threads e conexões do processo do servidor
+                _pool = ProcessPoolExecutor(
+                    max_workers=HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+                )
+    return _pool
+
+
+def configurar_pool(workers: int):
+    """Redimensiona o pool (o atual é encerrado e recriado no próximo uso)."""
+    global HASH_WORKERS
+    encerrar_pool()
+    HASH_WORKERS = workers
+
+
+def encerrar_pool():
+    """Encerra os processos do pool (chamado no desligamento da aplicação)."""
+    global _pool
+    with _trava_pool:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+# ============================================================
+# 3. API assíncrona usada pelas rotas
+# ============================================================
+
+async def gerar_hash_senha(senha: str) -> str:
+    """Gera o hash da senha em um processo do pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(obter_pool(), gerar_hash_sincrono, senha, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+async def verificar_senha(senha: str, senha_hash: str = None) -> bool:
+    """Confere a senha com o hash armazenado, em um processo do pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(obter_pool(), verificar_sincrono, senha, senha_hash)
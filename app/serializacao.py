@@ -0,0 +1,74 @@
+# Módulo: serializacao.py
+"""
+Módulo: serializacao.py
+Caminho rápido de serialização para listagens grandes.
+
+As linhas chegam do banco como tuplas (consulta Core, sem objetos ORM)
+e são convertidas direto em JSON, sem passar pela validação dos
+response_model. O JSON gerado é idêntico, byte a byte, ao do caminho
+normal: mesmas chaves, na mesma ordem dos schemas, e a mesma formatação
+compacta em UTF-8 usada pelo JSONResponse do FastAPI.
+
+Usa orjson quando instalado; caso contrário, o json da biblioteca padrão.
+"""
+
+import json
+from datetime import date
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+
+def _padrao(valor):
+    if isinstance(valor, date):
+        return valor.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def _float_com_expoente(valor) -> bool:
+    """
+    Floats que o json padrão escreve em notação científica (ex.: 1e-07),
+    onde o orjson usa outra grafia (1e-7).
+    """
+    return valor is not None and valor != 0 and not 1e-4 <= abs(valor) < 1e16
+
+
+def dumps(conteudo, padrao: bool = False) -> bytes:
+    """Serializa para JSON compacto em UTF-8 (padrao=True força o json da biblioteca padrão)."""
+    if orjson is not None and not padrao:
+        return orjson.dumps(conteudo)
+    return json.dumps(
+        conteudo, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_padrao
+    ).encode("utf-8")
+
+
+class RespostaJSONRapida(Response):
+    """Resposta JSON que serializa com dumps (sem jsonable_encoder)."""
+
+    media_type = "application/json"
+
+    def __init__(self, conteudo, padrao: bool = False, **kwargs):
+        self.padrao = padrao
+        super().__init__(conteudo, **kwargs)
+
+    def render(self, conteudo) -> bytes:
+        return dumps(conteudo, self.padrao)
+
+
+def pagina_rapida(pagina: dict, schema, cabecalhos: dict = None) -> RespostaJSONRapida:
+    """
+    Converte uma página de linhas Core (ver montar_pagina) em resposta JSON.
+    cabecalhos: cabeçalhos extras da resposta (ex.: ETag, ver versoes.condicional).
+    Se algum campo float exigir notação científica, usa o json padrão
+    para manter a saída idêntica à do caminho normal.
+    """
+    campos_float = [nome for nome, campo in schema.__fields__.items() if campo.type_ is float]
+    pagina["itens"] = [linha._asdict() for linha in pagina["itens"]]
+    padrao = any(
+        _float_com_expoente(item[campo]) for item in pagina["itens"] for campo in campos_float
+    )
+    return RespostaJSONRapida(pagina, padrao=padrao, headers=cabecalhos)
@@ -0,0 +1,142 @@
+# Módulo: versoes.py
+"""
+Módulo: versoes.py
+Versões dos dados (tabela versoes_dados) e GET condicional com ETag.
+
+As funções de escrita de crud.py incrementam, na mesma transação, o
+contador da tabela alterada e o do veículo afetado. As listagens
+calculam o ETag só a partir desses contadores: se o cliente enviar
+If-None-Match com o mesmo valor, a resposta é 304 sem executar a
+consulta da listagem nem serializar nada.
+
+Após escritas feitas diretamente no banco (importações, scripts),
+invalide os ETags de todos os clientes com:
+    python -m app.versoes
+"""
+
+import hashlib
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import executar_comandos, get_read_db
+
+Versao = models.VersaoDados
+
+# Chave de cada tabela: incrementada em qualquer escrita nela
+CHAVES_TABELA = {
+    models.Usuario: "usuarios",
+    models.Veiculo: "veiculos",
+    models.Manutencao: "manutencoes",
+    models.Documento: "documentos",
+    models.PlanoManutencao: "planos",
+}
+
+
+# ============================================================
+# 1. Contadores
+# ============================================================
+
+def chave_veiculo(veiculo_id: int) -> str:
+    """Chave dos dados de um veículo (o próprio veículo, manutenções e planos)."""
+    return f"veiculo:{veiculo_id}"
+
+
+def chaves_de(objeto) -> list:
+    """Chaves afetadas pela escrita de um objeto ORM."""
+    chaves = [CHAVES_TABELA[type(objeto)]]
+    if isinstance(objeto, models.Veiculo):
+        chaves.append(chave_veiculo(objeto.id))
+    elif isinstance(objeto, (models.Manutencao, models.PlanoManutencao)):
+        chaves.append(chave_veiculo(objeto.veiculo_id))
+    return chaves
+
+
+def comandos_incremento(chave: str):
+    """UPDATE incremental e INSERT caso a chave ainda não exista."""
+    atualizar = update(Versao).where(Versao.chave == chave).values(versao=Versao.versao + 1)
+    inserir = insert(Versao).values(chave=chave, versao=1)
+    return atualizar, inserir
+
+
+def comandos_incrementar(chaves):
+    """Gerador dos comandos de incrementar (ver database.executar_comandos)."""
+    for chave in sorted(set(chaves)):
+        atualizar, inserir = comandos_incremento(chave)
+        if (yield atualizar, None).rowcount == 0:
+            yield inserir, None
+
+
+def incrementar(db: Session, chaves):
+    """Incrementa as versões na transação corrente (sem commit)."""
+    executar_comandos(db, comandos_incrementar(chaves))
+
+
+def obter(db: Session, chaves) -> list:
+    """Versões atuais das chaves, na ordem pedida (0 se nunca houve escrita)."""
+    encontradas = dict(db.execute(select(Versao.chave, Versao.versao).where(Versao.chave.in_(chaves))).all())
+    return [encontradas.get(chave, 0) for chave in chaves]
+
+
+def invalidar_tudo(db: Session):
+    """Incrementa todas as versões existentes (após escritas diretas no banco)."""
+    incrementar(db, [*db.scalars(select(Versao.chave)), *CHAVES_TABELA.values()])
+    db.commit()
+
+
+# ============================================================
+# 2. GET condicional (dependência das rotas)
+# ============================================================
+
+def calcular_etag(request: Request, versoes: list) -> str:
+    """ETag fraco da URL (caminho e parâmetros) nas versões informadas."""
+    base = f"{request.url.path}?{request.url.query}|{','.join(map(str, versoes))}"
+    return 'W/"' + hashlib.sha1(base.encode()).hexdigest()[:20] + '"'
+
+
+def etag_confere(if_none_match: str, etag: str) -> bool:
+    """Comparação fraca do If-None-Match (aceita lista e "*")."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    alvo = etag.removeprefix("W/")
+    return any(valor.strip().removeprefix("W/") == alvo for valor in if_none_match.split(","))
+
+
+def condicional(*modelos_chave: str):
+    """
+    Cria a dependência de GET condicional para as chaves informadas.
+    As chaves podem usar parâmetros do caminho, ex.: "veiculo:{veiculo_id}".
+
+    A dependência lê as versões (uma consulta) e:
+    - responde 304 se o If-None-Match do cliente confere;
+    - caso contrário, adiciona ETag à resposta e deixa a rota executar.
+    Retorna os cabeçalhos, para rotas que montam a própria Response
+    (o FastAPI não aplica os cabeçalhos da dependência nesse caso).
+    As versões são lidas antes da listagem: se uma escrita ocorrer entre
+    as duas leituras, o ETag fica mais antigo que os dados, nunca o contrário.
+    """
+    def dependencia(request: Request, response: Response, db: Session = Depends(get_read_db)) -> dict:
+        chaves = [modelo.format(**request.path_params) for modelo in modelos_chave]
+        etag = calcular_etag(request, obter(db, chaves))
+        cabecalhos = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_confere(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=cabecalhos)
+        response.headers.update(cabecalhos)
+        return cabecalhos
+
+    return dependencia
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    sessao = SessionLocal()
+    try:
+        invalidar_tudo(sessao)
+        print("Versões dos dados incrementadas.")
+    finally:
+        sessao.close()
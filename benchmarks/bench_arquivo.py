@@ -0,0 +1,91 @@
+"""
+Benchmark: consultas do histórico recente antes e depois do arquivamento.
+
+Gera uma frota com histórico longo, mede as rotas de leitura de
+manutenções recentes, move as anteriores ao corte para o banco de
+arquivo (app/arquivamento.py) e mede de novo. Também mede a busca por
+id de uma manutenção arquivada, que passa a consultar os dois bancos.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_arquivo --usuarios 500 --manutencoes-por-veiculo 40 --dias 365
+
+Requer httpx. Os bancos são criados em um diretório temporário.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from benchmarks import gerador
+from benchmarks.comum import cliente_asgi, disparar, preparar_ambiente_temporario, resumir
+
+
+def montar_cenarios(recentes, antigas, quantidade: int, limite: int) -> dict:
+    from app.paginacao import codificar_cursor
+
+    inicio_recentes = codificar_cursor(recentes[0] - 1)
+    return {
+        "pagina_recente": [
+            ("GET", "/manutencoes/", {"params": {"cursor": inicio_recentes, "limit": limite}})
+            for _ in range(quantidade)
+        ],
+        "id_recente": [("GET", f"/manutencoes/{random.choice(recentes)}", {}) for _ in range(quantidade)],
+        "id_antigo": [("GET", f"/manutencoes/{random.choice(antigas)}", {}) for _ in range(quantidade)],
+    }
+
+
+async def medir(cliente, cenarios: dict, concorrencia: int, rotulo: str):
+    for nome, requisicoes in cenarios.items():
+        duracao, latencias, erros = await disparar(cliente, requisicoes, concorrencia)
+        r = resumir(latencias, duracao, len(requisicoes), erros)
+        print(f"{rotulo:<8} {nome:<16} {r['rps']:>10.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['erros']:>6}")
+
+
+async def executar(args):
+    from sqlalchemy import select
+
+    from app import arquivamento, models
+    from app.database import SessionLocal
+    from app.main import app
+
+    frota = gerador.gerar_frota_de_argumentos(args)
+    corte = date.today() - timedelta(days=args.dias)
+    M = models.Manutencao
+    with SessionLocal() as db:
+        recentes = list(db.scalars(select(M.id).where(M.data >= corte).order_by(M.id)))
+        antigas = list(db.scalars(select(M.id).where(M.data < corte)))
+    if not recentes or not antigas:
+        raise SystemExit("a frota gerada não tem manutenções dos dois lados do corte; ajuste --dias")
+    cenarios = montar_cenarios(recentes, antigas, args.requisicoes, args.limite)
+    print(f"{frota['manutencoes']} manutenções, {len(antigas)} anteriores a {corte}")
+
+    print(f"{'fase':<8} {'cenário':<16} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'erros':>6}")
+    async with cliente_asgi(app) as cliente:
+        await medir(cliente, cenarios, args.concorrencia, "antes")
+        inicio = time.perf_counter()
+        movidas = arquivamento.arquivar(corte, args.lote, pausa_ms=0)
+        print(f"{movidas} manutenções arquivadas em {time.perf_counter() - inicio:.2f}s")
+        await medir(cliente, cenarios, args.concorrencia, "depois")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--concorrencia", type=int, default=10)
+    parser.add_argument("--limite", type=int, default=50, help="itens por página")
+    parser.add_argument("--dias", type=int, default=365, help="arquiva manutenções com mais de N dias")
+    parser.add_argument("--lote", type=int, default=1000)
+    gerador.adicionar_argumentos(parser)
+    parser.set_defaults(manutencoes_por_veiculo=40)
+    args = parser.parse_args()
+
+    with preparar_ambiente_temporario() as diretorio:
+        os.environ["ARQUIVO_DB"] = os.path.join(diretorio, "arquivo.db")
+        asyncio.run(executar(args))
+
+
+if __name__ == "__main__":
+    main()
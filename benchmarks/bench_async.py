@@ -0,0 +1,58 @@
+"""
+Benchmark: rotas síncronas x assíncronas.
+
+Dispara requisições concorrentes contra GET /veiculos/{id} (threadpool)
+e GET /async/veiculos/{id} (event loop + aiosqlite), em processo, via
+httpx.ASGITransport, e imprime vazão e latências de cada modo.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_async --requisicoes 2000 --concorrencia 10 50 200
+
+Requer httpx e aiosqlite. O banco é criado em um diretório temporário.
+"""
+
+import argparse
+import asyncio
+import random
+
+from benchmarks import gerador
+from benchmarks.comum import cliente_asgi, disparar, preparar_ambiente_temporario, resumir
+
+
+async def executar(args):
+    from app.database import ASYNC_DISPONIVEL
+    from app.main import app
+
+    if not ASYNC_DISPONIVEL:
+        raise SystemExit("aiosqlite não instalado: o modo assíncrono não está disponível.")
+
+    total_veiculos = gerador.gerar_frota_de_argumentos(args)["veiculos"]
+    async with cliente_asgi(app) as cliente:
+        print(f"{'modo':<6} {'conc.':>6} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erros':>6}")
+        for concorrencia in args.concorrencia:
+            for modo, prefixo in (("sync", ""), ("async", "/async")):
+                requisicoes = [
+                    ("GET", f"{prefixo}/veiculos/{random.randint(1, total_veiculos)}", {})
+                    for _ in range(args.requisicoes)
+                ]
+                duracao, latencias, erros = await disparar(cliente, requisicoes, concorrencia)
+                r = resumir(latencias, duracao, len(requisicoes), erros)
+                print(
+                    f"{modo:<6} {concorrencia:>6} {r['rps']:>10.1f} {r['p50_ms']:>8.2f} "
+                    f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['erros']:>6}"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--concorrencia", type=int, nargs="+", default=[10, 50, 200])
+    gerador.adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    with preparar_ambiente_temporario():
+        asyncio.run(executar(args))
+
+
+if __name__ == "__main__":
+    main()
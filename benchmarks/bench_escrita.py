@@ -0,0 +1,82 @@
+"""
+Benchmark: cadastros com commit individual x escrita agrupada (group commit).
+
+Dispara POST /veiculos/ e POST /manutencoes/ concorrentes, em processo,
+via httpx.ASGITransport, primeiro com cada requisição fazendo o próprio
+commit e depois com o escritor agrupado (app/escrita.py), e imprime
+escritas por segundo e latências para cada nível de concorrência.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_escrita --requisicoes 2000 --concorrencia 1 10 50 200
+    DB_PERFIL=producao python -m benchmarks.bench_escrita
+
+Requer httpx. O banco é criado em um diretório temporário.
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+
+from benchmarks import gerador
+from benchmarks.comum import cliente_asgi, disparar, preparar_ambiente_temporario, resumir
+
+_sequencia = itertools.count()
+
+
+def montar_requisicoes(rota: str, quantidade: int, total_veiculos: int, usuarios: int):
+    if rota == "veiculos":
+        return [
+            ("POST", "/veiculos/", {"json": {
+                "placa": f"E{next(_sequencia):09d}", "modelo": "Escrita",
+                "usuario_id": random.randint(1, usuarios), "km_atual": 1000,
+            }})
+            for _ in range(quantidade)
+        ]
+    return [
+        ("POST", "/manutencoes/", {"json": {
+            "veiculo_id": random.randint(1, total_veiculos), "data": "2025-03-10",
+            "km": random.randint(0, 300000), "tipo_manutencao": "troca de óleo", "custo": 210.0,
+        }})
+        for _ in range(quantidade)
+    ]
+
+
+async def executar(args):
+    from app import escrita
+    from app.main import app
+
+    frota = gerador.gerar_frota_de_argumentos(args)
+    print(f"{'modo':<10} {'rota':<12} {'conc.':>6} {'escritas/s':>11} {'p50 ms':>8} {'p95 ms':>8} {'erros':>6} {'itens/lote':>11}")
+    for agrupada in (False, True):
+        escrita.ESCRITA_AGRUPADA = agrupada
+        async with cliente_asgi(app) as cliente:
+            for concorrencia in args.concorrencia:
+                for rota in args.rotas:
+                    requisicoes = montar_requisicoes(rota, args.requisicoes, frota["veiculos"], frota["usuarios"])
+                    lotes_antes = escrita.escritor.lotes if escrita.escritor else 0
+                    duracao, latencias, erros = await disparar(cliente, requisicoes, concorrencia)
+                    r = resumir(latencias, duracao, len(requisicoes), erros)
+                    por_lote = "-"
+                    if escrita.escritor:
+                        por_lote = f"{len(requisicoes) / max(escrita.escritor.lotes - lotes_antes, 1):.1f}"
+                    print(
+                        f"{'agrupada' if agrupada else 'individual':<10} {rota:<12} {concorrencia:>6} "
+                        f"{r['rps']:>11.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['erros']:>6} {por_lote:>11}"
+                    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--concorrencia", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--rotas", nargs="+", choices=["veiculos", "manutencoes"], default=["veiculos", "manutencoes"])
+    gerador.adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    with preparar_ambiente_temporario():
+        asyncio.run(executar(args))
+
+
+if __name__ == "__main__":
+    main()
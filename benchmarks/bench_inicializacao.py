@@ -0,0 +1,67 @@
+"""
+Benchmark: tempo de inicialização (cold start) de um worker.
+
+Cada medição roda em um processo Python novo, como um worker recém-criado:
+- importacao:   tempo de `import app.main` (não deve tocar no banco)
+- banco vazio:  importação + lifespan criando todo o esquema
+- banco pronto: importação + lifespan com o esquema já na versão atual
+                (caso comum ao escalar para muitos workers)
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_inicializacao --repeticoes 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.comum import RAIZ
+
+MEDICAO = """
+import asyncio, json, time
+inicio = time.perf_counter()
+import app.main
+importado = time.perf_counter()
+async def iniciar():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        pass
+if {executar_lifespan}:
+    asyncio.run(iniciar())
+fim = time.perf_counter()
+print(json.dumps({{"importacao": importado - inicio, "total": fim - inicio}}))
+"""
+
+
+def medir(url_banco: str, executar_lifespan: bool) -> dict:
+    ambiente = dict(os.environ, DATABASE_URL=url_banco, PYTHONPATH=RAIZ)
+    saida = subprocess.run(
+        [sys.executable, "-c", MEDICAO.format(executar_lifespan=executar_lifespan)],
+        env=ambiente, cwd=RAIZ, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    tempos = {"importacao": [], "banco vazio": [], "banco pronto": []}
+    with tempfile.TemporaryDirectory(prefix="bench_") as diretorio:
+        for n in range(args.repeticoes):
+            url = f"sqlite:///{os.path.join(diretorio, f'inicio_{n}.db')}"
+            tempos["importacao"].append(medir(url, False)["importacao"])
+            tempos["banco vazio"].append(medir(url, True)["total"])
+            tempos["banco pronto"].append(medir(url, True)["total"])
+
+    print(f"{'cenário':<14} {'mediana ms':>11} {'máx ms':>9}")
+    for cenario, valores in tempos.items():
+        print(f"{cenario:<14} {statistics.median(valores) * 1000:>11.1f} {max(valores) * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: relatórios anuais da frota gerados em segundo plano.
+
+Gera uma frota, pede o relatório do ano de um usuário com muitos
+veículos (POST /relatorios/), mede o tempo até a geração terminar no
+pool de processos e, depois, o tempo de um pedido repetido, atendido
+pelo relatório já gravado (mesmos dados, mesmo id).
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_relatorios --usuarios 10 --veiculos-por-usuario 500 --manutencoes-por-veiculo 40
+
+Requer httpx. O banco e os relatórios ficam em um diretório temporário.
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from benchmarks import gerador
+from benchmarks.comum import cliente_asgi, preparar_ambiente_temporario
+
+
+async def pedir_e_aguardar(cliente, pedido: dict) -> tuple:
+    """Pede o relatório e consulta a situação até a geração terminar. Retorna (segundos, situação)."""
+    inicio = time.perf_counter()
+    situacao = (await cliente.post("/relatorios/", json=pedido)).json()
+    while situacao["situacao"] == "em_andamento":
+        await asyncio.sleep(0.02)
+        situacao = (await cliente.get(f"/relatorios/{situacao['id']}")).json()
+    return time.perf_counter() - inicio, situacao
+
+
+async def executar(args):
+    from app.main import app
+
+    frota = gerador.gerar_frota_de_argumentos(args)
+    print(f"{frota['veiculos']} veículos, {frota['manutencoes']} manutenções")
+    print(f"{'formato':<8} {'pedido':<10} {'segundos':>9} {'bytes':>10} {'situação':<10}")
+    async with cliente_asgi(app, timeout=None) as cliente:
+        for formato in args.formatos:
+            pedido = {"usuario_id": 1, "ano": args.ano, "formato": formato}
+            for rotulo in ("novo", "repetido"):
+                segundos, situacao = await pedir_e_aguardar(cliente, pedido)
+                print(f"{formato:<8} {rotulo:<10} {segundos:>9.3f} {situacao['tamanho'] or 0:>10} {situacao['situacao']:<10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ano", type=int, default=date.today().year - 1)
+    parser.add_argument("--formatos", nargs="+", choices=["csv", "html"], default=["csv", "html"])
+    gerador.adicionar_argumentos(parser)
+    parser.set_defaults(usuarios=10, veiculos_por_usuario=200, manutencoes_por_veiculo=40)
+    args = parser.parse_args()
+
+    with preparar_ambiente_temporario():
+        asyncio.run(executar(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: cadastro de usuários com hash de senha em pool de processos.
+
+Para cada tamanho de pool (HASH_WORKERS), dispara cadastros concorrentes
+em POST /usuarios/ e, ao mesmo tempo, leituras leves em GET /. Mede a
+vazão de cadastros e a latência das leituras, que deve continuar baixa
+enquanto os hashes são calculados fora do event loop.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_senhas --cadastros 200 --workers 1 2 4
+
+Requer httpx. O banco é criado em um diretório temporário.
+"""
+
+import argparse
+import asyncio
+import itertools
+
+from benchmarks.comum import cliente_asgi, disparar, preparar_ambiente_temporario, resumir
+
+_sequencia = itertools.count()
+
+
+async def executar(args):
+    from app import seguranca
+    from app.main import app
+
+    print(
+        f"{'workers':>7} {'cadastros/s':>12} {'p95 cad. ms':>12} "
+        f"{'p50 GET / ms':>13} {'p95 GET / ms':>13} {'erros':>6}"
+    )
+    for workers in args.workers:
+        seguranca.configurar_pool(workers)
+        async with cliente_asgi(app) as cliente:
+            # Aquece o pool (processos "spawn" sobem no primeiro uso)
+            await asyncio.gather(*(seguranca.gerar_hash_senha("aquecimento") for _ in range(workers)))
+            cadastros = [
+                ("POST", "/usuarios/", {"json": {
+                    "nome": "Bench", "email": f"senha{next(_sequencia)}@exemplo.com", "senha": "segredo123",
+                }})
+                for _ in range(args.cadastros)
+            ]
+            leituras = [("GET", "/", {}) for _ in range(args.cadastros * 5)]
+            (duracao, lat_cad, erros_cad), (_, lat_get, erros_get) = await asyncio.gather(
+                disparar(cliente, cadastros, args.concorrencia),
+                disparar(cliente, leituras, 4),
+            )
+            cad = resumir(lat_cad, duracao, len(cadastros), erros_cad)
+            get = resumir(lat_get, duracao, len(leituras), erros_get)
+            print(
+                f"{workers:>7} {cad['rps']:>12.1f} {cad['p95_ms']:>12.1f} "
+                f"{get['p50_ms']:>13.2f} {get['p95_ms']:>13.2f} {erros_cad + erros_get:>6}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cadastros", type=int, default=200)
+    parser.add_argument("--concorrencia", type=int, default=32)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with preparar_ambiente_temporario():
+        asyncio.run(executar(args))
+
+
+if __name__ == "__main__":
+    main()
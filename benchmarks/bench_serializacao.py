@@ -0,0 +1,59 @@
+"""
+Benchmark: caminho normal x caminho rápido de serialização das listagens.
+
+Compara GET /manutencoes/ e GET /veiculos/ com e sem rapido=true,
+confere que as respostas são idênticas byte a byte e imprime a
+vazão e as latências de cada modo.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_serializacao --limite 1000 --requisicoes 200
+
+Requer httpx. O banco é criado em um diretório temporário.
+"""
+
+import argparse
+import asyncio
+
+from benchmarks import gerador
+from benchmarks.comum import cliente_asgi, disparar, preparar_ambiente_temporario, resumir
+
+
+async def executar(args):
+    from app.main import app
+    from app.serializacao import orjson
+
+    print(f"Frota: {gerador.gerar_frota_de_argumentos(args)}")
+    print(f"Codificador JSON: {'orjson' if orjson else 'json (biblioteca padrão)'}")
+
+    async with cliente_asgi(app) as cliente:
+        print(f"{'rota':<16} {'modo':<7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for rota in ("/manutencoes/", "/veiculos/"):
+            normal = (await cliente.get(rota, params={"limit": args.limite})).content
+            rapido = (await cliente.get(rota, params={"limit": args.limite, "rapido": "true"})).content
+            if normal != rapido:
+                raise SystemExit(f"{rota}: as respostas dos dois modos são diferentes.")
+
+            resultados = {}
+            for modo in ("normal", "rapido"):
+                url = f"{rota}?limit={args.limite}" + ("&rapido=true" if modo == "rapido" else "")
+                requisicoes = [("GET", url, {})] * args.requisicoes
+                duracao, latencias, erros = await disparar(cliente, requisicoes, args.concorrencia)
+                r = resultados[modo] = resumir(latencias, duracao, args.requisicoes, erros)
+                print(f"{rota:<16} {modo:<7} {r['rps']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+            print(f"{rota:<16} ganho   {resultados['rapido']['rps'] / resultados['normal']['rps']:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limite", type=int, default=1000, help="itens por página")
+    parser.add_argument("--requisicoes", type=int, default=200)
+    parser.add_argument("--concorrencia", type=int, default=4)
+    gerador.adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    with preparar_ambiente_temporario():
+        asyncio.run(executar(args))
+
+
+if __name__ == "__main__":
+    main()
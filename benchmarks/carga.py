@@ -0,0 +1,187 @@
+"""
+Teste de carga reprodutível de todas as rotas da API.
+
+1. Gera uma frota sintética (benchmarks/gerador.py) em um banco temporário.
+2. Para cada cenário (uma rota), dispara N requisições em processo via
+   httpx.ASGITransport, com a concorrência escolhida.
+3. Imprime vazão e latências p50/p95/p99 por rota e salva tudo em JSON,
+   para comparar execuções e detectar regressões.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.carga --requisicoes 500 --concorrencia 20 --saida base.json
+    python -m benchmarks.carga --requisicoes 500 --concorrencia 20 --comparar base.json
+
+Requer httpx. O banco é criado em um diretório temporário; com --banco,
+usa a URL informada, que precisa estar vazia (a frota sintética é gravada
+nela e as rotas de escrita a alteram). DB_PERFIL etc. são respeitadas.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+
+from benchmarks import gerador
+from benchmarks.comum import RAIZ, cliente_asgi, disparar, exigir_banco_vazio, preparar_ambiente_temporario, resumir
+
+
+def montar_cenarios(frota: dict):
+    """
+    Cenários de carga: nome -> função(aleatorio, n) que devolve a
+    requisição (método, url, kwargs) de número n.
+    """
+    u, v, m, d = frota["usuarios"], frota["veiculos"], frota["manutencoes"], frota["documentos"]
+
+    def qualquer(total):
+        return lambda a: a.randint(1, max(total, 1))
+
+    usuario, veiculo, manutencao, documento = qualquer(u), qualquer(v), qualquer(m), qualquer(d)
+
+    def ids(gerar, quantidade=50):
+        return lambda a: ",".join(str(gerar(a)) for _ in range(quantidade))
+    prefixo = f"{int(time.time())}"
+
+    return {
+        "GET /": lambda a, n: ("GET", "/", {}),
+        # Usuários
+        "GET /usuarios/": lambda a, n: ("GET", "/usuarios/?limit=50", {}),
+        "GET /usuarios/buscar": lambda a, n: ("GET", f"/usuarios/buscar?email=usuario{usuario(a)}@exemplo.com", {}),
+        "POST /usuarios/": lambda a, n: ("POST", "/usuarios/", {"json": {
+            "nome": "Carga", "email": f"carga{prefixo}_{n}@exemplo.com", "senha": "segredo123"}}),
+        # Veículos
+        "GET /veiculos/": lambda a, n: ("GET", "/veiculos/?limit=50", {}),
+        "GET /veiculos/{veiculo_id}": lambda a, n: ("GET", f"/veiculos/{veiculo(a)}", {}),
+        "GET /veiculos/lote": lambda a, n: ("GET", f"/veiculos/lote?ids={ids(veiculo)(a)}", {}),
+        "GET /veiculos/{veiculo_id}/completo": lambda a, n: ("GET", f"/veiculos/{veiculo(a)}/completo", {}),
+        "POST /veiculos/": lambda a, n: ("POST", "/veiculos/", {"json": {
+            "placa": f"C{prefixo[-5:]}{n:04d}", "modelo": "Carga", "usuario_id": usuario(a)}}),
+        "PUT /veiculos/{veiculo_id}": lambda a, n: (lambda i: ("PUT", f"/veiculos/{i}", {"json": {
+            "placa": f"BEN{i:07d}", "modelo": "Atualizado", "km_atual": a.randint(0, 300000)}}))(veiculo(a)),
+        # Manutenções
+        "GET /manutencoes/": lambda a, n: ("GET", "/manutencoes/?limit=50", {}),
+        "GET /manutencoes/{manutencao_id}": lambda a, n: ("GET", f"/manutencoes/{manutencao(a)}", {}),
+        "GET /manutencoes/lote": lambda a, n: ("GET", f"/manutencoes/lote?ids={ids(manutencao)(a)}", {}),
+        "POST /manutencoes/": lambda a, n: ("POST", "/manutencoes/", {"json": {
+            "veiculo_id": veiculo(a), "data": "2025-01-15", "km": a.randint(0, 300000),
+            "tipo_manutencao": "troca de óleo", "custo": 199.9}}),
+        "POST /manutencoes/bulk": lambda a, n: ("POST", "/manutencoes/bulk", {"json": [
+            {"veiculo_id": veiculo(a), "data": "2025-01-15", "km": a.randint(0, 300000),
+             "tipo_manutencao": "alinhamento", "custo": 120.0} for _ in range(20)]}),
+        # Planos
+        "GET /planos/": lambda a, n: ("GET", "/planos/?limit=50", {}),
+        "GET /planos/veiculo/{veiculo_id}": lambda a, n: ("GET", f"/planos/veiculo/{veiculo(a)}", {}),
+        "GET /planos/lote": lambda a, n: ("GET", f"/planos/lote?ids={ids(qualquer(frota['planos']))(a)}", {}),
+        "GET /planos/vencidos": lambda a, n: ("GET", f"/planos/vencidos?margem_km=1000&usuario_id={usuario(a)}", {}),
+        "POST /planos/": lambda a, n: ("POST", "/planos/", {"json": {
+            "veiculo_id": veiculo(a), "nome_plano": "filtro de ar", "km_referencia": 15000}}),
+        # Custos
+        "GET /custos/veiculos/{veiculo_id}": lambda a, n: ("GET", f"/custos/veiculos/{veiculo(a)}", {}),
+        "GET /custos/usuarios/{usuario_id}": lambda a, n: ("GET", f"/custos/usuarios/{usuario(a)}", {}),
+        "GET /custos/mensal": lambda a, n: ("GET", f"/custos/mensal?usuario_id={usuario(a)}", {}),
+        "GET /custos/tipos": lambda a, n: ("GET", f"/custos/tipos?veiculo_id={veiculo(a)}", {}),
+        # Documentos
+        "GET /documentos/{documento_id}": lambda a, n: ("GET", f"/documentos/{documento(a)}", {}),
+        "POST /documentos/": lambda a, n: ("POST", f"/documentos/?manutencao_id={manutencao(a)}&nome_arquivo=nota.pdf", {
+            "content": os.urandom(16 * 1024), "headers": {"content-type": "application/pdf"}}),
+    }
+
+
+def _commit_atual() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+async def executar(args) -> dict:
+    from app.main import app
+
+    exigir_banco_vazio()
+    inicio_geracao = time.perf_counter()
+    frota = gerador.gerar_frota_de_argumentos(args)
+    geracao_s = time.perf_counter() - inicio_geracao
+    print(f"Frota gerada em {geracao_s:.1f}s: {frota}")
+
+    cenarios = montar_cenarios(frota)
+    if args.filtro:
+        cenarios = {nome: f for nome, f in cenarios.items() if args.filtro in nome}
+
+    aleatorio = random.Random(args.semente)
+    resultados = {}
+    async with cliente_asgi(app, timeout=120) as cliente:
+        print(f"{'rota':<40} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erros':>6}")
+        for nome, cenario in cenarios.items():
+            requisicoes = [cenario(aleatorio, n) for n in range(args.requisicoes)]
+            duracao, latencias, erros = await disparar(cliente, requisicoes, args.concorrencia)
+            r = resultados[nome] = resumir(latencias, duracao, len(requisicoes), erros)
+            print(f"{nome:<40} {r['rps']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['erros']:>6}")
+
+    return {
+        "meta": {
+            "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _commit_atual(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "db_perfil": os.getenv("DB_PERFIL", "padrao"),
+            "requisicoes": args.requisicoes,
+            "concorrencia": args.concorrencia,
+            "frota": frota,
+            "geracao_s": round(geracao_s, 2),
+        },
+        "rotas": resultados,
+    }
+
+
+def comparar(atual: dict, base: dict, tolerancia: float):
+    """Imprime a variação de p95 e vazão em relação a uma execução anterior."""
+    print(f"\nComparação com {base['meta'].get('commit')} ({base['meta'].get('data')}):")
+    print(f"{'rota':<40} {'p95 base':>9} {'p95 atual':>9} {'Δ p95':>8} {'Δ req/s':>8}")
+    regressoes = []
+    for nome, r in atual["rotas"].items():
+        anterior = base["rotas"].get(nome)
+        if not anterior or not anterior["p95_ms"] or not anterior["rps"]:
+            continue
+        delta_p95 = (r["p95_ms"] - anterior["p95_ms"]) / anterior["p95_ms"]
+        delta_rps = (r["rps"] - anterior["rps"]) / anterior["rps"]
+        marca = ""
+        if delta_p95 > tolerancia:
+            marca = "  <-- regressão"
+            regressoes.append(nome)
+        print(f"{nome:<40} {anterior['p95_ms']:>9.2f} {r['p95_ms']:>9.2f} {delta_p95:>+8.0%} {delta_rps:>+8.0%}{marca}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=300, help="requisições por rota")
+    parser.add_argument("--concorrencia", type=int, default=20)
+    parser.add_argument("--filtro", help="executa só as rotas cujo nome contém este texto")
+    parser.add_argument("--saida", help="arquivo JSON onde salvar os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--banco", help="URL de um banco vazio a usar no lugar do temporário")
+    parser.add_argument("--tolerancia", type=float, default=0.10, help="aumento de p95 aceito (0.10 = 10%%)")
+    gerador.adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    with preparar_ambiente_temporario(args.banco):
+        resultado = asyncio.run(executar(args))
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+        print(f"\nResultados salvos em {args.saida}")
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultado, json.load(arquivo), args.tolerancia)
+        if regressoes:
+            raise SystemExit(f"{len(regressoes)} rota(s) com regressão de p95 acima de {args.tolerancia:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
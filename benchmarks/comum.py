@@ -0,0 +1,104 @@
+"""
+Utilitários compartilhados pelos benchmarks.
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+
+def preparar_ambiente_temporario(banco: str = None) -> tempfile.TemporaryDirectory:
+    """
+    Aponta o banco, o armazenamento de documentos e os relatórios para um
+    diretório temporário, ignorando o que estiver definido no ambiente:
+    um benchmark nunca altera um banco que não criou. Deve ser chamado
+    antes de importar qualquer módulo de app.
+    banco: URL de outro banco, escolhida explicitamente (ex.: --banco);
+    precisa estar vazio (ver exigir_banco_vazio).
+    """
+    diretorio = tempfile.TemporaryDirectory(prefix="bench_")
+    os.environ["DATABASE_URL"] = banco or f"sqlite:///{os.path.join(diretorio.name, 'bench.db')}"
+    os.environ["DOCUMENTOS_DIR"] = os.path.join(diretorio.name, "documentos")
+    os.environ["RELATORIOS_DIR"] = os.path.join(diretorio.name, "relatorios")
+    os.environ.pop("ARQUIVO_DB", None)
+    return diretorio
+
+
+def exigir_banco_vazio():
+    """Encerra o benchmark se o banco configurado já tiver usuários (não é um banco de teste)."""
+    from sqlalchemy import inspect, select
+
+    from app import models
+    from app.database import get_engine
+
+    engine = get_engine()
+    if not inspect(engine).has_table(models.Usuario.__tablename__):
+        return
+    with engine.connect() as conexao:
+        if conexao.execute(select(models.Usuario.id).limit(1)).first() is not None:
+            raise SystemExit(f"O banco {engine.url!r} já tem dados; use um banco vazio.")
+
+
+def percentil(valores, p: float) -> float:
+    """Percentil p (0 a 1) pelo método do valor mais próximo."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def resumir(latencias, duracao: float, requisicoes: int, erros: int) -> dict:
+    """Métricas de um cenário: vazão e latências em milissegundos."""
+    return {
+        "requisicoes": requisicoes,
+        "erros": erros,
+        "rps": round(requisicoes / duracao, 1) if duracao else 0.0,
+        "media_ms": round(statistics.fmean(latencias) * 1000, 3) if latencias else 0.0,
+        "p50_ms": round(percentil(latencias, 0.50) * 1000, 3),
+        "p95_ms": round(percentil(latencias, 0.95) * 1000, 3),
+        "p99_ms": round(percentil(latencias, 0.99) * 1000, 3),
+    }
+
+
+async def disparar(cliente, requisicoes, concorrencia: int):
+    """
+    Executa as requisições (tuplas método, url, kwargs) com no máximo
+    `concorrencia` em voo. Retorna (duração, latências, erros).
+    """
+    semaforo = asyncio.Semaphore(concorrencia)
+    latencias = []
+
+    async def uma(metodo, url, kwargs):
+        async with semaforo:
+            inicio = time.perf_counter()
+            resposta = await cliente.request(metodo, url, **kwargs)
+            latencias.append(time.perf_counter() - inicio)
+            if resposta.status_code >= 400:
+                raise RuntimeError(f"{metodo} {url}: HTTP {resposta.status_code}")
+
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(*(uma(*r) for r in requisicoes), return_exceptions=True)
+    erros = sum(1 for r in resultados if isinstance(r, Exception))
+    return time.perf_counter() - inicio, latencias, erros
+
+
+@asynccontextmanager
+async def cliente_asgi(app, **opcoes):
+    """
+    Cliente httpx ligado ao app em processo, com o lifespan do app
+    (inicialização e encerramento) executado em volta.
+    """
+    import httpx
+
+    async with app.router.lifespan_context(app):
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://bench", **opcoes) as cliente:
+            yield cliente
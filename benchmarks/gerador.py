@@ -0,0 +1,139 @@
+"""
+Gerador de frota sintética para benchmarks.
+
+Popula o banco configurado em app.database com usuários, veículos,
+manutenções, documentos e planos usando INSERTs em lote (executemany),
+de forma reprodutível (mesma semente = mesmos dados).
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.gerador --usuarios 1000 --veiculos-por-usuario 5 --manutencoes-por-veiculo 20
+"""
+
+import argparse
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+TIPOS_MANUTENCAO = [
+    "troca de óleo", "pastilha de freio", "alinhamento", "balanceamento",
+    "filtro de ar", "correia dentada", "pneus", "revisão geral",
+]
+PRESTADORES = ["Oficina Central", "Auto Center Sul", "Concessionária", "Mecânica do Bairro"]
+MODELOS = [("Onix", "Chevrolet"), ("HB20", "Hyundai"), ("Gol", "Volkswagen"), ("Strada", "Fiat"), ("Corolla", "Toyota")]
+LOTE = 5000
+
+
+def _inserir(conexao, modelo, linhas):
+    """Insere as linhas em blocos de LOTE registros."""
+    for inicio in range(0, len(linhas), LOTE):
+        conexao.execute(insert(modelo), linhas[inicio:inicio + LOTE])
+
+
+def gerar_frota(bind=None, usuarios=100, veiculos_por_usuario=3, manutencoes_por_veiculo=10,
+                documentos_por_manutencao=1, planos_por_veiculo=2, semente=42) -> dict:
+    """
+    Gera a frota sintética no banco e retorna as quantidades criadas.
+    Os ids são atribuídos explicitamente a partir do maior id existente.
+    """
+    from app import models, resumos
+    from app.database import get_engine
+    from app.esquema import criar_esquema
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import Session
+
+    bind = bind or get_engine()
+    criar_esquema(bind)
+    aleatorio = random.Random(semente)
+    hoje = date.today()
+
+    with bind.begin() as conexao:
+        def proximo_id(modelo):
+            return (conexao.execute(select(func.max(modelo.id))).scalar() or 0) + 1
+
+        id_usuario = proximo_id(models.Usuario)
+        id_veiculo = proximo_id(models.Veiculo)
+        id_manutencao = proximo_id(models.Manutencao)
+
+        linhas_usuarios, linhas_veiculos, linhas_manutencoes = [], [], []
+        linhas_documentos, linhas_planos = [], []
+        for u in range(id_usuario, id_usuario + usuarios):
+            linhas_usuarios.append({
+                "id": u, "nome": f"Usuário {u}", "email": f"usuario{u}@exemplo.com", "senha_hash": "x",
+            })
+            for _ in range(veiculos_por_usuario):
+                modelo, marca = aleatorio.choice(MODELOS)
+                km = 0
+                dia = hoje - timedelta(days=365 * 5)
+                for _ in range(manutencoes_por_veiculo):
+                    km += aleatorio.randint(3000, 12000)
+                    dia += timedelta(days=aleatorio.randint(20, 120))
+                    linhas_manutencoes.append({
+                        "id": id_manutencao, "veiculo_id": id_veiculo, "data": dia, "km": km,
+                        "tipo_manutencao": aleatorio.choice(TIPOS_MANUTENCAO),
+                        "descricao": "Serviço gerado para benchmark",
+                        "custo": round(aleatorio.uniform(80, 2500), 2),
+                        "prestador_servico": aleatorio.choice(PRESTADORES),
+                    })
+                    for d in range(documentos_por_manutencao):
+                        linhas_documentos.append({
+                            "manutencao_id": id_manutencao, "nome_arquivo": f"nota_{id_manutencao}_{d}.pdf",
+                            "tipo": "application/pdf",
+                        })
+                    id_manutencao += 1
+                for tipo in aleatorio.sample(TIPOS_MANUTENCAO, planos_por_veiculo):
+                    linhas_planos.append({
+                        "veiculo_id": id_veiculo, "nome_plano": tipo,
+                        "km_referencia": aleatorio.choice([5000, 10000, 20000, 40000]),
+                    })
+                linhas_veiculos.append({
+                    "id": id_veiculo, "placa": f"BEN{id_veiculo:07d}", "modelo": modelo, "marca": marca,
+                    "ano": aleatorio.randint(2010, 2025), "km_atual": km + aleatorio.randint(0, 15000),
+                    "usuario_id": u,
+                })
+                id_veiculo += 1
+
+        _inserir(conexao, models.Usuario, linhas_usuarios)
+        _inserir(conexao, models.Veiculo, linhas_veiculos)
+        _inserir(conexao, models.Manutencao, linhas_manutencoes)
+        _inserir(conexao, models.Documento, linhas_documentos)
+        _inserir(conexao, models.PlanoManutencao, linhas_planos)
+
+    # Tabelas derivadas não são atualizadas por INSERTs diretos
+    with Session(bind) as sessao:
+        resumos.reconstruir(sessao)
+
+    return {
+        "usuarios": len(linhas_usuarios),
+        "veiculos": len(linhas_veiculos),
+        "manutencoes": len(linhas_manutencoes),
+        "documentos": len(linhas_documentos),
+        "planos": len(linhas_planos),
+    }
+
+
+def adicionar_argumentos(parser):
+    """Argumentos de tamanho da frota, compartilhados pelos benchmarks."""
+    parser.add_argument("--usuarios", type=int, default=100)
+    parser.add_argument("--veiculos-por-usuario", type=int, default=3)
+    parser.add_argument("--manutencoes-por-veiculo", type=int, default=10)
+    parser.add_argument("--documentos-por-manutencao", type=int, default=1)
+    parser.add_argument("--planos-por-veiculo", type=int, default=2)
+    parser.add_argument("--semente", type=int, default=42)
+
+
+def gerar_frota_de_argumentos(args) -> dict:
+    return gerar_frota(
+        usuarios=args.usuarios,
+        veiculos_por_usuario=args.veiculos_por_usuario,
+        manutencoes_por_veiculo=args.manutencoes_por_veiculo,
+        documentos_por_manutencao=args.documentos_por_manutencao,
+        planos_por_veiculo=args.planos_por_veiculo,
+        semente=args.semente,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    adicionar_argumentos(parser)
+    print(gerar_frota_de_argumentos(parser.parse_args()))
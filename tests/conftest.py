@@ -0,0 +1,75 @@
+"""
+Fixtures compartilhadas pelos testes.
+
+Cada teste recebe um banco SQLite próprio em tmp_path, com o esquema
+aplicado por garantir_esquema. DATABASE_URL e os diretórios de arquivos
+apontam para um diretório temporário antes de qualquer import de app:
+os testes nunca tocam o banco configurado no ambiente.
+"""
+
+import os
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+_diretorio = tempfile.TemporaryDirectory(prefix="testes_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_diretorio.name, 'padrao.db')}"
+os.environ["DOCUMENTOS_DIR"] = os.path.join(_diretorio.name, "documentos")
+os.environ["RELATORIOS_DIR"] = os.path.join(_diretorio.name, "relatorios")
+os.environ.pop("ARQUIVO_DB", None)
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+
+from app import arquivamento, database  # noqa: E402
+from app.esquema import garantir_esquema  # noqa: E402
+
+
+def criar_engine(caminho):
+    """Engine de teste com os mesmos PRAGMAs e o mesmo ATTACH do engine da aplicação."""
+    engine = create_engine(f"sqlite:///{caminho}")
+    database._registrar_pragmas(engine)
+    database._registrar_arquivo(engine)
+    return engine
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Banco vazio com o esquema atual."""
+    engine = criar_engine(tmp_path / "teste.db")
+    garantir_esquema(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def com_arquivo(tmp_path, monkeypatch):
+    """Ativa o banco de arquivo (ARQUIVO_DB) para os engines criados depois."""
+    caminho = str(tmp_path / "arquivo.db")
+    monkeypatch.setattr(database, "ARQUIVO_DB", caminho)
+    monkeypatch.setattr(arquivamento, "ARQUIVO_DB", caminho)
+    return caminho
+
+
+class ContadorConsultas:
+    """Conta os comandos SQL executados no engine enquanto ativo (with)."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.comandos = []
+
+    def _registrar(self, conexao, cursor, comando, parametros, contexto, executemany):
+        self.comandos.append(comando)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._registrar)
+        return self
+
+    def __exit__(self, *erro):
+        event.remove(self.engine, "before_cursor_execute", self._registrar)
+
+    def __len__(self):
+        return len(self.comandos)
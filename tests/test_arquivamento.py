@@ -0,0 +1,112 @@
+"""
+Páginas de manutenções com o arquivo ativo (arquivamento.completar_pagina):
+o arquivo só é consultado quando o intervalo da página alcança registros
+arquivados, e um arquivamento feito por outro processo é percebido.
+Documentos enviados durante o arquivamento (arquivar_lote) não se perdem.
+"""
+
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import arquivamento, crud, models
+from app.esquema import garantir_esquema
+from tests.conftest import ContadorConsultas, criar_engine
+
+MANUTENCOES = 40
+
+
+def semear(engine):
+    with Session(engine) as db:
+        usuario = models.Usuario(nome="Dono", email="arquivo@exemplo.com", senha_hash="x")
+        veiculo = models.Veiculo(placa="ARQ0001", modelo="Teste", usuario=usuario)
+        db.add_all(
+            models.Manutencao(veiculo=veiculo, data=date(2015, 1, 1) + timedelta(days=30 * n), km=n, custo=10.0)
+            for n in range(MANUTENCOES)
+        )
+        db.commit()
+
+
+def consultas_ao_arquivo(engine, apos_id: int, limite: int = 10):
+    with Session(engine) as db, ContadorConsultas(engine) as contador:
+        pagina = crud.listar_manutencoes(db, apos_id, limite)
+    return [m.id for m in pagina], [c for c in contador.comandos if "arquivo." in c]
+
+
+def test_pagina_so_consulta_arquivo_quando_necessario(com_arquivo, tmp_path, monkeypatch):
+    # Os arquivos acabaram de ser gravados: aceita assinaturas recentes
+    monkeypatch.setattr(arquivamento, "MARGEM_ASSINATURA_NS", 0)
+    engine = criar_engine(tmp_path / "teste.db")
+    garantir_esquema(engine)
+    semear(engine)
+    # As 10 primeiras manutenções (ids 1 a 10) vão para o arquivo
+    assert arquivamento.arquivar(date(2015, 1, 1) + timedelta(days=300), 4, 0, sessionmaker(engine)) == 10
+
+    ids, comandos = consultas_ao_arquivo(engine, 0)
+    assert ids == list(range(1, 11))
+    assert comandos  # página dentro do intervalo arquivado
+
+    consultas_ao_arquivo(engine, 20)  # lê (e guarda) o maior id arquivado
+    ids, comandos = consultas_ao_arquivo(engine, 20)
+    assert ids == list(range(21, 31))
+    assert comandos == []
+
+    # Outro processo arquiva um registro com id acima da página
+    time.sleep(0.05)  # depois de um tique do relógio do sistema de arquivos
+    with engine.begin() as conexao:
+        conexao.execute(insert(arquivamento.ManutencaoArquivada).values(
+            id=1000, veiculo_id=1, data=date(2016, 1, 1), km=0, custo=1.0,
+        ))
+    ids, comandos = consultas_ao_arquivo(engine, 35)
+    assert ids == [36, 37, 38, 39, 40, 1000]
+    assert comandos
+    engine.dispose()
+
+
+def test_assinatura_recente_nao_e_reaproveitada(com_arquivo, tmp_path):
+    engine = criar_engine(tmp_path / "teste.db")
+    garantir_esquema(engine)
+    semear(engine)
+    arquivamento.arquivar(date(2015, 6, 1), 4, 0, sessionmaker(engine))
+
+    consultas_ao_arquivo(engine, 20)
+    _, comandos = consultas_ao_arquivo(engine, 20)
+    assert comandos  # arquivo gravado agora: o maior id é relido
+    engine.dispose()
+
+
+def test_documento_enviado_durante_o_arquivamento_nao_se_perde(com_arquivo, tmp_path):
+    engine = criar_engine(tmp_path / "teste.db")
+    garantir_esquema(engine)
+    semear(engine)
+    with Session(engine) as db:
+        db.add(models.Documento(manutencao_id=1, nome_arquivo="antigo.pdf"))
+        db.commit()
+
+    class SessaoComEnvio(Session):
+        """Um documento chega entre o commit da cópia e a exclusão."""
+        commits = 0
+
+        def commit(self):
+            super().commit()
+            SessaoComEnvio.commits += 1
+            if SessaoComEnvio.commits == 1:
+                with Session(engine) as outra:
+                    outra.add(models.Documento(manutencao_id=1, nome_arquivo="novo.pdf"))
+                    outra.commit()
+
+    with SessaoComEnvio(engine) as db:
+        assert arquivamento.arquivar_lote(db, [1, 2]) == 1  # a manutenção 1 fica para o próximo lote
+    with Session(engine) as db:
+        restantes = db.query(models.Documento.nome_arquivo).all()
+        assert [nome for (nome,) in restantes] == ["novo.pdf"]
+        assert db.get(models.Manutencao, 1) is not None
+
+    assert arquivamento.arquivar(date(2015, 2, 1), 10, 0, sessionmaker(engine)) == 1
+    with Session(engine) as db:
+        arquivados = db.execute(arquivamento.DocumentoArquivado.select()).all()
+        assert sorted(d.nome_arquivo for d in arquivados) == ["antigo.pdf", "novo.pdf"]
+        assert db.query(models.Documento).count() == 0
+    engine.dispose()
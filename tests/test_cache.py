@@ -0,0 +1,49 @@
+"""
+Cache de veículos (crud.obter_veiculo): uma invalidação concorrente
+entre o SELECT e o definir não pode devolver o valor antigo ao cache.
+"""
+
+from sqlalchemy.orm import Session
+
+from app import crud, exclusao, models
+from app.cache import AUSENTE, CacheLRU, cache_veiculos
+
+
+def test_definir_descarta_valor_lido_antes_de_invalidacao():
+    cache = CacheLRU("teste")
+    geracao = cache.geracao
+    cache.invalidar(1)  # commit concorrente entre a leitura e o definir
+    cache.definir(1, "antigo", geracao)
+    assert cache.obter(1) is AUSENTE
+
+    cache.definir(1, "atual", cache.geracao)
+    assert cache.obter(1) == "atual"
+
+
+def test_obter_veiculo_nao_recoloca_veiculo_excluido(engine, monkeypatch):
+    with Session(engine) as db:
+        usuario = models.Usuario(nome="Dono", email="dono@exemplo.com", senha_hash="x")
+        db.add(models.Veiculo(placa="CCH0001", modelo="Teste", usuario=usuario))
+        db.commit()
+        veiculo_id = db.scalar(models.Veiculo.__table__.select().with_only_columns(models.Veiculo.id))
+    cache_veiculos.limpar()
+
+    buscar = crud.buscar_veiculo_por_id
+
+    def buscar_e_excluir(db, veiculo_id):
+        # Outra requisição exclui o veículo logo depois do SELECT desta
+        encontrado = buscar(db, veiculo_id)
+        with Session(engine) as outra:
+            exclusao.excluir_veiculos(outra, [veiculo_id])
+            outra.commit()
+        exclusao.invalidar_cache([veiculo_id])
+        return encontrado
+
+    monkeypatch.setattr(crud, "buscar_veiculo_por_id", buscar_e_excluir)
+    with Session(engine) as db:
+        assert crud.obter_veiculo(db, veiculo_id) is not None
+    monkeypatch.setattr(crud, "buscar_veiculo_por_id", buscar)
+
+    assert cache_veiculos.obter(veiculo_id) is AUSENTE
+    with Session(engine) as db:
+        assert crud.obter_veiculo(db, veiculo_id) is None
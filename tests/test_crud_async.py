@@ -0,0 +1,67 @@
+"""
+Cadastros por crud_async: mesmos efeitos da inserção (versões, resumo
+de custos e leituras de odômetro) que os de crud.py.
+"""
+
+import asyncio
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import crud, crud_async, database, models, schemas
+from app.esquema import garantir_esquema
+from tests.conftest import criar_engine
+
+USUARIO = schemas.UsuarioCreate(nome="Dono", email="efeitos@exemplo.com", senha="s3nh@")
+VEICULO = schemas.VeiculoCreate(placa="EFE0001", modelo="Teste", km_atual=1000, usuario_id=1)
+MANUTENCOES = [
+    schemas.ManutencaoCreate(veiculo_id=1, data=date(2024, 3, 5), km=1500, tipo_manutencao="Óleo", custo=120.0),
+    schemas.ManutencaoCreate(veiculo_id=1, data=date(2024, 3, 20), km=1800, tipo_manutencao="Óleo", custo=80.0),
+]
+PLANO = schemas.PlanoManutencaoCreate(veiculo_id=1, nome_plano="Revisão", km_referencia=10000)
+
+
+def efeitos(engine) -> dict:
+    with Session(engine) as db:
+        return {
+            "versoes": db.execute(select(models.VersaoDados.chave, models.VersaoDados.versao)
+                                  .order_by(models.VersaoDados.chave)).all(),
+            "resumo": db.execute(select(models.ResumoCusto.veiculo_id, models.ResumoCusto.mes,
+                                        models.ResumoCusto.tipo_manutencao, models.ResumoCusto.total,
+                                        models.ResumoCusto.quantidade)).all(),
+            "odometro": db.execute(select(models.LeituraOdometro.veiculo_id, models.LeituraOdometro.km,
+                                          models.LeituraOdometro.origem)
+                                   .order_by(models.LeituraOdometro.id)).all(),
+        }
+
+
+def test_mesmos_efeitos_da_insercao(tmp_path):
+    sincrono = criar_engine(tmp_path / "sincrono.db")
+    garantir_esquema(sincrono)
+    with Session(sincrono) as db:
+        crud.criar_usuario(db, USUARIO, "x")
+        crud.criar_veiculo(db, VEICULO)
+        for manutencao in MANUTENCOES:
+            crud.criar_manutencao(db, manutencao)
+        crud.criar_plano(db, PLANO)
+
+    caminho = tmp_path / "assincrono.db"
+    garantir_esquema(criar_engine(caminho))
+    assincrono = create_async_engine(f"sqlite+aiosqlite:///{caminho}")
+    database._registrar_pragmas(assincrono.sync_engine)
+
+    async def cadastrar():
+        async with AsyncSession(assincrono, expire_on_commit=False) as db:
+            await crud_async.criar_usuario(db, USUARIO, "x")
+            await crud_async.criar_veiculo(db, VEICULO)
+            for manutencao in MANUTENCOES:
+                await crud_async.criar_manutencao(db, manutencao)
+            await crud_async.criar_plano(db, PLANO)
+        await assincrono.dispose()
+
+    asyncio.run(cadastrar())
+    esperados = efeitos(sincrono)
+    assert esperados["resumo"] and len(esperados["odometro"]) == 3
+    assert efeitos(criar_engine(caminho)) == esperados
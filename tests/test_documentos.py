@@ -0,0 +1,112 @@
+"""
+Upload e download de documentos: uploads vazios não deixam arquivos no
+armazenamento, e o cabeçalho Range segue a RFC 9110 (Range malformado é
+ignorado; só intervalos fora do arquivo recebem 416). Arquivos sem
+documento (upload que falhou, exclusão em cascata) não ficam no disco.
+"""
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import armazenamento
+from app.armazenamento import IntervaloInvalido, interpretar_range
+
+
+@pytest.mark.parametrize("cabecalho, esperado", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=90-", (90, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=-500", (0, 99)),
+    ("bytes=95-200", (95, 99)),
+    (None, None),
+    ("bytes=5-2", None),       # último byte antes do primeiro: malformado
+    ("bytes=a-b", None),
+    ("bytes=--5", None),
+    ("bytes=-", None),
+    ("bytes=0-1,5-6", None),
+    ("items=0-1", None),
+])
+def test_interpretar_range(cabecalho, esperado):
+    assert interpretar_range(cabecalho, 100) == esperado
+
+
+@pytest.mark.parametrize("cabecalho", ["bytes=100-", "bytes=150-200", "bytes=-0"])
+def test_interpretar_range_insatisfativel(cabecalho):
+    with pytest.raises(IntervaloInvalido):
+        interpretar_range(cabecalho, 100)
+
+
+def arquivos_armazenados() -> list:
+    return [
+        os.path.join(raiz, nome)
+        for raiz, _, nomes in os.walk(armazenamento.DOCUMENTOS_DIR) for nome in nomes
+    ]
+
+
+def test_upload_vazio_e_range():
+    from app.main import app
+
+    with TestClient(app) as cliente:
+        usuario = cliente.post("/usuarios/", json={"nome": "Dono", "email": "docs@exemplo.com", "senha": "s3nh@"}).json()
+        veiculo = cliente.post("/veiculos/", json={"placa": "DOC0001", "modelo": "Teste", "usuario_id": usuario["id"]}).json()
+        manutencao = cliente.post("/manutencoes/", json={"veiculo_id": veiculo["id"], "data": "2024-01-10"}).json()
+        parametros = {"manutencao_id": manutencao["id"], "nome_arquivo": "nota.txt"}
+        antes = arquivos_armazenados()
+
+        resposta = cliente.post("/documentos/", params=parametros, content=b"")
+        assert resposta.status_code == 400
+        assert arquivos_armazenados() == antes
+
+        documento = cliente.post("/documentos/", params=parametros, content=b"0123456789").json()
+        url = f"/documentos/{documento['id']}/arquivo"
+        invalido = cliente.get(url, headers={"Range": "bytes=5-2"})
+        assert (invalido.status_code, invalido.content) == (200, b"0123456789")
+        parcial = cliente.get(url, headers={"Range": "bytes=2-4"})
+        assert (parcial.status_code, parcial.content) == (206, b"234")
+        assert cliente.get(url, headers={"Range": "bytes=20-"}).status_code == 416
+
+
+def test_documento_nao_criado_nao_deixa_arquivo(monkeypatch):
+    from app import crud, models
+    from app.main import app
+
+    # A manutenção some entre a verificação da rota e o INSERT do documento
+    monkeypatch.setattr(crud, "buscar_manutencao_por_id", lambda db, manutencao_id: models.Manutencao())
+    with TestClient(app) as cliente:
+        antes = arquivos_armazenados()
+        resposta = cliente.post("/documentos/", params={"manutencao_id": 999999, "nome_arquivo": "nota.txt"},
+                                content=b"conteudo sem documento")
+        assert (resposta.status_code, resposta.json()["detail"]) == (404, "Manutenção não encontrada.")
+        assert arquivos_armazenados() == antes
+
+
+def test_varredura_apaga_so_arquivos_sem_documento():
+    from app import exclusao
+    from app.database import SessionLocal
+    from app.main import app
+
+    with TestClient(app) as cliente:
+        usuario = cliente.post("/usuarios/", json={"nome": "Dono", "email": "varredura@exemplo.com", "senha": "s3nh@"}).json()
+        veiculo = cliente.post("/veiculos/", json={"placa": "VAR0001", "modelo": "Teste", "usuario_id": usuario["id"]}).json()
+        manutencoes = [
+            cliente.post("/manutencoes/", json={"veiculo_id": veiculo["id"], "data": "2024-01-10"}).json()["id"]
+            for _ in range(2)
+        ]
+        documentos = [
+            cliente.post("/documentos/", params={"manutencao_id": m, "nome_arquivo": "nota.txt"},
+                         content=conteudo).json()
+            for m, conteudo in zip(manutencoes, [b"apagado com a manutencao", b"continua em uso"])
+        ]
+        excluida = cliente.delete("/manutencoes/lote", params={"ids": manutencoes[0]})
+        assert excluida.status_code == 200
+
+    orfao = armazenamento.caminho_absoluto(documentos[0]["caminho_arquivo"])
+    em_uso = armazenamento.caminho_absoluto(documentos[1]["caminho_arquivo"])
+    with SessionLocal() as db:
+        assert exclusao.limpar_arquivos_orfaos(db, idade_s=3600) == 0  # ainda recente
+        assert os.path.exists(orfao)
+        assert exclusao.limpar_arquivos_orfaos(db, idade_s=-1) >= 1
+    assert not os.path.exists(orfao)
+    assert os.path.exists(em_uso)
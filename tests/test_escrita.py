@@ -0,0 +1,35 @@
+"""
+Cadastros (POST): violações de integridade que escapam das verificações
+da rota viram 400/404, com ou sem o escritor agrupado (escrita.py).
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import crud, escrita
+
+
+@pytest.mark.parametrize("agrupada", [False, True])
+def test_cadastros_com_erro_de_integridade(agrupada, monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(escrita, "ESCRITA_AGRUPADA", agrupada)
+    sufixo = "G" if agrupada else "D"
+    with TestClient(app) as cliente:
+        assert (escrita.escritor is not None) == agrupada
+        usuario = cliente.post(
+            "/usuarios/", json={"nome": "Dono", "email": f"integridade{sufixo}@exemplo.com", "senha": "s3nh@"}
+        ).json()
+        veiculo = {"placa": f"INT000{sufixo}", "modelo": "Teste", "usuario_id": usuario["id"]}
+        assert cliente.post("/veiculos/", json=veiculo).status_code == 201
+
+        repetido = cliente.post("/veiculos/", json=veiculo)
+        assert (repetido.status_code, repetido.json()["detail"]) == (400, "Placa já cadastrada.")
+
+        # O veículo some entre a verificação da rota e o commit
+        monkeypatch.setattr(crud, "buscar_veiculo_por_id", lambda db, veiculo_id: object())
+        manutencao = cliente.post("/manutencoes/", json={"veiculo_id": 999999, "data": "2024-01-10"})
+        assert (manutencao.status_code, manutencao.json()["detail"]) == (404, "Veículo não encontrado.")
+        plano = cliente.post("/planos/", json={"veiculo_id": 999999, "nome_plano": "Revisão", "km_referencia": 10000})
+        assert (plano.status_code, plano.json()["detail"]) == (404, "Veículo não encontrado.")
+    assert escrita.escritor is None
@@ -0,0 +1,47 @@
+"""
+Exclusão da frota (crud.excluir_frota): frotas maiores que um bloco
+são apagadas com cláusulas IN limitadas e em várias transações.
+"""
+
+from datetime import date
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app import crud, exclusao, models
+from tests.conftest import ContadorConsultas
+
+VEICULOS = 2 * exclusao.BLOCO_IN + 50
+
+
+def test_frota_grande_em_blocos(engine):
+    with Session(engine) as db:
+        usuario = models.Usuario(nome="Dono", email="frota@exemplo.com", senha_hash="x")
+        outro = models.Veiculo(placa="OUT0001", modelo="Teste", usuario=models.Usuario(
+            nome="Outro", email="outro@exemplo.com", senha_hash="x"))
+        db.add(outro)
+        for n in range(VEICULOS):
+            veiculo = models.Veiculo(placa=f"FRT{n:04d}", modelo="Teste", usuario=usuario)
+            db.add(models.Manutencao(veiculo=veiculo, data=date(2024, 1, 1), km=n, custo=1.0))
+        db.commit()
+        usuario_id = usuario.id
+
+    commits = []
+
+    def contar_commit(conexao):
+        commits.append(conexao)
+
+    event.listen(engine, "commit", contar_commit)
+    with Session(engine) as db, ContadorConsultas(engine) as contador:
+        excluidos, contagem = crud.excluir_frota(db, usuario_id)
+    event.remove(engine, "commit", contar_commit)
+
+    assert len(excluidos) == VEICULOS
+    assert contagem["veiculos"] == VEICULOS
+    assert contagem["manutencoes"] == VEICULOS
+    assert len(commits) == 3
+    assert max(comando.count("?") for comando in contador.comandos) <= exclusao.BLOCO_IN
+
+    with Session(engine) as db:
+        assert db.scalar(select(func.count()).select_from(models.Veiculo)) == 1
+        assert db.scalar(select(func.count()).select_from(models.Manutencao)) == 0
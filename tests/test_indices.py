@@ -0,0 +1,59 @@
+"""
+Índices dos caminhos de acesso principais (esquema.CONSULTAS_PRINCIPAIS):
+o plano de cada consulta precisa usar um índice, e garantir_esquema
+precisa criá-los também em bancos antigos, cujas tabelas já existem.
+"""
+
+import re
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import Base
+from app.esquema import CONSULTAS_PRINCIPAIS, explicar_consultas, garantir_esquema
+from tests.conftest import criar_engine
+
+
+def conferir_plano(nome: str, detalhes: list):
+    plano = "; ".join(detalhes)
+    if "VIRTUAL TABLE" in plano:
+        # FTS5: o MATCH é resolvido pelo índice invertido (restrição "M" em idxStr)
+        assert re.search(r"VIRTUAL TABLE INDEX \d+:M", plano), f"{nome}: {plano}"
+        return
+    assert re.search(r"USING (INDEX ix_|COVERING INDEX )", plano), f"{nome}: {plano}"
+    assert not re.search(r"\bSCAN (?!.*VIRTUAL)", plano), f"{nome}: {plano}"
+
+
+@pytest.mark.parametrize("nome", CONSULTAS_PRINCIPAIS)
+def test_consultas_principais_usam_indice(engine, nome):
+    conferir_plano(nome, explicar_consultas(engine)[nome])
+
+
+def test_garantir_esquema_cria_indices_em_banco_antigo(tmp_path):
+    engine = criar_engine(tmp_path / "antigo.db")
+    # Banco de uma versão anterior: tabelas sem os índices
+    Base.metadata.create_all(engine)
+    with engine.begin() as conexao:
+        for tabela in Base.metadata.sorted_tables:
+            for indice in tabela.indexes:
+                indice.drop(conexao)
+    with Session(engine) as sessao:
+        sessao.merge(models.EsquemaVersao(id=1, versao="versao-antiga"))
+        sessao.commit()
+    esperados = {indice.name for tabela in Base.metadata.sorted_tables for indice in tabela.indexes}
+
+    def existentes():
+        inspetor = inspect(engine)
+        return {i["name"] for tabela in inspetor.get_table_names() for i in inspetor.get_indexes(tabela)}
+
+    assert not esperados & existentes()
+
+    assert garantir_esquema(engine) is True
+
+    assert esperados <= existentes()
+    for nome, detalhes in explicar_consultas(engine).items():
+        conferir_plano(nome, detalhes)
+    assert garantir_esquema(engine) is False
+    engine.dispose()
@@ -0,0 +1,36 @@
+"""
+Parâmetro ids= das rotas de lote: o limite de IDS_MAXIMO é conferido
+durante a leitura, sem interpretar o texto inteiro.
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from app.lotes import IDS_MAXIMO, LoteGrande, interpretar_ids, parametros_ids
+
+
+def test_interpretar_ids():
+    assert interpretar_ids(" 3,1,,2,3 ") == [3, 1, 2]
+    with pytest.raises(ValueError):
+        interpretar_ids("1,x")
+
+
+def test_para_no_primeiro_id_alem_do_maximo():
+    # O valor inválido depois do id 501 nunca chega a ser lido
+    texto = ",".join(str(i) for i in range(1, IDS_MAXIMO + 2)) + ",x"
+    with pytest.raises(LoteGrande):
+        interpretar_ids(texto, IDS_MAXIMO)
+    repetidos = ",".join(["7"] * (IDS_MAXIMO + 10))
+    assert interpretar_ids(repetidos, IDS_MAXIMO) == [7]
+
+
+@pytest.mark.parametrize("texto, status", [
+    (",".join(map(str, range(1, 1000))), 413),
+    ("0", 400),
+    (",", 400),
+    ("1,99999999999999999999999", 400),  # não cabe em um inteiro do SQLite
+])
+def test_parametros_ids_recusa(texto, status):
+    with pytest.raises(HTTPException) as erro:
+        parametros_ids(texto)
+    assert erro.value.status_code == status
@@ -0,0 +1,53 @@
+"""
+Instrumentação das consultas (metricas.instrumentar_engine): um comando
+que falha não pode distorcer a latência medida dos comandos seguintes,
+e comandos sobrepostos na mesma conexão têm cada um o seu início.
+"""
+
+import time
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+from app import metricas
+
+
+def test_falha_nao_afeta_proxima_consulta(tmp_path, monkeypatch):
+    duracoes = []
+    monkeypatch.setattr(metricas.duracao_consultas, "observar", lambda valor, *rotulos: duracoes.append(valor))
+    engine = create_engine(f"sqlite:///{tmp_path / 'metricas.db'}")
+    metricas.instrumentar_engine(engine)
+
+    with engine.connect() as conexao:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conexao.execute(text("SELECT * FROM tabela_inexistente"))
+        time.sleep(0.2)
+        conexao.execute(text("SELECT 1"))
+
+    assert len(duracoes) == 1
+    assert duracoes[0] < 0.1  # não inclui a espera depois das falhas
+    engine.dispose()
+
+
+def test_consultas_sobrepostas_na_mesma_conexao(tmp_path, monkeypatch):
+    duracoes = []
+    monkeypatch.setattr(metricas.duracao_consultas, "observar", lambda valor, *rotulos: duracoes.append(valor))
+    engine = create_engine(f"sqlite:///{tmp_path / 'metricas.db'}")
+    metricas.instrumentar_engine(engine)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def consulta_aninhada(conexao, cursor, sql, parametros, contexto, executemany):
+        # Um comando roda na mesma conexão entre o início e o fim de outro
+        if sql.startswith("SELECT"):
+            time.sleep(0.2)
+            conexao.exec_driver_sql("PRAGMA user_version")
+
+    with engine.connect() as conexao:
+        conexao.execute(text("SELECT 1"))
+
+    pragma, select = duracoes  # o PRAGMA aninhado termina primeiro
+    assert select >= 0.2  # medido desde o próprio início, não desde o do PRAGMA
+    assert pragma < 0.1
+    engine.dispose()
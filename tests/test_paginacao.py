@@ -0,0 +1,26 @@
+"""
+Cursor de paginação: valores que não cabem em um inteiro do SQLite são
+recusados com 400, em vez de chegar ao banco e virar 500.
+"""
+
+import base64
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.paginacao import ID_MAXIMO, codificar_cursor, decodificar_cursor
+
+
+def test_cursor_no_limite_do_sqlite():
+    assert decodificar_cursor(codificar_cursor(ID_MAXIMO)) == ID_MAXIMO
+    with pytest.raises(ValueError):
+        decodificar_cursor(codificar_cursor(ID_MAXIMO + 1))
+
+
+def test_cursor_grande_demais_responde_400():
+    from app.main import app
+
+    cursor = base64.urlsafe_b64encode(b"id:99999999999999999999999").decode()
+    with TestClient(app) as cliente:
+        resposta = cliente.get("/manutencoes/", params={"cursor": cursor})
+        assert (resposta.status_code, resposta.json()["detail"]) == (400, "Cursor inválido.")
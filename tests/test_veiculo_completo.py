@@ -0,0 +1,81 @@
+"""
+GET /veiculos/{id}/completo (crud.buscar_veiculo_completo): o número de
+comandos SQL não pode crescer com o histórico do veículo (N+1).
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import arquivamento, crud, models, schemas
+from app.esquema import garantir_esquema
+from tests.conftest import ContadorConsultas, criar_engine
+
+LIMITE_CONSULTAS = 4
+DOCUMENTOS_POR_MANUTENCAO = 3
+
+
+def semear_veiculo(engine, manutencoes: int, inicio: date = date(2020, 1, 1)) -> int:
+    """Um veículo com dono, dois planos e `manutencoes` manutenções com documentos."""
+    with Session(engine) as db:
+        usuario = models.Usuario(nome="Dono", email=f"dono{manutencoes}@exemplo.com", senha_hash="x")
+        veiculo = models.Veiculo(placa=f"TST{manutencoes:04d}", modelo="Teste", km_atual=1000, usuario=usuario)
+        db.add_all([
+            models.PlanoManutencao(veiculo=veiculo, nome_plano="troca de óleo", km_referencia=10000),
+            models.PlanoManutencao(veiculo=veiculo, nome_plano="pneus", km_referencia=40000),
+        ])
+        for n in range(manutencoes):
+            manutencao = models.Manutencao(
+                veiculo=veiculo, data=inicio + timedelta(days=30 * n), km=1000 * n,
+                tipo_manutencao="troca de óleo", custo=100.0,
+            )
+            db.add_all(
+                models.Documento(manutencao=manutencao, nome_arquivo=f"nota_{n}_{d}.pdf")
+                for d in range(DOCUMENTOS_POR_MANUTENCAO)
+            )
+        db.commit()
+        return veiculo.id
+
+
+def consultar_completo(engine, veiculo_id: int):
+    """Executa buscar_veiculo_completo em uma sessão nova. Retorna (veículo, comandos SQL)."""
+    with Session(engine) as db, ContadorConsultas(engine) as contador:
+        veiculo = crud.buscar_veiculo_completo(db, veiculo_id)
+        completo = schemas.VeiculoCompleto.from_orm(veiculo)  # serialização da rota: sem lazy loads
+    return completo, len(contador)
+
+
+@pytest.mark.parametrize("manutencoes", [1, 25])
+def test_consultas_constantes(engine, manutencoes):
+    veiculo_id = semear_veiculo(engine, manutencoes)
+
+    completo, consultas = consultar_completo(engine, veiculo_id)
+
+    assert consultas <= LIMITE_CONSULTAS
+    assert len(completo.manutencoes) == manutencoes
+    assert all(len(m.documentos) == DOCUMENTOS_POR_MANUTENCAO for m in completo.manutencoes)
+    assert len(completo.planos) == 2
+    assert completo.usuario.nome == "Dono"
+
+
+def test_arquivo_nao_adiciona_consultas_por_linha(com_arquivo, tmp_path):
+    engine = criar_engine(tmp_path / "teste.db")
+    garantir_esquema(engine)
+    contagens = {}
+    for manutencoes in (2, 30):
+        veiculo_id = semear_veiculo(engine, manutencoes)
+        # Metade do histórico vai para o arquivo
+        corte = date(2020, 1, 1) + timedelta(days=30 * (manutencoes // 2))
+        assert arquivamento.arquivar(corte, lote=7, pausa_ms=0, sessoes=sessionmaker(engine)) >= manutencoes // 2
+
+        completo, contagens[manutencoes] = consultar_completo(engine, veiculo_id)
+
+        assert [m.id for m in completo.manutencoes] == sorted(m.id for m in completo.manutencoes)
+        assert len(completo.manutencoes) == manutencoes
+        assert all(len(m.documentos) == DOCUMENTOS_POR_MANUTENCAO for m in completo.manutencoes)
+    engine.dispose()
+
+    # Arquivo: manutenções e documentos arquivados, duas consultas a mais
+    assert contagens[2] == contagens[30]
+    assert contagens[30] <= LIMITE_CONSULTAS + 2